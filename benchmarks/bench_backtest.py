@@ -0,0 +1,53 @@
+"""
+Backtest benchmark: synthetic 1-minute Nifty bars replayed through the unchanged strategy
+classes by core.backtest.Backtester. A sample of sessions is replayed per strategy and the
+wall-clock time is extrapolated to one trading year (250 sessions x 375 bars).
+
+Run: python3 benchmarks/bench_backtest.py [sessions]
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from core.backtest import HistoricalStore, Backtester
+from strategies.momentum_strategy import MomentumStrategy
+from strategies.vwap_strategy import VWAPStrategy
+
+YEAR_SESSIONS = 250
+BARS_PER_SESSION = 375
+
+def build_history(sessions, seed=1):
+    rng = np.random.default_rng(seed)
+    n = sessions * BARS_PER_SESSION
+    close = 22000 + np.cumsum(rng.normal(0, 4, n))
+    opens = np.r_[close[0], close[:-1]]
+    high = np.maximum(opens, close) + rng.uniform(0, 3, n)
+    low = np.minimum(opens, close) - rng.uniform(0, 3, n)
+    volume = rng.integers(1000, 10000, n).astype(float)
+    days = pd.bdate_range("2025-01-01", periods=sessions) + pd.Timedelta(hours=9, minutes=15)
+    ts = (np.repeat(days.values, BARS_PER_SESSION) + np.tile(np.arange(BARS_PER_SESSION), sessions) * np.timedelta64(1, 'm'))
+    return pd.DataFrame({'timestamp': ts, 'open': opens, 'high': high, 'low': low, 'close': close, 'volume': volume})
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    store = HistoricalStore()
+    store.add("99926000", build_history(sessions))
+    print(f">>> [Bench] {sessions * BARS_PER_SESSION:,} one-minute bars ({sessions} sessions)")
+
+    runs = [
+        ("Momentum", Backtester(store, MomentumStrategy)),
+        ("VWAP (every 15 min)", Backtester(store, VWAPStrategy, start=(9, 45), repeat=15)),
+    ]
+    for name, backtester in runs:
+        start = time.perf_counter()
+        s = backtester.run().summary()
+        per_session = (time.perf_counter() - start) / sessions
+        print(f"    {name:<20}: {per_session*1000:7.1f} ms/session  (year: {per_session*YEAR_SESSIONS/60:5.1f} min)"
+              f" | trades: {s['trades']} | net P&L: {s['net_pnl']:,.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Black-Scholes benchmark: IV + Greeks for a full NIFTY weekly chain (CE and PE, 50-point
+strikes, spot +/- 15%) and for a four-expiry grid, in one vectorized call each.
+Also reports the worst IV error against the volatility the premiums were priced with.
+
+Run: python3 benchmarks/bench_black_scholes.py
+"""
+
+import sys
+import os
+import time
+import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from utils import black_scholes as bs
+from utils.option_chain import OptionChain
+
+SPOT = 23000.0
+NOW = datetime.datetime(2026, 1, 15, 10, 0)
+EXPIRIES = ["20JAN2026", "27JAN2026", "03FEB2026", "10FEB2026"]
+RUNS = 50
+
+def build_chain(expiry):
+    strikes = list(range(int(SPOT * 0.85) // 50 * 50, int(SPOT * 1.15), 50))
+    ce = [(f"{expiry}{k}CE", f"NIFTY{expiry}{k}CE") for k in strikes]
+    pe = [(f"{expiry}{k}PE", f"NIFTY{expiry}{k}PE") for k in strikes]
+    return OptionChain("NIFTY", expiry, strikes, ce, pe)
+
+def build_prices(chains):
+    prices, truth = {}, {}
+    for chain in chains:
+        t = bs.time_to_expiry(chain.expiry, NOW)
+        strikes = np.array(chain.strikes, dtype=float)
+        vol = 0.12 + 0.04 * ((strikes - SPOT) / 1000.0) ** 2
+        for is_call, legs in ((True, chain.ce), (False, chain.pe)):
+            premium = np.round(bs.price(SPOT, strikes, t, vol, is_call) / 0.05) * 0.05 # tick size
+            for (token, _), p, v in zip(legs, premium, vol):
+                prices[token], truth[token] = p, v
+    return prices, truth
+
+def bench(chains, prices):
+    bs.chain_greeks(chains, SPOT, prices, now=NOW) # warm-up
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        df = bs.chain_greeks(chains, SPOT, prices, now=NOW)
+    return (time.perf_counter() - start) / RUNS, df
+
+def main():
+    chains = [build_chain(e) for e in EXPIRIES]
+    prices, truth = build_prices(chains)
+
+    weekly, df = bench(chains[0], prices)
+    grid, df_grid = bench(chains, prices)
+
+    # Premiums are rounded to the 0.05 tick, so compare where the time value is worth quoting
+    otm_value = np.minimum(df_grid['premium'], df_grid['premium'] - np.maximum(
+        np.where(df_grid['type'] == "CE", SPOT - df_grid['strike'], df_grid['strike'] - SPOT), 0))
+    quoted = otm_value > 5
+    err = np.abs(df_grid['iv'] - df_grid['token'].map(truth))[quoted].max()
+
+    print(f">>> [Bench] Weekly chain: {len(df):,} contracts in {weekly*1000:.2f} ms")
+    print(f">>> [Bench] {len(EXPIRIES)}-expiry grid: {len(df_grid):,} contracts in {grid*1000:.2f} ms")
+    print(f"    max IV error (time value > 5) : {err:.2e}")
+    print(f"    unsolved (NaN IV)             : {int(df_grid['iv'].isna().sum())}")
+
+if __name__ == "__main__":
+    main()
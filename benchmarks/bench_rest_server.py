@@ -0,0 +1,58 @@
+"""
+SmartAPI REST benchmark: the unmodified SmartConnect client against core.mock_rest_server
+on localhost. Measures end-to-end request throughput (ltpData) for 1 and several threads,
+with the stock client (a new connection per request) and with its calls routed through one
+keep-alive requests.Session, and reports the TCP connections each run opened.
+
+Run: python3 benchmarks/bench_rest_server.py [requests]
+"""
+
+import sys
+import os
+import time
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import requests
+from core.market_simulator import MarketSimulator
+from core.mock_rest_server import MockRestServer
+from utils.clock import SimulatedClock
+
+NIFTY = "99926000"
+
+def run(server, api, n, threads):
+    def call(_):
+        start = time.perf_counter()
+        api.ltpData("NSE", "Nifty 50", NIFTY)
+        return time.perf_counter() - start
+
+    before = server.metrics()['connections']
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(call, range(n)))
+    elapsed = time.perf_counter() - start
+    return n / elapsed, np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000, server.metrics()['connections'] - before
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    market = MarketSimulator(clock=SimulatedClock(datetime.datetime(2026, 2, 10, 11, 0)), seed=1, days=0)
+    server = MockRestServer(market).start()
+    api = server.session()
+    print(f">>> [Bench] {n:,} ltpData calls per run | {os.cpu_count()} CPUs")
+    try:
+        for label, pooled in (("new connection per call (stock)", False), ("keep-alive session", True)):
+            for threads in (1, 8):
+                with requests.Session() as session:
+                    adapter = requests.adapters.HTTPAdapter(pool_maxsize=threads)
+                    session.mount("http://", adapter)
+                    with mock.patch.object(requests, "request", session.request if pooled else requests.request):
+                        rate, p50, p99, connections = run(server, api, n, threads)
+                print(f"    {label:<32} {threads} threads: {rate:7.0f} req/s | p50 {p50:5.2f} ms | p99 {p99:6.2f} ms | {connections:,} connections")
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Parameter sweep benchmark: a Momentum grid over synthetic 1-minute history, run by
+core.sweep.ParameterSweep with 1, 2, 4, ... worker processes up to the CPU count.
+Reports wall-clock time, combinations per minute and the speedup over one worker.
+
+Run: python3 benchmarks/bench_sweep.py [sessions]
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.backtest import HistoricalStore
+from core.sweep import ParameterSweep
+from strategies.momentum_strategy import MomentumStrategy
+from bench_backtest import build_history
+
+GRID = {
+    "MOMENTUM_EMA_FAST": [5, 9, 13],
+    "MOMENTUM_EMA_SLOW": [21, 34],
+    "MOMENTUM_RSI_OVERBOUGHT": [70, 80],
+}
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    store = HistoricalStore()
+    store.add("99926000", build_history(sessions))
+    cores = os.cpu_count() or 1
+    counts = [n for n in (1, 2, 4, 8, 16, 32, 64) if n < cores] + [cores]
+    print(f">>> [Bench] {len(GRID['MOMENTUM_EMA_FAST']) * len(GRID['MOMENTUM_EMA_SLOW']) * len(GRID['MOMENTUM_RSI_OVERBOUGHT'])}"
+          f" combinations x {sessions} sessions | {cores} CPUs")
+
+    baseline = None
+    for workers in counts:
+        sweep = ParameterSweep(store, MomentumStrategy, GRID, workers=workers)
+        start = time.perf_counter()
+        table = sweep.run()
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"    {workers:>3} workers: {elapsed:7.1f}s | {len(table) / elapsed * 60:6.1f} combos/min | speedup {baseline / elapsed:4.1f}x"
+              f" | best net P&L: {table['net_pnl'].iloc[0]:,.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+TokenLookup benchmark: 1k get_token() calls against a Scrip Master of realistic size.
+  Before: boolean-mask scan over the whole DataFrame (the original get_token).
+  After:  hashed (name, expiry, strike, option_type) index.
+
+Run: python3 benchmarks/bench_token_lookup.py
+"""
+
+import sys
+import os
+import time
+import random
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from utils.token_lookup import TokenLookup
+
+EXPIRIES = ["06JAN2026", "13JAN2026", "20JAN2026", "27JAN2026", "24FEB2026", "31MAR2026"]
+
+def build_scrip_master(filler_rows=120000):
+    rows = []
+    token = 30000
+    for expiry in EXPIRIES:
+        for strike in range(18000, 28050, 50):
+            for opt in ("CE", "PE"):
+                token += 1
+                rows.append((str(token), f"NIFTY{expiry[:5]}{expiry[-2:]}{strike}{opt}", "NIFTY", expiry,
+                             strike * 100.0, "OPTIDX", "NFO"))
+    # Equities / other segments make up the bulk of the real file
+    for i in range(filler_rows):
+        rows.append((str(100000 + i), f"STOCK{i}-EQ", f"STOCK{i}", "", -1.0, "", "NSE"))
+    return pd.DataFrame(rows, columns=['token', 'symbol', 'name', 'expiry', 'strike', 'instrumenttype', 'exch_seg'])
+
+def scan_token(df, expiry_date, strike, option_type):
+    """The original get_token() filter"""
+    strike_paise = float(strike) * 100.0
+    row = df[
+        (df['name'] == 'NIFTY') &
+        (df['instrumenttype'] == 'OPTIDX') &
+        (df['strike'] == strike_paise) &
+        (df['symbol'].str.endswith(option_type)) &
+        (df['expiry'] == expiry_date)
+    ]
+    if not row.empty:
+        return row.iloc[0]['token'], row.iloc[0]['symbol']
+    return None, None
+
+def run(n=1000, scan_sample=20):
+    df = build_scrip_master()
+    loader = TokenLookup()
+    loader.df = df
+    loader.build_index()
+
+    rnd = random.Random(7)
+    queries = [("NIFTY", rnd.choice(EXPIRIES), rnd.randrange(18000, 28050, 50), rnd.choice(("CE", "PE"))) for _ in range(n)]
+
+    # The scan is slow; time a sample and scale to n
+    start = time.perf_counter()
+    for _, expiry, strike, opt in queries[:scan_sample]:
+        scan_token(df, expiry, strike, opt)
+    scan_total = (time.perf_counter() - start) * n / scan_sample
+
+    start = time.perf_counter()
+    for q in queries:
+        loader.get_token(*q)
+    index_total = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loader.get_tokens(queries)
+    bulk_total = time.perf_counter() - start
+
+    # Sanity: both paths agree
+    for _, expiry, strike, opt in queries[:20]:
+        assert scan_token(df, expiry, strike, opt) == loader.get_token("NIFTY", expiry, strike, opt)
+
+    print(f"Scrip Master rows: {len(df):,} | Lookups: {n:,}")
+    print(f"  Before (DataFrame scan): {scan_total*1000:10.1f} ms total | {scan_total/n*1e6:10.1f} us/lookup")
+    print(f"  After  (get_token)     : {index_total*1000:10.1f} ms total | {index_total/n*1e6:10.2f} us/lookup")
+    print(f"  After  (get_tokens)    : {bulk_total*1000:10.1f} ms total | {bulk_total/n*1e6:10.2f} us/lookup")
+    print(f"  Speedup: {scan_total/index_total:,.0f}x")
+
+if __name__ == "__main__":
+    run()
@@ -14,3 +14,126 @@ class Config:
     NIFTY_LOT_SIZE = 65
     # URL to fetch token IDs for all stocks
     SCRIP_MASTER_URL = "https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json"
+
+    # Scrip Master ingestion filter: rows outside these sets are dropped while streaming the download.
+    # OPTIDX = NFO index options, AMXIDX = NSE indices (Nifty 50 spot, India VIX).
+    SCRIP_SEGMENTS = ["NFO", "NSE"]
+    SCRIP_INSTRUMENT_TYPES = ["OPTIDX", "AMXIDX"]
+    SCRIP_UNDERLYINGS = ["NIFTY", "BANKNIFTY", "FINNIFTY", "INDIA VIX"]
+
+    # Local cache for downloaded reference data (Scrip Master, refreshed once per trading date)
+    CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+
+    # Startup: strikes either side of ATM to pre-resolve while the bot warms up
+    STARTUP_ATM_WINDOW = 5
+
+    # Candle cache: bars kept per (token, interval) series, shared by all strategies
+    CANDLE_CACHE_BARS = 2000
+
+    # SmartAPI rate budgets per endpoint class: (requests per second, burst)
+    RATE_LIMITS = {
+        "historical": (3, 3),   # getCandleData / getOIData
+        "quote": (10, 10),      # ltpData / getMarketData
+        "orders": (10, 10),     # placeOrder / modifyOrder / cancelOrder
+        "orderbook": (1, 2),    # orderBook / tradeBook
+        "rms": (2, 2),          # rmsLimit
+    }
+    # Calls that would wait longer than this (seconds) are rejected instead of queued
+    RATE_LIMIT_MAX_WAIT = 10.0
+
+    # Quote snapshot: consumers trigger a batched refresh when a quote is older than this (seconds)
+    QUOTE_MAX_AGE = 1.0
+
+    # Order-book snapshot: status / fill / open-order queries refresh it when older than this (seconds)
+    ORDER_BOOK_MAX_AGE = 1.0
+    # Fill waits give up (and the order is reported unfilled) after this many seconds
+    ORDER_FILL_TIMEOUT = 30
+    # After cancelling an entry that did not fill in time, wait this long for the broker to confirm (or report a fill)
+    ORDER_CANCEL_TIMEOUT = 5
+    # A basket with a leg unfilled or left without its stop closes the legs that did fill
+    BASKET_UNWIND_PARTIAL = True
+
+    # Option-chain OI scan: strikes either side of ATM, parallel workers, tokens per market-data request
+    OI_STRIKE_WIDTH = 2
+    OI_SCAN_WORKERS = 4
+    OI_SCAN_BATCH = 50
+
+    # Option-chain snapshot cache: fresh for TTL seconds, then served while a background
+    # refresh runs; older than MAX_STALE seconds forces a synchronous rescan
+    OI_CACHE_TTL = 60
+    OI_CACHE_MAX_STALE = 300
+
+    # Streaming market data (SmartStream websocket). REST quote polling stays as the fallback.
+    TICK_FEED_ENABLED = os.getenv("TICK_FEED", "1") == "1"
+    TICK_FEED_URL = "wss://smartapisocket.angelone.in/smart-stream"
+    TICK_FEED_HEARTBEAT = 10 # seconds between "ping" heartbeats
+    TICK_FEED_MAX_BACKOFF = 30 # reconnect delay doubles up to this (seconds)
+    # wss:// certificates are verified; TICK_FEED_INSECURE_TLS=1 turns that off (e.g. behind an intercepting proxy)
+    TICK_FEED_INSECURE_TLS = os.getenv("TICK_FEED_INSECURE_TLS", "0") == "1"
+
+    # Order status updates (order websocket, same heartbeat / backoff). Order-book polling stays as the fallback.
+    ORDER_FEED_ENABLED = os.getenv("ORDER_FEED", "1") == "1"
+    ORDER_FEED_URL = "wss://tns.angelone.in/smart-order-update"
+
+    # Local bars built from ticks: timeframes, and how often they are checked against the broker's
+    BAR_INTERVALS = ["ONE_MINUTE", "FIVE_MINUTE", "FIFTEEN_MINUTE"]
+    BAR_RECONCILE_EVERY = 3 # closed bars (per timeframe) between reconciliations
+    BAR_RECONCILE_DELAY = 5 # seconds after a close, so the broker's bar is final
+
+    # Black-Scholes: annual risk-free rate (91-day T-bill) used for IV and Greeks
+    RISK_FREE_RATE = 0.065
+
+    # Implied-volatility surface: quotes older than MAX_AGE seconds are stale (and pulled again
+    # when polling); a point is re-solved once the spot has moved RESPOT (fraction) since its IV
+    VOL_SURFACE_MAX_AGE = 5.0
+    VOL_SURFACE_RESPOT = 0.002
+    # Market regime: ATM IV (or India VIX) above this, in vol points, favours trend following
+    REGIME_HIGH_VOL = 18.0
+
+    # Strategy parameters (tuned with core/sweep.py)
+    MOMENTUM_EMA_FAST = 9
+    MOMENTUM_EMA_SLOW = 21
+    MOMENTUM_RSI_PERIOD = 14
+    MOMENTUM_RSI_OVERBOUGHT = 70 # no CE entries at or above
+    MOMENTUM_RSI_OVERSOLD = 30 # no PE entries at or below
+    # Step-trailing stop: (profit points reached, points locked above entry)
+    MOMENTUM_TRAIL_STEPS = ((20, 5), (40, 25), (60, 45))
+    # PositionManager TSL (fractions of entry): initial stop, breakeven trigger, trail distance from peak
+    TSL_STOP_LOSS = 0.10
+    TSL_BREAKEVEN = 0.10
+    TSL_TRAIL = 0.10
+    # ORB: points either side of the LTP when the opening range is approximated
+    ORB_RANGE_POINTS = 20
+
+    # Backtesting (core/backtest.py): account, fill model and replayed session window
+    BACKTEST_CAPITAL = 500000
+    BACKTEST_SLIPPAGE = 0.005 # fraction of the price on market fills (at least one tick)
+    BACKTEST_BROKERAGE = 20.0 # per executed order
+    BACKTEST_IV = 0.13 # option pricing volatility when no India VIX history is stored
+    BACKTEST_START = (9, 20) # strategies start each replayed session at this time
+    BACKTEST_SQUARE_OFF = (15, 20) # broker square-off of open intraday positions
+    BACKTEST_STRIKE_STEP = 50
+    BACKTEST_STRIKE_RANGE = 2000 # synthetic chain: strikes within this many points of the index
+
+    # Mock market (--test, core/market_simulator.py): per-second Nifty / India VIX paths.
+    # A fixed seed replays the same market every run.
+    MOCK_SEED = int(os.getenv("MOCK_SEED")) if os.getenv("MOCK_SEED") else None
+    MOCK_SPOT = 23000.0
+    MOCK_VIX = 14.0
+    MOCK_HISTORY_DAYS = 5 # sessions before today, for candle look-backs
+    MOCK_INSTRUMENT_PRICE = 100.0 # start of the path of tokens that are not registered contracts
+    MOCK_FILL_DELAY = 0.0 # seconds a MARKET order stays 'open' before it fills
+    # Fault injection (off by default): seconds per call (or a (min, max) range), fraction of
+    # calls failing, and rejecting calls over Config.RATE_LIMITS as the broker does
+    MOCK_LATENCY = 0.0
+    MOCK_ERROR_RATE = 0.0
+    MOCK_RATE_LIMIT = False
+    # Local SmartAPI REST stand-in (core/mock_rest_server.py), per endpoint class (RATE_LIMITS'
+    # names, plus "auth"): seconds before each response, and (requests per second, burst) caps
+    # answered with the broker's 403. Empty: no latency, no throttling.
+    MOCK_HTTP_LATENCY = {}
+    MOCK_HTTP_LIMITS = {}
+
+    # Parameter sweeps (core/sweep.py): worker processes and the column results are ranked by
+    SWEEP_WORKERS = os.cpu_count() or 1
+    SWEEP_METRIC = "net_pnl"
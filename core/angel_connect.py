@@ -1,6 +1,7 @@
 from SmartApi import SmartConnect
 import pyotp
 from config.settings import Config
+from core.rate_limiter import RateLimitedAPI
 
 def get_angel_session():
     print(">>> [System] Connecting to Angel One...")
@@ -12,7 +13,8 @@ def get_angel_session():
         
         if data['status']:
             print(">>> [System] Login Successful!")
-            return api
+            # All calls go through the shared per-endpoint rate limiter
+            return RateLimitedAPI(api)
         else:
             print(f">>> [Error] Login Failed: {data['message']}")
             return None
@@ -0,0 +1,614 @@
+import contextlib
+import datetime
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from core.bar_aggregator import INTERVAL_MINUTES
+from core.data_fetcher import CANDLE_COLUMNS, shared_candle_cache
+from core.oi_analyzer import shared_chain_cache
+from core.quote_service import QuoteService
+from utils import black_scholes as bs
+from utils.clock import SimulatedClock, SessionEnded
+from utils.expiry_calculator import get_next_weekly_expiry
+from utils.option_chain import OptionChain
+from utils.logger import logger
+
+NIFTY_TOKEN = "99926000"
+VIX_TOKEN = "99926017"
+TICK = 0.05
+EPOCH = datetime.datetime(1970, 1, 1)
+BROKER_TIME = "%Y-%m-%dT%H:%M:%S+05:30"
+
+def _seconds(ts):
+    """Naive wall-clock datetime -> integer seconds (wall clock read as UTC, so days align on midnight)"""
+    return int((ts - EPOCH).total_seconds())
+
+def _wall(seconds):
+    return EPOCH + datetime.timedelta(seconds=int(seconds))
+
+def _tick(price):
+    return round(round(price / TICK) * TICK, 2)
+
+class HistoricalStore:
+    """
+    Stored 1-minute OHLCV history per token, held as NumPy arrays (timestamps in wall-clock
+    seconds, rows of open/high/low/close/volume). Higher timeframes are aggregated once on
+    first use, so every candle request or price lookup is a binary search plus a slice.
+    """
+    def __init__(self):
+        self.series = {} # {token: (ts, ohlcv)}
+        self.resampled = {} # {(token, minutes): (ts, ohlcv)}
+
+    @classmethod
+    def from_csv(cls, paths):
+        """paths: {token: csv path} with DataFetcher's columns (timestamp, open, high, low, close, volume)"""
+        store = cls()
+        for token, path in paths.items():
+            store.add(token, pd.read_csv(path))
+        return store
+
+    def add(self, token, df):
+        ts = pd.to_datetime(df['timestamp'])
+        if ts.dt.tz is not None:
+            ts = ts.dt.tz_convert("Asia/Kolkata").dt.tz_localize(None)
+        seconds = ts.values.astype('datetime64[s]').astype(np.int64)
+        ohlcv = df[CANDLE_COLUMNS[1:]].to_numpy(dtype=np.float64)
+        order = np.argsort(seconds, kind='stable')
+        self.series[str(token)] = (seconds[order], ohlcv[order])
+        self.resampled = {k: v for k, v in self.resampled.items() if k[0] != str(token)}
+
+    def __contains__(self, token):
+        return str(token) in self.series
+
+    def sessions(self, token=NIFTY_TOKEN):
+        """Trading dates present in the token's history"""
+        ts, _ = self.series[token]
+        return [_wall(d * 86400).date() for d in np.unique(ts // 86400)]
+
+    def bars(self, token, minutes):
+        if minutes == 1:
+            return self.series[token]
+        key = (token, minutes)
+        if key not in self.resampled:
+            ts, ohlcv = self.series[token]
+            bucket = ts // (minutes * 60)
+            starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+            ends = np.r_[starts[1:], len(ts)] - 1
+            self.resampled[key] = (bucket[starts] * minutes * 60, np.column_stack([
+                ohlcv[starts, 0],
+                np.maximum.reduceat(ohlcv[:, 1], starts),
+                np.minimum.reduceat(ohlcv[:, 2], starts),
+                ohlcv[ends, 3],
+                np.add.reduceat(ohlcv[:, 4], starts),
+            ]))
+        return self.resampled[key]
+
+    def price(self, token, now):
+        """
+        Last traded price known at 'now' (wall-clock seconds): the close of the last completed
+        minute, or the open of the minute in progress. None before the first bar.
+        """
+        ts, ohlcv = self.series[token]
+        i = int(np.searchsorted(ts, now, 'right')) - 1
+        if i < 0: return None
+        return float(ohlcv[i, 3] if ts[i] + 60 <= now else ohlcv[i, 0])
+
+    def minute_bars(self, token, start, end):
+        """1-minute bars completed in (start, end]: (ts, ohlcv) slices"""
+        ts, ohlcv = self.series[token]
+        lo = np.searchsorted(ts, start - 60, 'right')
+        hi = np.searchsorted(ts, end - 60, 'right')
+        return ts[lo:hi], ohlcv[lo:hi]
+
+    def candles(self, token, minutes, start, end, now):
+        """
+        Bars starting in [start, end] as the broker would have served them at 'now': completed
+        bars plus the forming one, built only from what had traded by then.
+        """
+        ts, ohlcv = self.bars(token, minutes)
+        length = minutes * 60
+        lo = np.searchsorted(ts, start, 'left')
+        hi = np.searchsorted(ts, min(end, now - length), 'right')
+        rows = [(ts[i], *ohlcv[i]) for i in range(lo, hi)]
+
+        forming = now - now % length
+        if start <= forming <= end:
+            m_ts, m = self.series[token]
+            i0 = np.searchsorted(m_ts, forming, 'left')
+            i1 = np.searchsorted(m_ts, now, 'right')
+            if i1 > i0:
+                part = m[i0:i1].copy()
+                if m_ts[i1 - 1] + 60 > now:
+                    # Minute in progress: only its open has traded
+                    part[-1, 1:4] = part[-1, 0]
+                    part[-1, 4] = 0.0
+                rows.append((forming, part[0, 0], part[:, 1].max(), part[:, 2].min(), part[-1, 3], part[:, 4].sum()))
+        return rows
+
+class BacktestAPI:
+    """
+    SmartConnect-compatible session over a HistoricalStore, driven by a SimulatedClock.
+
+    Quotes and candles only ever show what had traded by the clock's time. Option contracts
+    without stored history are priced with Black-Scholes from the index (India VIX as the
+    volatility when stored, else Config.BACKTEST_IV).
+
+    Fill model: MARKET orders fill at the LTP plus slippage (Config.BACKTEST_SLIPPAGE of the
+    price, at least one tick) against the trader. LIMIT and STOPLOSS orders rest in the book
+    and are matched against every 1-minute bar the clock moves past (a stop that gaps fills at
+    the bar's open). Each executed order costs Config.BACKTEST_BROKERAGE. Available funds
+    (rmsLimit) are cash: capital plus realised P&L, less premium paid for open longs and
+    charges; short premium is credited and no exchange margin is blocked.
+    """
+    def __init__(self, store, clock, capital=None, slippage=None, brokerage=None, iv=None):
+        self.api_key = "backtest"
+        self.store = store
+        self.clock = clock
+        self.capital = Config.BACKTEST_CAPITAL if capital is None else capital
+        self.slippage = Config.BACKTEST_SLIPPAGE if slippage is None else slippage
+        self.brokerage = Config.BACKTEST_BROKERAGE if brokerage is None else brokerage
+        self.iv = Config.BACKTEST_IV if iv is None else iv
+
+        self.cash = float(self.capital)
+        self.charges = 0.0
+        self.orders = []
+        self.by_id = {}
+        self.pending = [] # resting LIMIT / STOPLOSS orders
+        self.contracts = {} # {token: (name, expiry, strike, option_type, symbol)}
+        self.contract_tokens = {} # {(name, expiry, strike, option_type): token}
+        self.positions = {} # {token: {'qty', 'avg', 'opened', 'symbol'}}
+        self.fills = []
+        self.trades = []
+        self.order_listeners = [] # callback(order) after every order status change
+        self.lock = threading.RLock()
+        if hasattr(clock, 'on_advance'):
+            clock.on_advance = self.advance
+
+    def generateSession(self, clientCode, password, totp):
+        return {"status": True, "message": "SUCCESS", "data": {"jwtToken": "backtest", "feedToken": "backtest"}}
+
+    # --- Prices ---
+
+    def now_seconds(self):
+        return _seconds(self.clock.now())
+
+    def register_contract(self, name, expiry, strike, option_type):
+        key = (name, expiry, float(strike), option_type)
+        with self.lock:
+            token = self.contract_tokens.get(key)
+            if token is None:
+                token = str(900000 + len(self.contract_tokens))
+                symbol = f"{name}{expiry[:5]}{expiry[-2:]}{int(strike) if float(strike).is_integer() else strike}{option_type}"
+                self.contract_tokens[key] = token
+                self.contracts[token] = (name, expiry, float(strike), option_type, symbol)
+        return token, self.contracts[token][4]
+
+    def volatility(self, now):
+        if VIX_TOKEN in self.store:
+            vix = self.store.price(VIX_TOKEN, now)
+            if vix: return vix / 100.0
+        return self.iv
+
+    def option_premium(self, token, spot, now):
+        _, expiry, strike, option_type, _ = self.contracts[token]
+        moment = _wall(now)
+        t = bs.time_to_expiry(expiry, moment)
+        premium = float(bs.price(spot, strike, t, self.volatility(now), option_type == "CE"))
+        return max(TICK, _tick(premium))
+
+    def price(self, token, now=None):
+        token = str(token)
+        now = self.now_seconds() if now is None else now
+        if token in self.store:
+            return self.store.price(token, now)
+        if token in self.contracts and NIFTY_TOKEN in self.store:
+            spot = self.store.price(NIFTY_TOKEN, now)
+            return self.option_premium(token, spot, now) if spot else None
+        return None
+
+    def bar_path(self, token, start, end):
+        """(ts, ohlc rows) of the token's 1-minute bars completed in (start, end]"""
+        if token in self.store:
+            ts, ohlcv = self.store.minute_bars(token, start, end)
+            return ts, ohlcv[:, :4]
+        ts, spot = self.store.minute_bars(NIFTY_TOKEN, start, end)
+        is_call = self.contracts[token][3] == "CE"
+        rows = []
+        for t, (o, h, l, c, _) in zip(ts, spot):
+            # A call's high comes with the index high, a put's with the index low
+            hi, lo = (h, l) if is_call else (l, h)
+            rows.append([self.option_premium(token, x, t + 60) for x in (o, hi, lo, c)])
+        return ts, np.array(rows).reshape(-1, 4)
+
+    # --- Market data ---
+
+    def ltpData(self, exchange, tradingsymbol, symboltoken):
+        ltp = self.price(symboltoken)
+        if ltp is None:
+            return {"status": False, "message": f"No data for {symboltoken}", "errorcode": "AB1019", "data": None}
+        return {"status": True, "message": "SUCCESS", "data": {
+            "exchange": exchange, "tradingsymbol": tradingsymbol, "symboltoken": symboltoken, "ltp": ltp}}
+
+    def getMarketData(self, mode, exchangeTokens):
+        fetched, unfetched = [], []
+        for exchange, tokens in exchangeTokens.items():
+            for token in tokens:
+                ltp = self.price(token)
+                if ltp is None:
+                    unfetched.append({"exchange": exchange, "symbolToken": str(token), "message": "No data"})
+                    continue
+                symbol = self.contracts[token][4] if token in self.contracts else str(token)
+                fetched.append({"exchange": exchange, "tradingSymbol": symbol, "symbolToken": str(token), "ltp": ltp})
+        return {"status": True, "message": "SUCCESS", "data": {"fetched": fetched, "unfetched": unfetched}}
+
+    def getCandleData(self, historicParam):
+        token = str(historicParam['symboltoken'])
+        minutes = INTERVAL_MINUTES.get(historicParam['interval'])
+        if token not in self.store or minutes is None:
+            return {"status": False, "message": "No data", "errorcode": "AB1004", "data": None}
+
+        start = _seconds(datetime.datetime.strptime(historicParam['fromdate'], "%Y-%m-%d %H:%M"))
+        end = _seconds(datetime.datetime.strptime(historicParam['todate'], "%Y-%m-%d %H:%M"))
+        rows = self.store.candles(token, minutes, start, end, self.now_seconds())
+        data = [[_wall(ts).strftime(BROKER_TIME), o, h, l, c, int(v)] for ts, o, h, l, c, v in rows]
+        return {"status": True, "message": "SUCCESS", "data": data}
+
+    # --- Orders ---
+
+    def placeOrder(self, orderparams):
+        with self.lock:
+            order = {
+                "orderid": uuid.uuid4().hex[:15],
+                "variety": orderparams.get('variety', "NORMAL"),
+                "ordertype": orderparams.get('ordertype', "MARKET"),
+                "producttype": orderparams.get('producttype'),
+                "transactiontype": orderparams['transactiontype'],
+                "exchange": orderparams.get('exchange'),
+                "tradingsymbol": orderparams.get('tradingsymbol'),
+                "symboltoken": str(orderparams['symboltoken']),
+                "quantity": int(orderparams['quantity']),
+                "price": float(orderparams.get('price') or 0),
+                "triggerprice": float(orderparams.get('triggerprice') or 0),
+                "averageprice": 0.0,
+                "filledshares": "0",
+                "status": "open",
+                "text": "",
+                "updatetime": self.clock.now().strftime("%d-%b-%Y %H:%M:%S"),
+                "triggered": False,
+            }
+            self.orders.append(order)
+            self.by_id[order['orderid']] = order
+            self.route(order)
+            return order['orderid']
+
+    def route(self, order):
+        """A new order: filled now if marketable, else resting in the book"""
+        ltp = self.price(order['symboltoken'])
+        if ltp is None:
+            self.reject(order, "No market data for instrument")
+        elif order['ordertype'] == "MARKET":
+            self.fill(order, self.slipped(order, ltp))
+        elif order['ordertype'] == "LIMIT" and self.marketable(order, ltp):
+            self.fill(order, ltp)
+        else:
+            if order['ordertype'].startswith("STOPLOSS"):
+                order['status'] = "trigger pending"
+            self.pending.append(order)
+            self.publish(order)
+
+    def modifyOrder(self, orderparams):
+        with self.lock:
+            order = self.by_id.get(orderparams.get('orderid'))
+            if order is None or order not in self.pending:
+                return None
+            for field in ("price", "triggerprice"):
+                if field in orderparams: order[field] = float(orderparams[field])
+            if 'quantity' in orderparams: order['quantity'] = int(orderparams['quantity'])
+            if 'ordertype' in orderparams: order['ordertype'] = orderparams['ordertype']
+            self.publish(order)
+            return order['orderid']
+
+    def cancelOrder(self, order_id, variety):
+        with self.lock:
+            order = self.by_id.get(order_id)
+            if order is None or order not in self.pending:
+                return None
+            self.pending.remove(order)
+            order['status'] = "cancelled"
+            self.publish(order)
+            return order_id
+
+    def orderBook(self):
+        with self.lock:
+            return {"status": True, "message": "SUCCESS", "data": [dict(o) for o in self.orders]}
+
+    def rmsLimit(self):
+        with self.lock:
+            net = f"{self.cash:.2f}"
+        return {"status": True, "message": "SUCCESS", "data": {"net": net, "availableCash": net}}
+
+    def publish(self, order):
+        for callback in self.order_listeners:
+            try:
+                callback(dict(order))
+            except Exception as e:
+                logger.error(f"Backtest: Order listener error: {e}")
+
+    # --- Matching ---
+
+    def slipped(self, order, price):
+        slip = max(TICK, _tick(price * self.slippage))
+        return price + slip if order['transactiontype'] == "BUY" else max(TICK, price - slip)
+
+    @staticmethod
+    def marketable(order, price):
+        return price <= order['price'] if order['transactiontype'] == "BUY" else price >= order['price']
+
+    def reject(self, order, reason):
+        order['status'] = "rejected"
+        order['text'] = reason
+        self.publish(order)
+        logger.warning(f"Backtest: Order {order['orderid']} rejected ({reason})")
+
+    def fill(self, order, price, at=None):
+        """Executes the order at 'price' (at the clock's time unless 'at' is given)"""
+        price = _tick(price)
+        token = order['symboltoken']
+        qty = order['quantity'] if order['transactiontype'] == "BUY" else -order['quantity']
+        position = self.positions.get(token)
+        opening = position is None or position['qty'] == 0 or (position['qty'] > 0) == (qty > 0)
+        if qty > 0 and opening and qty * price + self.brokerage > self.cash:
+            return self.reject(order, "Insufficient funds")
+
+        now = at or self.clock.now()
+        order.update(status="complete", averageprice=price, filledshares=str(order['quantity']),
+                     updatetime=now.strftime("%d-%b-%Y %H:%M:%S"))
+        self.publish(order)
+        self.cash -= qty * price + self.brokerage
+        self.charges += self.brokerage
+        ltp = self.price(token, _seconds(now))
+        self.fills.append({'time': now, 'orderid': order['orderid'], 'symbol': order['tradingsymbol'], 'token': token,
+                           'side': order['transactiontype'], 'qty': order['quantity'], 'price': price,
+                           'ltp': ltp, 'slippage': abs(price - ltp) if ltp else 0.0, 'ordertype': order['ordertype']})
+
+        if position is None or position['qty'] == 0:
+            self.positions[token] = {'qty': qty, 'avg': price, 'opened': now, 'symbol': order['tradingsymbol']}
+        elif opening:
+            total = position['qty'] + qty
+            position['avg'] = (position['avg'] * position['qty'] + price * qty) / total
+            position['qty'] = total
+        else:
+            closed = min(abs(qty), abs(position['qty']))
+            direction = 1 if position['qty'] > 0 else -1
+            self.trades.append({
+                'entry_time': position['opened'], 'exit_time': now, 'symbol': position['symbol'],
+                'side': "LONG" if direction > 0 else "SHORT", 'qty': closed,
+                'entry_price': position['avg'], 'exit_price': price,
+                'pnl': round(closed * (price - position['avg']) * direction, 2),
+            })
+            position['qty'] += qty
+            if position['qty'] != 0 and (position['qty'] > 0) != (direction > 0):
+                # Reversed through zero: the remainder opens a new position at this fill
+                position.update(avg=price, opened=now)
+
+    def advance(self, target):
+        """SimulatedClock hook: matches resting orders against every minute completed before target"""
+        with self.lock:
+            if not self.pending: return
+            start, end = self.now_seconds(), _seconds(target)
+            for token in {o['symboltoken'] for o in self.pending}:
+                ts, path = self.bar_path(token, start, end)
+                for t, bar in zip(ts, path):
+                    resting = [o for o in self.pending if o['symboltoken'] == token]
+                    if not resting: break
+                    for order in resting:
+                        price = self.match(order, bar)
+                        if price is None: continue
+                        self.pending.remove(order)
+                        self.clock.current = min(target, _wall(t + 60))
+                        self.fill(order, price)
+
+    def match(self, order, bar):
+        """Fill price for a resting order over one (open, high, low, close) bar, or None"""
+        o, h, l, _ = bar
+        buy = order['transactiontype'] == "BUY"
+        if order['ordertype'].startswith("STOPLOSS") and not order['triggered']:
+            trigger = order['triggerprice']
+            if not (h >= trigger if buy else l <= trigger): return None
+            order['triggered'] = True
+            order['status'] = "open"
+            self.publish(order)
+            basis = max(o, trigger) if buy else min(o, trigger)
+            if order['ordertype'] == "STOPLOSS_MARKET":
+                return self.slipped(order, basis)
+            # Stop-limit: fills at the stop (with slippage) but never through the limit
+            if buy and l <= order['price']: return min(self.slipped(order, basis), order['price'])
+            if not buy and h >= order['price']: return max(self.slipped(order, basis), order['price'])
+            return None
+
+        limit = order['price']
+        if buy and l <= limit: return min(o, limit)
+        if not buy and h >= limit: return max(o, limit)
+        return None
+
+    # --- Sessions ---
+
+    def open_session(self, day, start):
+        """Moves the clock to 'start' on 'day'; nothing rests overnight (intraday only)"""
+        self.clock.set(datetime.datetime.combine(day, start))
+        self.clock.deadline = datetime.datetime.combine(day, datetime.time(15, 30))
+
+    def close_session(self, day):
+        """
+        Runs the clock to the broker's intraday square-off, cancels what still rests,
+        closes open positions at market and moves on to the close.
+        """
+        square_off = datetime.datetime.combine(day, datetime.time(*Config.BACKTEST_SQUARE_OFF))
+        if self.clock.now() > square_off:
+            # The strategy slept past it (SessionEnded at the deadline): the broker still closes at the square-off
+            self.clock.set(square_off)
+        else:
+            self.clock.advance_to(square_off)
+        with self.lock:
+            for order in list(self.pending):
+                self.cancelOrder(order['orderid'], order['variety'])
+            for token, position in self.positions.items():
+                if position['qty'] == 0: continue
+                self.placeOrder({
+                    "variety": "NORMAL", "tradingsymbol": position['symbol'], "symboltoken": token,
+                    "transactiontype": "SELL" if position['qty'] > 0 else "BUY", "exchange": "NFO",
+                    "ordertype": "MARKET", "producttype": "INTRADAY", "quantity": abs(position['qty']),
+                })
+                self.orders[-1]['text'] = "Auto square-off"
+        self.clock.set(datetime.datetime.combine(day, datetime.time(15, 30)))
+
+class BacktestTokenLookup:
+    """
+    TokenLookup stand-in for replays: NIFTY option chains with Config.BACKTEST_STRIKE_STEP
+    strikes within Config.BACKTEST_STRIKE_RANGE of the index, with tokens registered on the
+    BacktestAPI so they can be quoted and traded.
+    """
+    def __init__(self, api):
+        self.api = api
+
+    def load_scrip_master(self):
+        pass
+
+    def get_token(self, symbol_name, expiry_date, strike, option_type):
+        return self.api.register_contract(symbol_name, expiry_date, strike, option_type)
+
+    def get_tokens(self, contracts):
+        return [self.get_token(*contract) for contract in contracts]
+
+    def get_option_chain(self, symbol_name, expiry_date):
+        step, width = Config.BACKTEST_STRIKE_STEP, Config.BACKTEST_STRIKE_RANGE
+        spot = self.api.price(NIFTY_TOKEN) or 0
+        centre = int(round(spot / step) * step)
+        strikes = list(range(max(step, centre - width), centre + width + 1, step))
+        ce = [self.get_token(symbol_name, expiry_date, s, "CE") for s in strikes]
+        pe = [self.get_token(symbol_name, expiry_date, s, "PE") for s in strikes]
+        return OptionChain(symbol_name, expiry_date, strikes, ce, pe)
+
+class BacktestResult:
+    def __init__(self, api, sessions, elapsed):
+        self.trades = pd.DataFrame(api.trades, columns=['entry_time', 'exit_time', 'symbol', 'side', 'qty', 'entry_price', 'exit_price', 'pnl'])
+        self.fills = pd.DataFrame(api.fills, columns=['time', 'orderid', 'symbol', 'token', 'side', 'qty', 'price', 'ltp', 'slippage', 'ordertype'])
+        self.orders = api.orders
+        self.sessions = sessions
+        self.elapsed = elapsed
+        self.charges = api.charges
+        self.final_cash = api.cash
+
+        self.daily_pnl = pd.Series(0.0, index=sessions)
+        if not self.trades.empty:
+            by_day = self.trades.groupby(self.trades['exit_time'].dt.date)['pnl'].sum()
+            self.daily_pnl = by_day.reindex(sessions, fill_value=0.0)
+
+    def summary(self):
+        pnl = self.trades['pnl']
+        equity = self.daily_pnl.cumsum()
+        drawdown = float((equity.cummax().clip(lower=0) - equity).max()) if len(equity) else 0.0
+        return {
+            'sessions': len(self.sessions),
+            'trades': len(pnl),
+            'win_rate': round(float((pnl > 0).mean()), 3) if len(pnl) else 0.0,
+            'gross_pnl': round(float(pnl.sum()), 2),
+            'charges': round(self.charges, 2),
+            'net_pnl': round(float(pnl.sum()) - self.charges, 2),
+            'max_drawdown': round(drawdown, 2),
+            'avg_slippage': round(float(self.fills['slippage'].mean()), 2) if len(self.fills) else 0.0,
+            'elapsed': round(self.elapsed, 2),
+        }
+
+    def log_summary(self):
+        s = self.summary()
+        logger.info(f"Backtest: {s['sessions']} sessions in {s['elapsed']:.1f}s | Trades: {s['trades']} | Win rate: {s['win_rate']*100:.1f}%")
+        logger.info(f"Backtest: Gross P&L: {s['gross_pnl']:,.2f} | Charges: {s['charges']:,.2f} | Net P&L: {s['net_pnl']:,.2f} | "
+                    f"Max DD: {s['max_drawdown']:,.2f} | Avg slippage: {s['avg_slippage']:.2f}")
+
+class Backtester:
+    """
+    Replays stored history through an unchanged strategy class, one session at a time.
+
+    Each session gets a fresh strategy (strategy_cls(api, loader, dry_run=False, quotes=..., clock=...))
+    whose execute(expiry, action) runs against a BacktestAPI from Config.BACKTEST_START.
+    The strategy, its gatekeeper, position manager and data services all read the backtest's
+    SimulatedClock, so every sleep() just moves the clock. After execute() returns, the clock
+    runs on to the square-off: resting stops can still fill, and anything left open is closed
+    at market.
+
+    One-shot strategies (VWAP: analyse once, trade or stand aside) can be re-run every
+    'repeat' minutes until the square-off, as a scheduler would in a live session.
+    """
+    def __init__(self, store, strategy_cls, action="BUY", capital=None, slippage=None, brokerage=None, iv=None,
+                 start=None, repeat=None, quiet=True):
+        self.store = store
+        self.strategy_cls = strategy_cls
+        self.action = action
+        self.start = datetime.time(*(start or Config.BACKTEST_START))
+        self.repeat = repeat
+        self.quiet = quiet
+        self.clock = SimulatedClock()
+        self.api = BacktestAPI(store, self.clock, capital, slippage, brokerage, iv)
+        self.loader = BacktestTokenLookup(self.api)
+
+    def run(self, start=None, end=None):
+        sessions = [d for d in self.store.sessions() if (start is None or d >= start) and (end is None or d <= end)]
+        began = time.perf_counter()
+
+        with tempfile.TemporaryDirectory() as state_dir, self.isolated(state_dir):
+            for day in sessions:
+                self.run_session(day)
+
+        result = BacktestResult(self.api, sessions, time.perf_counter() - began)
+        result.log_summary()
+        return result
+
+    def run_session(self, day):
+        self.api.open_session(day, self.start)
+        # Candle and chain caches are process-wide; a replayed day must not see another day's bars
+        shared_candle_cache.clear()
+        shared_chain_cache.clear()
+
+        expiry = get_next_weekly_expiry(day)
+        square_off = datetime.datetime.combine(day, datetime.time(*Config.BACKTEST_SQUARE_OFF))
+        while True:
+            quotes = QuoteService(self.api, clock=self.clock)
+            strategy = self.strategy_cls(self.api, self.loader, dry_run=False, quotes=quotes, clock=self.clock)
+            try:
+                strategy.execute(expiry=expiry, action=self.action)
+            except SessionEnded:
+                logger.warning(f"Backtest: {self.strategy_cls.__name__} was still running at the close on {day}")
+                break
+            except Exception as e:
+                logger.error(f"Backtest: {self.strategy_cls.__name__} failed on {day}: {e}")
+
+            if not self.repeat: break
+            rerun = self.clock.now() + datetime.timedelta(minutes=self.repeat)
+            if rerun >= square_off: break
+            self.clock.advance_to(rerun)
+        self.api.close_session(day)
+
+    @contextlib.contextmanager
+    def isolated(self, state_dir):
+        """State files in a scratch directory and (quiet) no console chatter"""
+        state_file = getattr(self.strategy_cls, 'STATE_FILE', None)
+        if state_file:
+            self.strategy_cls.STATE_FILE = os.path.join(state_dir, os.path.basename(state_file))
+        level = logger.level
+        try:
+            with contextlib.ExitStack() as stack:
+                if self.quiet:
+                    logger.setLevel(logging.WARNING)
+                    stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+                yield
+        finally:
+            logger.setLevel(level)
+            if state_file:
+                self.strategy_cls.STATE_FILE = state_file
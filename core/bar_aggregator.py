@@ -0,0 +1,215 @@
+import datetime
+import threading
+from collections import deque
+import pandas as pd
+from config.settings import Config
+from core.data_fetcher import CANDLE_COLUMNS, _naive
+from utils.clock import system_clock
+from utils.logger import logger
+
+INTERVAL_MINUTES = {
+    "ONE_MINUTE": 1,
+    "THREE_MINUTE": 3,
+    "FIVE_MINUTE": 5,
+    "TEN_MINUTE": 10,
+    "FIFTEEN_MINUTE": 15,
+    "THIRTY_MINUTE": 30,
+}
+
+def bar_start(ts, minutes):
+    """Start of the bar containing ts. 09:15 is a multiple of 1/3/5/15 minutes, so midnight alignment matches NSE bars."""
+    minute_of_day = ts.hour * 60 + ts.minute
+    start = minute_of_day - minute_of_day % minutes
+    return ts.replace(hour=start // 60, minute=start % 60, second=0, microsecond=0)
+
+class BarAggregator:
+    """
+    Builds OHLCV bars for several timeframes at once from ticks (or polled LTPs) of one token.
+
+    Closed bars are kept per interval as (timestamp, open, high, low, close, volume) rows,
+    the same layout the DataFetcher returns, plus the bar currently forming. Listeners get
+    (interval, bar) the moment a bar closes. seed() loads the broker's bars once, with the
+    polled path's look-back (the previous session warms up the indicators), and today's
+    closed bars are periodically reconciled against the broker's (broker values win).
+    LTP ticks carry no volume, so locally built bars have volume 0.
+    """
+    def __init__(self, token, exchange="NSE", intervals=None, quotes=None, max_bars=None, clock=None):
+        self.token = str(token)
+        self.exchange = exchange
+        self.clock = clock or system_clock
+        self.intervals = list(intervals or Config.BAR_INTERVALS)
+        max_bars = max_bars or Config.CANDLE_CACHE_BARS
+
+        self.bars = {i: deque(maxlen=max_bars) for i in self.intervals}
+        self.forming = {i: None for i in self.intervals} # [ts, o, h, l, c, v]
+        self.closed_count = {i: 0 for i in self.intervals}
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.closed = threading.Condition(self.lock)
+
+        self.fetcher = None
+        self.seeded = False
+        self.mismatches = 0
+
+        if quotes is not None:
+            self.attach(quotes)
+
+    def attach(self, quotes):
+        """Feeds the aggregator from every QuoteService update (stream ticks or REST refreshes)"""
+        quotes.watch(self.exchange, self.token)
+        quotes.add_listener(self.on_quote)
+
+    def add_listener(self, callback):
+        """callback(interval, bar) runs when a bar closes; bar is (ts, o, h, l, c, v)"""
+        self.listeners.append(callback)
+
+    # --- Ticks ---
+
+    def on_quote(self, token, ltp, timestamp):
+        if token == self.token:
+            self.on_tick(ltp, datetime.datetime.fromtimestamp(timestamp))
+
+    def on_tick(self, ltp, ts, volume=0):
+        closed = []
+        with self.lock:
+            for interval in self.intervals:
+                start = bar_start(ts, INTERVAL_MINUTES[interval])
+                bar = self.forming[interval]
+                if bar is not None and start < bar[0]:
+                    continue # late tick for a bar that already closed
+
+                if bar is not None and start > bar[0]:
+                    closed.append((interval, self.close_bar(interval)))
+                    bar = None
+
+                if bar is None:
+                    self.forming[interval] = [start, ltp, ltp, ltp, ltp, volume]
+                else:
+                    bar[2] = max(bar[2], ltp)
+                    bar[3] = min(bar[3], ltp)
+                    bar[4] = ltp
+                    bar[5] += volume
+        self.emit(closed)
+
+    def check_close(self, now=None):
+        """Closes bars whose period has ended even if no tick arrived after it"""
+        now = now or self.clock.now()
+        closed = []
+        with self.lock:
+            for interval in self.intervals:
+                bar = self.forming[interval]
+                if bar is not None and now >= bar[0] + datetime.timedelta(minutes=INTERVAL_MINUTES[interval]):
+                    closed.append((interval, self.close_bar(interval)))
+        self.emit(closed)
+
+    def close_bar(self, interval):
+        # Caller holds the lock
+        bar = tuple(self.forming[interval])
+        self.bars[interval].append(bar)
+        self.forming[interval] = None
+        self.closed_count[interval] += 1
+        self.closed.notify_all()
+        return bar
+
+    def emit(self, closed):
+        for interval, bar in closed:
+            for callback in self.listeners:
+                try:
+                    callback(interval, bar)
+                except Exception as e:
+                    logger.error(f"Bars: Listener error: {e}")
+
+            if self.fetcher and self.closed_count[interval] % Config.BAR_RECONCILE_EVERY == 0:
+                timer = threading.Timer(Config.BAR_RECONCILE_DELAY, self.reconcile, args=([interval],))
+                timer.daemon = True
+                timer.start()
+
+    def wait_for_close(self, interval, timeout):
+        """Blocks until the next 'interval' bar closes (True) or timeout (False)"""
+        deadline = self.clock.now() + datetime.timedelta(seconds=timeout)
+        with self.lock:
+            count = self.closed_count[interval]
+        while self.clock.now() < deadline:
+            self.check_close()
+            with self.closed:
+                if self.closed_count[interval] != count: return True
+                remaining = (deadline - self.clock.now()).total_seconds()
+                self.closed.wait(min(1.0, max(0.0, remaining)))
+                if self.closed_count[interval] != count: return True
+        return False
+
+    # --- Broker bars ---
+
+    def seed(self, fetcher, days=1):
+        """
+        Loads the broker's bars once (one historical request per interval), looking back
+        'days' sessions like DataFetcher.fetch_latest_candles
+        """
+        if self.seeded: return
+        self.fetcher = fetcher
+        self.reconcile(days=days)
+        self.seeded = True
+
+    def reconcile(self, intervals=None, days=0):
+        """Merges the broker's bars (today's by default); returns how many local closed bars differed"""
+        mismatches = 0
+        for interval in intervals or self.intervals:
+            df = self.fetcher.fetch_latest_candles(self.token, interval=interval, days=days, exchange=self.exchange)
+            if df is None or df.empty: continue
+            rows = [
+                (_naive(r.timestamp).to_pydatetime(), float(r.open), float(r.high), float(r.low), float(r.close), float(r.volume))
+                for r in df.itertuples(index=False)
+            ]
+            mismatches += self.merge(interval, rows)
+
+        if mismatches:
+            self.mismatches += mismatches
+            logger.info(f"Bars: Reconciled {mismatches} local bars with broker data for {self.token}")
+        return mismatches
+
+    def merge(self, interval, rows, now=None):
+        now = now or self.clock.now()
+        length = datetime.timedelta(minutes=INTERVAL_MINUTES[interval])
+        mismatches = 0
+        with self.lock:
+            closed = {bar[0]: bar for bar in self.bars[interval]}
+            forming = self.forming[interval]
+            for row in rows:
+                ts = row[0]
+                if forming is not None and ts >= forming[0]:
+                    if ts == forming[0]:
+                        # Broker saw the start of the forming bar; keep our latest close
+                        forming[1] = row[1]
+                        forming[2] = max(forming[2], row[2])
+                        forming[3] = min(forming[3], row[3])
+                        forming[5] = max(forming[5], row[5])
+                    continue
+                if ts + length > now:
+                    # Broker's still-forming bar becomes ours
+                    self.forming[interval] = forming = list(row)
+                    continue
+
+                local = closed.get(ts)
+                if local is not None and any(abs(a - b) > 1e-6 for a, b in zip(local[1:5], row[1:5])):
+                    mismatches += 1
+                closed[ts] = tuple(row)
+
+            self.bars[interval].clear()
+            self.bars[interval].extend(sorted(closed.values()))
+        return mismatches
+
+    # --- Readers ---
+
+    def frame(self, interval, include_forming=False):
+        """Closed bars (plus the forming one) as a DataFrame with DataFetcher's columns"""
+        with self.lock:
+            rows = list(self.bars[interval])
+            if include_forming and self.forming[interval] is not None:
+                rows.append(tuple(self.forming[interval]))
+        return pd.DataFrame(rows, columns=CANDLE_COLUMNS)
+
+    def bar_at(self, interval, ts):
+        with self.lock:
+            for bar in reversed(self.bars[interval]):
+                if bar[0] == ts: return bar
+        return None
@@ -0,0 +1,217 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Config
+from core.order_service import OrderService
+from utils.clock import system_clock
+from utils.logger import logger
+
+class BasketExecutor:
+    """
+    Multi-leg entries placed side by side. Each leg gets a worker: the workers release their
+    MARKET orders together, each waits for its own fill on the shared OrderService and sends
+    its leg's protective stop as soon as that fill is known, so the stops go out side by side
+    as well.
+
+    Legs are dicts {'name', 'token', 'symbol', 'action', 'qty'} plus an optional 'exchange'
+    (default NFO) and 'stop': a function(fill_price) -> (trigger, price) for a STOPLOSS_LIMIT
+    order on the opposite side. execute() fills in each leg's 'order_id', 'fill_price',
+    'sl_order_id', 'sent_at' / 'filled_at' (clock time) and, with quotes, 'ref_price' (LTP
+    before sending) and 'slippage' (against the trader).
+
+    Every basket's leg skew goes to 'skews': the spread of the legs' send times, fill times
+    and slippage. log_metrics() summarises them.
+
+    An entry still working after fill_timeout (Config.ORDER_FILL_TIMEOUT) is cancelled; if it
+    filled meanwhile it is treated as filled and gets its stop. A basket that is only partly
+    on (a leg rejected or unfilled, or a filled leg left without its stop) is unwound when unwind_partial is set (Config.BASKET_UNWIND_PARTIAL): the filled
+    legs' stops are cancelled and the legs closed at market ('flattened'). The result's
+    'complete' says whether every leg filled and is protected.
+
+    place_market() / place_stop() are the order entry the strategies share.
+    """
+    def __init__(self, api, orders=None, quotes=None, clock=None, dry_run=False, unwind_partial=None, fill_timeout=None):
+        self.api = api
+        self.clock = clock or system_clock
+        self.orders = orders or OrderService(api, clock=self.clock)
+        self.quotes = quotes
+        self.dry_run = dry_run
+        self.unwind_partial = Config.BASKET_UNWIND_PARTIAL if unwind_partial is None else unwind_partial
+        self.fill_timeout = fill_timeout
+        self.skews = []
+
+    def execute(self, legs):
+        """Places every leg (and its stop) concurrently; returns {'legs', 'skew', 'complete'}"""
+        barrier = threading.Barrier(len(legs))
+        with ThreadPoolExecutor(max_workers=len(legs), thread_name_prefix="basket") as pool:
+            futures = [pool.submit(self.run_leg, leg, barrier) for leg in legs]
+            for future in futures:
+                future.result()
+        skew = self.record(legs)
+        complete = all(self.is_protected(leg) for leg in legs)
+        if not complete:
+            self.unwind(legs)
+        return {'legs': legs, 'skew': skew, 'complete': complete}
+
+    def run_leg(self, leg, barrier):
+        leg['ref_price'] = self.reference(leg)
+        barrier.wait() # all entry orders leave together
+        leg['sent_at'] = self.clock.time()
+        leg['order_id'] = self.place_market(leg['token'], leg['symbol'], leg['action'], leg['qty'], leg.get('exchange', "NFO"))
+        if not leg['order_id']: return leg
+
+        if self.dry_run:
+            leg['fill_price'] = leg['ref_price'] or 100.0 # Mock
+        else:
+            leg['fill_price'] = self.orders.wait_for_fill(leg['order_id'], self.fill_timeout)
+            if leg['fill_price'] is None and self.orders.status(leg['order_id']) not in OrderService.TERMINAL:
+                leg['fill_price'] = self.cancel_entry(leg)
+        leg['filled_at'] = self.clock.time()
+        if leg['fill_price'] is None:
+            print(f">>> [Basket] {leg['name']} leg not filled (status: {self.orders.status(leg['order_id'])}).")
+            return leg
+
+        if leg['ref_price']:
+            slip = leg['fill_price'] - leg['ref_price']
+            leg['slippage'] = round(slip if leg['action'] == "BUY" else -slip, 2)
+        if leg.get('stop'):
+            try:
+                trigger, price = leg['stop'](leg['fill_price'])
+            except Exception as e:
+                logger.error(f"Basket: No stop for {leg['symbol']} (fill {leg['fill_price']}): {e}")
+                return leg
+            leg['sl_order_id'] = self.place_stop(leg['token'], leg['symbol'], self.opposite(leg['action']),
+                                                 trigger, price, leg['qty'], leg.get('exchange', "NFO"))
+        return leg
+
+    def reference(self, leg):
+        if self.quotes is None: return None
+        try:
+            return self.quotes.get_ltp(leg['token'], leg.get('exchange', "NFO"), leg['symbol'])
+        except Exception as e:
+            logger.warning(f"Basket: No reference price for {leg['symbol']}: {e}")
+            return None
+
+    def cancel_entry(self, leg):
+        """
+        Cancels an entry still working after the fill timeout so it cannot fill later without a
+        stop. Returns the fill price if it filled before the cancel took effect, else None.
+        """
+        order_id = leg['order_id']
+        try:
+            self.api.cancelOrder(order_id, "NORMAL")
+        except Exception as e:
+            logger.error(f"Basket: Cancel of unfilled entry {order_id} ({leg['symbol']}) failed: {e}")
+        fill_price = self.orders.wait_for_fill(order_id, Config.ORDER_CANCEL_TIMEOUT)
+        status = self.orders.status(order_id, max_age=0)
+        if fill_price is not None:
+            logger.warning(f"Basket: {leg['symbol']} entry filled at {fill_price} while being cancelled")
+        elif status == 'cancelled':
+            leg['cancelled'] = True
+        else:
+            logger.error(f"Basket: {leg['symbol']} entry {order_id} is still '{status}' after cancelling; it may fill unprotected")
+        return fill_price
+
+    # --- Partial baskets ---
+
+    def is_protected(self, leg):
+        """Filled, and stopped if the leg asks for a stop"""
+        return leg.get('fill_price') is not None and (not leg.get('stop') or bool(leg.get('sl_order_id')))
+
+    def unwind(self, legs):
+        filled = [leg for leg in legs if leg.get('fill_price') is not None]
+        missing = ", ".join(leg['name'] for leg in legs if not self.is_protected(leg))
+        if not self.unwind_partial or not filled:
+            logger.error(f"Basket: Partial basket (not filled or unprotected: {missing}); filled legs left open")
+            return
+        logger.error(f"Basket: Partial basket (not filled or unprotected: {missing}). Closing the filled legs.")
+        for leg in filled:
+            if leg.get('sl_order_id') and not self.dry_run:
+                try:
+                    self.api.cancelOrder(leg['sl_order_id'], "STOPLOSS")
+                except Exception as e:
+                    logger.error(f"Basket: Cancel SL {leg['sl_order_id']} ({leg['symbol']}) failed: {e}")
+            leg['exit_order_id'] = self.place_market(leg['token'], leg['symbol'], self.opposite(leg['action']),
+                                                     leg['qty'], leg.get('exchange', "NFO"))
+            leg['flattened'] = bool(leg['exit_order_id'])
+            if not leg['flattened']:
+                logger.error(f"Basket: Could not close {leg['symbol']}; it is still open")
+
+    # --- Orders ---
+
+    @staticmethod
+    def opposite(action):
+        return "SELL" if action == "BUY" else "BUY"
+
+    def place_market(self, token, symbol, action, qty, exchange="NFO"):
+        if self.dry_run:
+            print(f">>> [Dry Run] Would place {action} MARKET Order for {symbol} (Token: {token})")
+            return "dry_run_id"
+        try:
+            order_id = self.api.placeOrder({
+                "variety": "NORMAL",
+                "tradingsymbol": symbol,
+                "symboltoken": token,
+                "transactiontype": action,
+                "exchange": exchange,
+                "ordertype": "MARKET",
+                "producttype": "INTRADAY",
+                "duration": "DAY",
+                "quantity": qty,
+            })
+            print(f">>> [Order] {action} {symbol} | ID: {order_id}")
+            return order_id
+        except Exception as e:
+            print(f">>> [Error] Place Order ({symbol}): {e}")
+            return None
+
+    def place_stop(self, token, symbol, action, trigger_price, price, qty, exchange="NFO"):
+        """STOPLOSS_LIMIT order; 'action' is the stop's side (BUY covers a short)"""
+        if self.dry_run:
+            print(f">>> [Dry Run] Would place SL for {symbol} | Trig: {trigger_price}")
+            return "dry_run_sl_id"
+        try:
+            order_id = self.api.placeOrder({
+                "variety": "STOPLOSS",
+                "tradingsymbol": symbol,
+                "symboltoken": token,
+                "transactiontype": action,
+                "exchange": exchange,
+                "ordertype": "STOPLOSS_LIMIT",
+                "producttype": "INTRADAY",
+                "duration": "DAY",
+                "triggerprice": trigger_price,
+                "price": price,
+                "quantity": qty,
+            })
+            print(f">>> [Risk] SL Placed {symbol} | Trig: {trigger_price} | ID: {order_id}")
+            return order_id
+        except Exception as e:
+            print(f">>> [Error] SL Place ({symbol}): {e}")
+            return None
+
+    # --- Leg skew ---
+
+    def record(self, legs):
+        """Spread between the legs: send and fill times (seconds), slippage (rupees)"""
+        sent = [leg['sent_at'] for leg in legs if leg.get('order_id')]
+        filled = [leg['filled_at'] for leg in legs if leg.get('fill_price') is not None]
+        slippage = [leg['slippage'] for leg in legs if leg.get('slippage') is not None]
+        skew = {
+            'legs': len(legs),
+            'filled': len(filled),
+            'send_skew': max(sent) - min(sent) if sent else None,
+            'fill_skew': max(filled) - min(filled) if filled else None,
+            'price_skew': round(max(slippage) - min(slippage), 2) if slippage else None,
+        }
+        self.skews.append(skew)
+        fill_skew = f"{skew['fill_skew'] * 1000:.0f}ms" if skew['fill_skew'] is not None else "n/a"
+        price_skew = f"₹{skew['price_skew']}" if skew['price_skew'] is not None else "n/a"
+        logger.info(f"Basket: {skew['filled']}/{skew['legs']} legs filled | fill skew {fill_skew} | price skew {price_skew}")
+        return skew
+
+    def log_metrics(self):
+        timed = [s['fill_skew'] for s in self.skews if s['filled'] > 1]
+        priced = [s['price_skew'] for s in self.skews if s['price_skew'] is not None]
+        if not timed: return
+        logger.info(f"Basket: {len(self.skews)} baskets | fill skew avg {sum(timed) / len(timed) * 1000:.0f}ms, "
+                    f"max {max(timed) * 1000:.0f}ms" + (f" | price skew avg ₹{sum(priced) / len(priced):.2f}" if priced else ""))
@@ -1,20 +1,100 @@
-import time
 import datetime
+import threading
+from collections import deque
 import pandas as pd
+from config.settings import Config
+from utils.clock import system_clock
 from utils.logger import logger
 
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+def _naive(ts):
+    # Broker timestamps carry +05:30; compare on local wall-clock time
+    return ts.replace(tzinfo=None) if ts.tzinfo is not None else ts
+
+class CandleCache:
+    """
+    Parsed candles per (exchange, token, interval), shared by every DataFetcher.
+    Each series is a bounded ring buffer of (timestamp, open, high, low, close, volume)
+    plus the earliest time it covers, so callers only need to fetch newer bars.
+    """
+    def __init__(self, max_bars=None):
+        self.max_bars = max_bars or Config.CANDLE_CACHE_BARS
+        self.series = {} # {key: deque of rows}
+        self.covered_from = {} # {key: naive datetime of the first requested bar}
+        self.lock = threading.Lock()
+
+    def resume_from(self, key, window_start):
+        """
+        Timestamp to resume fetching from (the last cached bar, which may still be forming),
+        or None if the cache cannot serve this window and a full fetch is needed.
+        """
+        with self.lock:
+            bars = self.series.get(key)
+            if not bars or self.covered_from[key] > window_start:
+                return None
+            return bars[-1][0]
+
+    def merge(self, key, rows, window_start=None):
+        """
+        Appends freshly parsed rows. Cached bars at or after the first new timestamp
+        are replaced (the previous last bar was still forming).
+        window_start is given for a full fetch and resets the series.
+        """
+        with self.lock:
+            if window_start is not None or key not in self.series:
+                self.series[key] = deque(maxlen=self.max_bars)
+                self.covered_from[key] = window_start
+            bars = self.series[key]
+
+            if rows:
+                first_ts = rows[0][0]
+                while bars and bars[-1][0] >= first_ts:
+                    bars.pop()
+                bars.extend(rows)
+
+            # A full ring buffer no longer covers its original start
+            if len(bars) == bars.maxlen:
+                self.covered_from[key] = _naive(bars[0][0])
+
+    def frame(self, key, since=None):
+        with self.lock:
+            rows = list(self.series.get(key, ()))
+        if since is not None:
+            rows = [r for r in rows if _naive(r[0]) >= since]
+        return pd.DataFrame(rows, columns=CANDLE_COLUMNS)
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+            self.covered_from.clear()
+
+# One cache for the whole process: every strategy's DataFetcher reads the same series
+shared_candle_cache = CandleCache()
+
 class DataFetcher:
-    def __init__(self, api):
+    def __init__(self, api, cache=None, clock=None):
         self.api = api
+        self.cache = cache or shared_candle_cache
+        self.clock = clock or system_clock
 
     def fetch_latest_candles(self, symbol_token, interval="FIVE_MINUTE", days=1, exchange="NSE"):
         """
         Fetches historic candle data and returns a DataFrame.
+        Only bars from the last cached timestamp onwards are requested; older bars
+        come from the shared CandleCache.
         """
         max_retries = 3
-        now = datetime.datetime.now()
+        now = self.clock.now()
         # Look back 'days' to ensure we have data, but usually strictly for today/intraday
-        from_date = (now - datetime.timedelta(days=days)).strftime("%Y-%m-%d 09:15")
+        window_start = (now - datetime.timedelta(days=days)).replace(hour=9, minute=15, second=0, microsecond=0)
+        key = (exchange, symbol_token, interval)
+
+        resume_ts = self.cache.resume_from(key, window_start)
+        if resume_ts is not None:
+            from_date = resume_ts.strftime("%Y-%m-%d %H:%M")
+        else:
+            from_date = window_start.strftime("%Y-%m-%d %H:%M")
         to_date = now.strftime("%Y-%m-%d %H:%M")
 
         historicParam = {
@@ -27,27 +107,29 @@ class DataFetcher:
 
         for attempt in range(max_retries):
             try:
-                # Rate limit protection
-                time.sleep(0.5) 
-                
+                # Throttling is handled by the shared RateLimiter around the api
                 response = self.api.getCandleData(historicParam)
-                
+
                 if response and response.get('status') and response.get('data'):
-                    columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-                    df = pd.DataFrame(response['data'], columns=columns)
-                    
-                    # Convert columns to proper types
-                    df['timestamp'] = pd.to_datetime(df['timestamp'])
-                    df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].apply(pd.to_numeric)
-                    
-                    return df
+                    rows = self.parse_candles(response['data'])
+                    self.cache.merge(key, rows, window_start=None if resume_ts is not None else window_start)
+                    return self.cache.frame(key, since=window_start)
                 else:
                     logger.warning(f"Fetch Candles Failed (Attempt {attempt+1}): {response}")
-            
+
             except Exception as e:
                 logger.error(f"Fetch Candles Error (Attempt {attempt+1}): {e}")
-                
+
             if attempt < max_retries - 1:
-                time.sleep(1)
+                self.clock.sleep(1)
 
         return None
+
+    @staticmethod
+    def parse_candles(data):
+        """[[ts, o, h, l, c, v], ...] -> list of typed row tuples (only the new bars get parsed)"""
+        timestamps = pd.to_datetime([c[0] for c in data])
+        return [
+            (ts, float(c[1]), float(c[2]), float(c[3]), float(c[4]), float(c[5]))
+            for ts, c in zip(timestamps, data)
+        ]
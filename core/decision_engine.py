@@ -1,12 +1,32 @@
 import datetime
-import time
 from config.settings import Config
 from core.safety_checks import SafetyGatekeeper
+from utils.clock import system_clock
 
 class DecisionEngine:
-    def __init__(self, api):
+    VIX_TOKEN = "99926017"
+
+    def __init__(self, api, quotes=None, surface=None, clock=None):
         self.api = api
-        self.gatekeeper = SafetyGatekeeper(self.api)
+        self.quotes = quotes
+        self.surface = surface # VolSurface (optional): ATM IV for the volatility regime
+        self.clock = clock or system_clock
+        self.gatekeeper = SafetyGatekeeper(self.api, quotes, clock=self.clock)
+
+    def market_volatility(self, wait=2.0):
+        """
+        Volatility regime in vol points: ATM IV of the nearest expiry from the surface
+        (already solved, so no extra requests), else India VIX. None if neither is available.
+        """
+        if self.surface is not None and self.surface.wait_ready(wait):
+            iv = self.surface.atm_iv(now=self.clock.now())
+            if iv is not None:
+                return "ATM IV", iv * 100
+        if self.quotes is not None:
+            vix = self.quotes.get_ltp(self.VIX_TOKEN, "NSE", "INDIA VIX")
+            if vix is not None:
+                return "India VIX", vix
+        return None
 
     def analyze_and_select(self):
         """
@@ -25,7 +45,7 @@ class DecisionEngine:
             return None
 
         # 2. Check Time
-        now = datetime.datetime.now().time()
+        now = self.clock.now().time()
         print(f">>> [Brain] Current Time: {now}")
 
         # Rule A: Market Opening (09:15 - 09:20) -> OHL Scalp
@@ -34,14 +54,16 @@ class DecisionEngine:
             return "OHL"
 
         # Rule B: High VIX -> Momentum (Trend Following)
-        # Check VIX
         try:
-            # Reusing VIX logic from Gatekeeper or just checking here
-            # Ideally Gatekeeper has a helper, but let's just make a quick check or use default
-            # For efficiency we might assume VIX check happens inside strategies, but Brain should know.
-            # Let's use a simplified check or assume VIX behavior from Gatekeeper.
-            pass
-        except: pass
+            regime = self.market_volatility()
+            if regime:
+                source, vol = regime
+                print(f">>> [Brain] Volatility ({source}): {vol:.2f}")
+                if vol > Config.REGIME_HIGH_VOL and now >= datetime.time(9, 20):
+                    print(f">>> [Brain] 🌪️ High Volatility (> {Config.REGIME_HIGH_VOL}). Selected: Momentum")
+                    return "MOMENTUM"
+        except Exception as e:
+            print(f">>> [Brain] ⚠️ Volatility check failed: {e}")
 
         # 3. Strategy Selection Matrix
         
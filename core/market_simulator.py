@@ -0,0 +1,373 @@
+import collections
+import datetime
+import functools
+import zlib
+import numpy as np
+from config.settings import Config
+from core.backtest import (BacktestAPI, HistoricalStore, NIFTY_TOKEN, VIX_TOKEN, TICK, BROKER_TIME,
+                           _seconds, _wall)
+from core.bar_aggregator import INTERVAL_MINUTES
+from core.rate_limiter import RateLimitedAPI
+from utils import black_scholes as bs
+from utils.clock import system_clock
+
+SESSION_OPEN = datetime.time(9, 15)
+SESSION_SECONDS = 375 * 60 # 09:15:00 - 15:29:59, one tick per second
+
+# Responses for injected failures (the broker's generic error) and rate-limit rejections
+FAILURE = {"status": False, "message": "Something Went Wrong, Please Try After Sometime", "errorcode": "AB1004", "data": None}
+ORDER_CALLS = ("placeOrder", "modifyOrder", "cancelOrder") # return the order id, None on failure
+
+class SimulatedAPIError(Exception):
+    """Raised where SmartConnect raises: the broker answered with a non-JSON body (rate-limit rejections)"""
+    pass
+
+def endpoint(method):
+    """
+    A SmartAPI call on the simulator: injected latency, rate-limit rejections and errors
+    first, then resting orders are matched up to the clock's time, then the call itself.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def call(self, *args, **kwargs):
+        if self.inject_faults(name):
+            return None if name in ORDER_CALLS else dict(FAILURE)
+        self.advance(self.clock.now())
+        return method(self, *args, **kwargs)
+    return call
+
+def session_days(end, count):
+    """'count' weekdays before 'end', then 'end' itself (oldest first)"""
+    days, day = [end], end
+    while len(days) <= count:
+        day -= datetime.timedelta(days=1)
+        if day.weekday() < 5:
+            days.insert(0, day)
+    return days
+
+def ticks_from_bars(ts, ohlcv):
+    """
+    Per-second path through 1-minute bars: open at :00, the bar's first extreme at :20 (the
+    low on an up bar, the high on a down bar), the other at :40 and the close at :59, linear
+    in between. Volume is spread evenly. Returns (ts, prices, volumes).
+    """
+    o, h, l, c, v = ohlcv.T
+    up = c >= o
+    anchors = np.column_stack([o, np.where(up, l, h), np.where(up, h, l), c])
+    second = np.arange(60)
+    segment = np.minimum(second // 20, 2)
+    frac = (second - segment * 20) / np.array([20.0, 20.0, 19.0])[segment]
+    prices = anchors[:, segment] + (anchors[:, segment + 1] - anchors[:, segment]) * frac
+    return ((ts[:, None] + second).ravel(), prices.ravel(), np.repeat(v / 60.0, 60))
+
+class MarketSimulator(BacktestAPI):
+    """
+    SmartConnect-compatible simulated market that runs on any clock (the real one in --test,
+    a SimulatedClock in tests and load runs).
+
+    The Nifty index and India VIX follow one consistent per-second path: seeded GBM sessions
+    (VIX mean-reverting, moving against the index) or stored 1-minute history replayed onto
+    today and the preceding weekdays. Option contracts registered through the token lookup
+    are priced with Black-Scholes from those two paths; any other token gets its own seeded
+    path. Quotes, candles (the forming bar included) and resting-order matching all read the
+    same ticks, so a stop fills at the tick that crossed it.
+
+    Orders move through the broker's states: 'open' (MARKET orders too while fill_delay
+    seconds run), 'trigger pending' -> 'open' -> 'complete' for stops, 'cancelled' and
+    'rejected'; fills, funds and positions are BacktestAPI's.
+
+    Faults are off unless asked for: 'latency' seconds per call (or a (min, max) range),
+    'error_rate' (a fraction of calls answered with the broker's generic error, plus
+    fail_next() for exact scripts) and 'rate_limits' (calls over Config.RATE_LIMITS' per-second
+    rate raise SimulatedAPIError, as SmartConnect does on the broker's rejection).
+    """
+    def __init__(self, clock=None, seed=None, spot=None, vix=None, days=None, history=None,
+                 latency=None, error_rate=None, rate_limits=None, fill_delay=None, **options):
+        clock = clock or system_clock
+        super().__init__(HistoricalStore(), clock, **options)
+        self.seed = Config.MOCK_SEED if seed is None else seed
+        self.rng = np.random.default_rng(self.seed)
+        self.entropy = int(self.rng.integers(2 ** 32))
+        self.latency = Config.MOCK_LATENCY if latency is None else latency
+        self.error_rate = Config.MOCK_ERROR_RATE if error_rate is None else error_rate
+        self.fill_delay = Config.MOCK_FILL_DELAY if fill_delay is None else fill_delay
+        rate_limits = Config.MOCK_RATE_LIMIT if rate_limits is None else rate_limits
+        self.rate_limits = (Config.RATE_LIMITS if rate_limits is True else rate_limits) or {}
+        self.calls = collections.defaultdict(collections.deque) # {endpoint class: call times in the last second}
+        self.failures = collections.Counter() # {method: calls still to fail}
+        self.fault_log = []
+
+        days = session_days(clock.today(), Config.MOCK_HISTORY_DAYS if days is None else days)
+        if history is None:
+            self.simulate(days, Config.MOCK_SPOT if spot is None else spot, Config.MOCK_VIX if vix is None else vix)
+        else:
+            self.replay(history, days)
+        self.matched = _seconds(clock.now())
+
+    # --- Paths ---
+
+    def simulate(self, days, spot, vix):
+        """Seeded GBM sessions: per-second index moves at the day's VIX, VIX moving against the index"""
+        ts, spots, vixes, volumes = [], [], [], []
+        second = np.arange(SESSION_SECONDS)
+        minute = np.arange(SESSION_SECONDS // 60)
+        for n, day in enumerate(days):
+            if n:
+                # Overnight: a gap of ~0.4 daily sigmas, VIX pulled back towards its base
+                spot *= np.exp(self.rng.normal(0, 0.4 * vix / 100 / np.sqrt(252)))
+                vix = Config.MOCK_VIX * (vix / Config.MOCK_VIX) ** 0.7 * np.exp(self.rng.normal(0, 0.05))
+            shocks = self.rng.normal(size=SESSION_SECONDS - 1)
+            sigma = vix / 100 / np.sqrt(252 * SESSION_SECONDS)
+            path = spot * np.exp(np.r_[0.0, np.cumsum(sigma * shocks - 0.5 * sigma * sigma)])
+            # VIX: 8% daily vol of vol, -0.7 correlated with the index
+            vix_shocks = -0.7 * shocks + np.sqrt(1 - 0.49) * self.rng.normal(size=SESSION_SECONDS - 1)
+            vix_path = vix * np.exp(np.r_[0.0, np.cumsum(0.08 / np.sqrt(SESSION_SECONDS) * vix_shocks)])
+            # Index volume per minute: U-shaped through the day
+            x = minute / len(minute)
+            per_minute = 150000 * (1 + 8 * (x - 0.5) ** 2) * self.rng.lognormal(0, 0.3, len(minute))
+
+            ts.append(_seconds(datetime.datetime.combine(day, SESSION_OPEN)) + second)
+            spots.append(np.round(path, 2))
+            vixes.append(np.round(vix_path, 4))
+            volumes.append(np.repeat(per_minute / 60, 60))
+            spot, vix = path[-1], vix_path[-1]
+
+        self.grid = np.concatenate(ts)
+        self.ticks = {
+            NIFTY_TOKEN: (self.grid, np.concatenate(spots), np.concatenate(volumes)),
+            VIX_TOKEN: (self.grid, np.concatenate(vixes), np.zeros(len(self.grid))),
+        }
+
+    def replay(self, store, days):
+        """Stored 1-minute sessions (the most recent ones) moved onto 'days', as per-second ticks"""
+        sessions = store.sessions()[-len(days):]
+        days = days[-len(sessions):]
+        parts = collections.defaultdict(list)
+        for session, day in zip(sessions, days):
+            start = _seconds(datetime.datetime.combine(session, datetime.time()))
+            shift = (day - session).days * 86400
+            for token in (NIFTY_TOKEN, VIX_TOKEN):
+                if token not in store: continue
+                ts, ohlcv = store.series[token]
+                lo, hi = np.searchsorted(ts, [start, start + 86400])
+                parts[token].append(ticks_from_bars(ts[lo:hi] + shift, ohlcv[lo:hi]))
+
+        self.grid = np.concatenate([p[0] for p in parts[NIFTY_TOKEN]])
+        self.ticks = {NIFTY_TOKEN: tuple(np.concatenate(column) for column in zip(*parts[NIFTY_TOKEN]))}
+        if parts[VIX_TOKEN]:
+            vix_ts, vix, _ = (np.concatenate(column) for column in zip(*parts[VIX_TOKEN]))
+            vix = np.interp(self.grid, vix_ts, vix)
+        else:
+            vix = np.full(len(self.grid), Config.MOCK_VIX)
+        self.ticks[VIX_TOKEN] = (self.grid, vix, np.zeros(len(self.grid)))
+
+    def listing(self, token):
+        """Token outside the index, VIX and registered contracts: its own seeded path on the tick grid"""
+        if token not in self.ticks:
+            rng = np.random.default_rng([self.entropy, zlib.crc32(token.encode())])
+            steps = rng.normal(0, 0.001, len(self.grid) - 1)
+            prices = Config.MOCK_INSTRUMENT_PRICE * np.exp(np.r_[0.0, np.cumsum(steps)])
+            volume = rng.lognormal(0, 0.5, len(self.grid)) * 50
+            self.ticks[token] = (self.grid, np.maximum(TICK, np.round(prices / TICK) * TICK), volume)
+        return token
+
+    def index(self, now):
+        """Position of the tick in force at 'now' (the previous close before the open)"""
+        return max(0, int(np.searchsorted(self.grid, now, 'right')) - 1)
+
+    @staticmethod
+    def session_open(now):
+        return _seconds(datetime.datetime.combine(_wall(now).date(), SESSION_OPEN))
+
+    def window(self, token, start, end):
+        """(ts, prices, volumes) of the token's ticks in [start, end)"""
+        lo, hi = np.searchsorted(self.grid, [start, end])
+        if token in self.contracts:
+            # Option volume follows the index's, at a tenth
+            return self.grid[lo:hi], self.premiums(token, lo, hi), self.ticks[NIFTY_TOKEN][2][lo:hi] * 0.1
+        ts, prices, volume = self.ticks[self.listing(token)]
+        return ts[lo:hi], prices[lo:hi], volume[lo:hi]
+
+    def premiums(self, token, lo, hi):
+        """Black-Scholes premiums of a contract along ticks lo:hi of the index and VIX"""
+        if hi <= lo: return np.empty(0)
+        _, expiry, strike, option_type, _ = self.contracts[token]
+        ts = self.grid[lo:hi]
+        t = np.maximum(bs.time_to_expiry(expiry, _wall(ts[0])) - (ts - ts[0]) / bs.YEAR_SECONDS, bs.MIN_TIME)
+        premium = bs.price(self.ticks[NIFTY_TOKEN][1][lo:hi], strike, t, self.ticks[VIX_TOKEN][1][lo:hi] / 100.0, option_type == "CE")
+        return np.maximum(TICK, np.round(np.round(premium / TICK) * TICK, 2))
+
+    # --- Prices ---
+
+    def volatility(self, now):
+        return float(self.ticks[VIX_TOKEN][1][self.index(now)]) / 100.0
+
+    def price(self, token, now=None):
+        token = str(token)
+        now = self.now_seconds() if now is None else now
+        i = self.index(now)
+        if token in self.contracts:
+            return self.option_premium(token, float(self.ticks[NIFTY_TOKEN][1][i]), now)
+        return float(self.ticks[self.listing(token)][1][i])
+
+    def open_interest(self, token, now):
+        """Contracts: OI heaviest near the money and on the OTM side, building through the session"""
+        elapsed = min(1.0, max(0.0, (now - self.session_open(now)) / SESSION_SECONDS))
+        if token in self.contracts:
+            _, _, strike, option_type, _ = self.contracts[token]
+            spot = self.price(NIFTY_TOKEN, now)
+            otm = (strike >= spot) == (option_type == "CE")
+            base = 200000 + 6000000 * np.exp(-0.5 * ((strike - spot) / 400) ** 2) * (1.3 if otm else 0.8)
+        else:
+            base = 500000 + zlib.crc32(token.encode()) % 4500000
+        lots = int(base * (0.6 + 0.4 * elapsed) / Config.NIFTY_LOT_SIZE)
+        return lots * Config.NIFTY_LOT_SIZE
+
+    # --- Faults ---
+
+    def fail_next(self, method, count=1):
+        """The next 'count' calls to 'method' get the broker's error response"""
+        with self.lock:
+            self.failures[method] += count
+
+    def inject_faults(self, name):
+        """Latency, then rate-limit rejection (raises), then errors. True if the call fails."""
+        latency = self.latency
+        if latency:
+            if isinstance(latency, (tuple, list)):
+                with self.lock:
+                    latency = float(self.rng.uniform(*latency))
+            self.clock.sleep(latency)
+
+        with self.lock:
+            endpoint_class = RateLimitedAPI.ENDPOINTS.get(name)
+            if endpoint_class in self.rate_limits:
+                now = self.clock.time()
+                calls = self.calls[endpoint_class]
+                while calls and calls[0] <= now - 1.0:
+                    calls.popleft()
+                if len(calls) >= self.rate_limits[endpoint_class][0]:
+                    self.fault_log.append((self.clock.now(), name, "rate limit"))
+                    raise SimulatedAPIError("Access denied because of exceeding access rate")
+                calls.append(now)
+
+            if self.failures[name] > 0:
+                self.failures[name] -= 1
+            elif not (self.error_rate and self.rng.random() < self.error_rate):
+                return False
+            self.fault_log.append((self.clock.now(), name, "error"))
+            return True
+
+    # --- Market data ---
+
+    @endpoint
+    def ltpData(self, exchange, tradingsymbol, symboltoken):
+        return super().ltpData(exchange, tradingsymbol, symboltoken)
+
+    @endpoint
+    def getMarketData(self, mode, exchangeTokens):
+        now = self.now_seconds()
+        fetched = []
+        for exchange, tokens in exchangeTokens.items():
+            for token in tokens:
+                token = str(token)
+                symbol = self.contracts[token][4] if token in self.contracts else token
+                quote = {"exchange": exchange, "tradingSymbol": symbol, "symbolToken": token, "ltp": self.price(token, now)}
+                if mode == "FULL":
+                    quote["opnInterest"] = self.open_interest(token, now)
+                    quote["tradeVolume"] = int(self.window(token, self.session_open(now), now + 1)[2].sum())
+                fetched.append(quote)
+        return {"status": True, "message": "SUCCESS", "data": {"fetched": fetched, "unfetched": []}}
+
+    @endpoint
+    def getCandleData(self, historicParam):
+        token = str(historicParam['symboltoken'])
+        minutes = INTERVAL_MINUTES.get(historicParam['interval'])
+        if minutes is None:
+            return {"status": False, "message": "Invalid interval", "errorcode": "AB1004", "data": None}
+
+        length = minutes * 60
+        start = _seconds(datetime.datetime.strptime(historicParam['fromdate'], "%Y-%m-%d %H:%M"))
+        end = _seconds(datetime.datetime.strptime(historicParam['todate'], "%Y-%m-%d %H:%M"))
+        # Bars starting in [start, end], the forming one built from the ticks traded so far
+        first = -(-start // length) * length
+        last = end - end % length + length
+        ts, prices, volume = self.window(token, first, min(last, self.now_seconds() + 1))
+        if not len(ts):
+            return {"status": True, "message": "SUCCESS", "data": []}
+        bucket = ts // length
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        ends = np.r_[starts[1:], len(ts)] - 1
+        data = [[_wall(b * length).strftime(BROKER_TIME), float(o), float(h), float(l), float(c), int(v)]
+                for b, o, h, l, c, v in zip(bucket[starts], prices[starts], np.maximum.reduceat(prices, starts),
+                                            np.minimum.reduceat(prices, starts), prices[ends], np.add.reduceat(volume, starts))]
+        return {"status": True, "message": "SUCCESS", "data": data}
+
+    # --- Orders ---
+
+    @endpoint
+    def placeOrder(self, orderparams):
+        return super().placeOrder(orderparams)
+
+    @endpoint
+    def modifyOrder(self, orderparams):
+        return super().modifyOrder(orderparams)
+
+    @endpoint
+    def cancelOrder(self, order_id, variety):
+        return super().cancelOrder(order_id, variety)
+
+    @endpoint
+    def orderBook(self):
+        return super().orderBook()
+
+    @endpoint
+    def rmsLimit(self):
+        return super().rmsLimit()
+
+    def route(self, order):
+        if order['ordertype'] == "MARKET" and self.fill_delay:
+            # Acknowledged now, executed at the first tick after the exchange round trip
+            order['due'] = self.now_seconds() + self.fill_delay
+            self.pending.append(order)
+            self.publish(order)
+            return
+        super().route(order)
+
+    # --- Matching ---
+
+    def advance(self, target):
+        """Matches resting orders against every tick from the last match up to 'target' (a datetime)"""
+        with self.lock:
+            start, end = self.matched, _seconds(target)
+            if end <= start: return
+            self.matched = end
+            fills = [hit for hit in (self.first_fill(order, start, end) for order in list(self.pending)) if hit]
+            for at, order, price in sorted(fills, key=lambda hit: hit[0]):
+                self.pending.remove(order)
+                self.fill(order, price, at=_wall(at))
+
+    def first_fill(self, order, start, end):
+        """(tick time, order, fill price) of the order's first execution in (start, end], or None"""
+        ts, prices, _ = self.window(order['symboltoken'], start + 1, end + 1)
+        if order['ordertype'] == "MARKET":
+            i = int(np.searchsorted(ts, order['due']))
+            return (ts[i], order, self.slipped(order, prices[i])) if i < len(ts) else None
+
+        i = 0
+        while i < len(ts):
+            buy = order['transactiontype'] == "BUY"
+            if order['ordertype'].startswith("STOPLOSS") and not order['triggered']:
+                crossed = prices[i:] >= order['triggerprice'] if buy else prices[i:] <= order['triggerprice']
+            else:
+                crossed = prices[i:] <= order['price'] if buy else prices[i:] >= order['price']
+            hits = np.flatnonzero(crossed)
+            if not len(hits): return None
+            i += int(hits[0])
+            p = float(prices[i])
+            price = self.match(order, (p, p, p, p))
+            if price is not None:
+                return ts[i], order, price
+            i += 1 # stop triggered, its limit not marketable yet
+        return None
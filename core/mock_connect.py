@@ -1,10 +1,15 @@
-import random
-import uuid
+from core.backtest import BacktestTokenLookup
+from core.market_simulator import MarketSimulator
 
-class MockSmartConnect:
-    def __init__(self, api_key=None):
+class MockSmartConnect(MarketSimulator):
+    """
+    Mock session for --test: a MarketSimulator on the real clock (simulated Nifty / India VIX
+    ticks, option premiums, candles and an order book; faults as set in Config.MOCK_*).
+    Keyword arguments go to MarketSimulator (seed, history, latency, error_rate, ...).
+    """
+    def __init__(self, api_key=None, **options):
+        super().__init__(**options)
         self.api_key = api_key
-        self.orders = [] # Mock Order Book
         print(f">>> [Mock] Initialized MockSmartConnect with API Key: {api_key}")
 
     def generateSession(self, clientCode, password, totp):
@@ -20,72 +25,17 @@ class MockSmartConnect:
             }
         }
 
-    def ltpData(self, exchange, tradingsymbol, symboltoken):
-        print(f">>> [Mock] ltpData called for {tradingsymbol} ({symboltoken})")
-        # Return a hardcoded/random Nifty spot price so the strategy believes the market is open.
-        # Nifty is typically around 23000 these days (as per user request example).
-        mock_ltp = 23000.0 + random.uniform(-50, 50)
-        return {
-            "status": True,
-            "data": {
-                "ltp": mock_ltp,
-                "exchange": exchange,
-                "tradingsymbol": tradingsymbol,
-                "symboltoken": symboltoken
-            }
-        }
-
     def placeOrder(self, orderparams):
         print(f">>> [Mock] placeOrder called")
         print(f"    Symbol: {orderparams.get('tradingsymbol')}")
         print(f"    Action: {orderparams.get('transactiontype')}")
         print(f"    Product: {orderparams.get('producttype')}")
-        
-        mock_order_id = str(uuid.uuid4())
-        
-        # Simulate a filled order and add to internal book
-        mock_order = {
-            "orderid": mock_order_id,
-            "status": "complete", # Simulate immediate fill
-            "tradingsymbol": orderparams.get('tradingsymbol'),
-            "symboltoken": orderparams.get('symboltoken'),
-            "transactiontype": orderparams.get('transactiontype'),
-            "quantity": orderparams.get('quantity'),
-            "price": orderparams.get('price', 0), # Limit price (if any)
-            # Simulate a filled price (usually close to LTP or limit)
-            "averageprice": 100.0  # Dummy filled price for options
-        }
-        self.orders.append(mock_order)
-        
-        return mock_order_id
-        
-    def orderBook(self):
-        """Mock Order Book"""
-        # print(">>> [Mock] fetching orderBook...")
-        return {
-            "status": True,
-            "data": self.orders
-        }
-
-    def rmsLimit(self):
-        """Mock Funds"""
-        return {
-            "status": True,
-            "data": {
-                "net": "500000.00", # 5 Lakhs
-                "availableCash": "500000.00"
-            }
-        }
+        return super().placeOrder(orderparams)
 
-class MockTokenLookup:
+class MockTokenLookup(BacktestTokenLookup):
+    """
+    Token lookup against the mock market: every contract gets its own token, registered on
+    the MockSmartConnect so it is quoted, charted and traded at its simulated premium.
+    """
     def load_scrip_master(self):
         print(">>> [Mock] Skipping Scrip Master download.")
-    
-    def get_token(self, symbol_name, expiry_date, strike, option_type):
-        # Return dummy values
-        # Construct a dummy symbol, e.g., NIFTY29JAN202623000CE
-        fake_symbol = f"{symbol_name}{expiry_date}{strike}{option_type}"
-        fake_token = "99999" # Dummy token ID
-        print(f">>> [Mock] Generated dummy token '{fake_token}' for {fake_symbol}")
-        return fake_token, fake_symbol
-
@@ -0,0 +1,199 @@
+import json
+import socket
+import base64
+import random
+import struct
+import hashlib
+import threading
+import socketserver
+from core.tick_feed import TickFeed
+
+class ThreadingServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+class MockFeedServer:
+    """
+    Local stand-in for the SmartStream market-data websocket (stdlib only).
+    Speaks just enough RFC 6455 for websocket-client: handshake, masked client frames,
+    text subscribe / unsubscribe requests, ping / pong, and binary LTP packets out.
+
+    Subscribed tokens random-walk every 'interval' seconds, or follow a MarketSimulator's
+    prices when 'market' is given (so the stream and REST quotes agree); push() sends a given
+    price immediately and drop_connections() simulates a network drop.
+    """
+    GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+    BASE_PRICES = {"99926000": 23000.0, "99926017": 14.0} # Nifty 50, India VIX; options start at 100
+
+    def __init__(self, host="127.0.0.1", port=0, interval=0.5, market=None):
+        self.interval = interval
+        self.market = market
+        self.prices = dict(self.BASE_PRICES)
+        self.clients = []
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+        server = self
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server.serve_client(self.request)
+
+        self.tcp = ThreadingServer((host, port), Handler)
+        self.host, self.port = self.tcp.server_address
+        self.url = f"ws://{self.host}:{self.port}/smart-stream"
+
+    def start(self):
+        threading.Thread(target=self.tcp.serve_forever, name="mock-feed", daemon=True).start()
+        if self.interval:
+            threading.Thread(target=self.tick_loop, name="mock-feed-ticks", daemon=True).start()
+        print(f">>> [Mock] Feed server listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.drop_connections()
+        self.tcp.shutdown()
+        self.tcp.server_close()
+
+    # --- Market ---
+
+    def push(self, token, ltp, exchange_type=None):
+        """Sends one tick for 'token' to every subscribed client"""
+        token = str(token)
+        with self.lock:
+            self.prices[token] = ltp
+            clients = [c for c in self.clients if token in c['tokens']]
+        for client in clients:
+            self.send_tick(client, exchange_type or client['tokens'][token], token, ltp)
+
+    def tick_loop(self):
+        while not self.stopped.wait(self.interval):
+            with self.lock:
+                clients = list(self.clients)
+            for client in clients:
+                for token, exchange_type in list(client['tokens'].items()):
+                    with self.lock:
+                        if self.market:
+                            price = self.market.price(token)
+                        else:
+                            price = self.prices.get(token, 100.0)
+                            price = round(max(0.05, price * (1 + random.gauss(0, 0.0005))), 2)
+                        self.prices[token] = price
+                    self.send_tick(client, exchange_type, token, price)
+
+    def send_tick(self, client, exchange_type, token, ltp):
+        with self.lock:
+            self.sequence += 1
+            sequence = self.sequence
+        self.send_frame(client, 0x2, TickFeed.pack_ltp(exchange_type, token, ltp, sequence))
+
+    def drop_connections(self):
+        with self.lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            try:
+                client['sock'].shutdown(socket.SHUT_RDWR)
+                client['sock'].close()
+            except OSError:
+                pass
+
+    # --- Websocket plumbing ---
+
+    def serve_client(self, sock):
+        rfile = sock.makefile('rb')
+        if not self.handshake(sock, rfile): return
+
+        client = {'sock': sock, 'tokens': {}, 'send_lock': threading.Lock()}
+        with self.lock:
+            self.clients.append(client)
+        self.on_connect(client)
+        try:
+            while not self.stopped.is_set():
+                frame = self.read_frame(rfile)
+                if frame is None: break
+                opcode, payload = frame
+                if opcode == 0x8: # close
+                    self.send_frame(client, 0x8, payload[:2])
+                    break
+                elif opcode == 0x9: # ping -> pong
+                    self.send_frame(client, 0xA, payload)
+                elif opcode == 0x1:
+                    self.handle_text(client, payload.decode())
+        except OSError:
+            pass
+        finally:
+            with self.lock:
+                if client in self.clients: self.clients.remove(client)
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def on_connect(self, client):
+        pass
+
+    def handle_text(self, client, text):
+        if text == "ping":
+            self.send_frame(client, 0x1, b"pong")
+            return
+        request = json.loads(text)
+        for entry in request['params']['tokenList']:
+            for token in entry['tokens']:
+                if request['action'] == TickFeed.SUBSCRIBE:
+                    client['tokens'][str(token)] = entry['exchangeType']
+                else:
+                    client['tokens'].pop(str(token), None)
+
+    def handshake(self, sock, rfile):
+        headers = {}
+        line = rfile.readline()
+        if not line: return False
+        while True:
+            line = rfile.readline().decode().strip()
+            if not line: break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        key = headers.get('sec-websocket-key')
+        if not key: return False
+        accept = base64.b64encode(hashlib.sha1((key + self.GUID).encode()).digest()).decode()
+        sock.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        return True
+
+    @staticmethod
+    def read_frame(rfile):
+        header = rfile.read(2)
+        if len(header) < 2: return None
+        opcode = header[0] & 0x0F
+        masked = header[1] & 0x80
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", rfile.read(8))[0]
+        mask = rfile.read(4) if masked else b""
+        payload = rfile.read(length)
+        if masked:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    @staticmethod
+    def send_frame(client, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack(">BB", 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack(">BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+        try:
+            with client['send_lock']:
+                client['sock'].sendall(header + payload)
+        except OSError:
+            pass
@@ -0,0 +1,45 @@
+from core.market_simulator import MarketSimulator
+from core.mock_feed_server import MockFeedServer
+from core.order_feed import OrderFeed
+
+class MockOrderFeedServer(MockFeedServer):
+    """
+    Local stand-in for the SmartAPI order-update websocket (stdlib only, MockFeedServer's
+    RFC 6455 plumbing). Every connection gets the AB00 acknowledgement, then one JSON update
+    per status change of the MarketSimulator's orders: acknowledged, trigger pending,
+    triggered, modified, filled, rejected, cancelled.
+
+    The simulator only matches resting orders when it is called or its clock advances; on the
+    real clock the server advances it every 'interval' seconds so fills are pushed without a
+    REST call. push() sends a given order row to every client.
+    """
+    def __init__(self, market=None, host="127.0.0.1", port=0, interval=0.05):
+        super().__init__(host, port, interval, market=market or MarketSimulator())
+        self.url = f"ws://{self.host}:{self.port}/smart-order-update"
+        self.updates = 0
+        self.market.order_listeners.append(self.push)
+
+    def stop(self):
+        if self.push in self.market.order_listeners:
+            self.market.order_listeners.remove(self.push)
+        super().stop()
+
+    def push(self, order):
+        """Sends one order update to every client"""
+        with self.lock:
+            self.updates += 1
+            clients = list(self.clients)
+        message = OrderFeed.message(order).encode()
+        for client in clients:
+            self.send_frame(client, 0x1, message)
+
+    def tick_loop(self):
+        while not self.stopped.wait(self.interval):
+            self.market.advance(self.market.clock.now())
+
+    def on_connect(self, client):
+        self.send_frame(client, 0x1, OrderFeed.message(None).encode())
+
+    def handle_text(self, client, text):
+        if text == "ping":
+            self.send_frame(client, 0x1, b"pong")
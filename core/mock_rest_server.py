@@ -0,0 +1,192 @@
+import collections
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config.settings import Config
+from core.market_simulator import MarketSimulator, SimulatedAPIError, FAILURE
+
+# SmartConnect._routes paths -> (endpoint class, SmartConnect method answering it)
+ROUTES = {
+    "/rest/auth/angelbroking/user/v1/loginByPassword": ("auth", "login"),
+    "/rest/auth/angelbroking/jwt/v1/generateTokens": ("auth", "tokens"),
+    "/rest/secure/angelbroking/user/v1/getProfile": ("auth", "profile"),
+    "/rest/secure/angelbroking/user/v1/logout": ("auth", "logout"),
+    "/rest/secure/angelbroking/order/v1/getLtpData": ("quote", "ltpData"),
+    "/rest/secure/angelbroking/market/v1/quote": ("quote", "getMarketData"),
+    "/rest/secure/angelbroking/historical/v1/getCandleData": ("historical", "getCandleData"),
+    "/rest/secure/angelbroking/order/v1/placeOrder": ("orders", "placeOrder"),
+    "/rest/secure/angelbroking/order/v1/modifyOrder": ("orders", "modifyOrder"),
+    "/rest/secure/angelbroking/order/v1/cancelOrder": ("orders", "cancelOrder"),
+    "/rest/secure/angelbroking/order/v1/getOrderBook": ("orderbook", "orderBook"),
+    "/rest/secure/angelbroking/user/v1/getRMS": ("rms", "rmsLimit"),
+}
+THROTTLED = b"Access denied because of exceeding access rate"
+
+class MockRestServer:
+    """
+    Local stand-in for the SmartAPI REST endpoints (stdlib only), so the unmodified
+    SmartConnect client can be pointed at it: SmartConnect(api_key, root=server.url).
+
+    Speaks the client's wire format: JSON bodies, the X-PrivateKey / X-SourceID / ... headers,
+    Bearer JWTs issued by the login route, HTTP/1.1 keep-alive. Answers come from a
+    MarketSimulator (its own by default). Per endpoint class (Config.RATE_LIMITS' names, plus
+    'auth'), 'latency' adds seconds before a response and 'limits' caps requests per second;
+    over the cap the server answers 403 with the broker's plain-text body, which SmartConnect
+    raises as a DataException.
+
+    metrics() counts requests per route and TCP connections accepted, so runs can compare
+    a connection per request with a pooled session.
+    """
+    def __init__(self, market=None, host="127.0.0.1", port=0, latency=None, limits=None):
+        self.market = market or MarketSimulator()
+        self.latency = Config.MOCK_HTTP_LATENCY if latency is None else latency
+        self.limits = Config.MOCK_HTTP_LIMITS if limits is None else limits
+        self.tokens = {} # {jwt: client code}
+        self.calls = collections.defaultdict(collections.deque) # {endpoint class: request times in the last second}
+        self.requests = collections.Counter()
+        self.throttled = collections.Counter()
+        self.connections = 0
+        self.lock = threading.Lock()
+
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; with Nagle on, keep-alive requests
+            # would stall on the client's delayed ACK (~40 ms each)
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                server.handle(self)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        self.http = ThreadingHTTPServer((host, port), Handler)
+        self.http.daemon_threads = True
+        self.host, self.port = self.http.server_address
+        self.url = f"http://{self.host}:{self.port}"
+
+    def start(self):
+        threading.Thread(target=self.http.serve_forever, name="mock-rest", daemon=True).start()
+        print(f">>> [Mock] REST server listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.http.shutdown()
+        self.http.server_close()
+
+    def session(self, api_key="mock_api_key", client_code="MOCK1", **kwargs):
+        """A logged-in SmartConnect talking to this server"""
+        from SmartApi import SmartConnect
+        api = SmartConnect(api_key=api_key, root=self.url, **kwargs)
+        api.generateSession(client_code, "mock", "000000")
+        return api
+
+    def metrics(self):
+        with self.lock:
+            return {'connections': self.connections, 'requests': dict(self.requests), 'throttled': dict(self.throttled)}
+
+    # --- Requests ---
+
+    def handle(self, request):
+        path = request.path.split("?")[0]
+        length = int(request.headers.get('Content-Length') or 0)
+        body = request.rfile.read(length) if length else b""
+        route = ROUTES.get(path)
+        if route is None:
+            return self.respond(request, 404, {"status": False, "message": "Not Found", "errorcode": "AB2001", "data": None})
+        endpoint_class, method = route
+
+        if self.latency.get(endpoint_class):
+            time.sleep(self.latency[endpoint_class])
+        with self.lock:
+            self.requests[method] += 1
+            if self.over_limit(endpoint_class):
+                self.throttled[method] += 1
+                return self.respond(request, 403, THROTTLED, content_type="text/plain")
+
+        if not request.headers.get('X-PrivateKey'):
+            return self.respond(request, 400, {"status": False, "message": "Invalid API Key", "errorcode": "AG8004", "data": None})
+        if endpoint_class != "auth" or method in ("profile", "logout"):
+            jwt = (request.headers.get('Authorization') or "").removeprefix("Bearer ")
+            if jwt not in self.tokens:
+                return self.respond(request, 401, {"status": False, "message": "Invalid Token", "errorcode": "AG8001", "data": None})
+
+        try:
+            params = json.loads(body) if body else {}
+            self.respond(request, 200, self.answer(method, params, request))
+        except SimulatedAPIError:
+            self.respond(request, 403, THROTTLED, content_type="text/plain")
+        except Exception as e:
+            self.respond(request, 500, {"status": False, "message": str(e), "errorcode": "AB1004", "data": None})
+
+    def over_limit(self, endpoint_class):
+        limit = self.limits.get(endpoint_class)
+        if not limit: return False
+        now = time.monotonic()
+        calls = self.calls[endpoint_class]
+        while calls and calls[0] <= now - 1.0:
+            calls.popleft()
+        if len(calls) >= limit[0]:
+            return True
+        calls.append(now)
+        return False
+
+    def answer(self, method, params, request):
+        """SmartAPI response body for one call"""
+        if method == "login":
+            jwt, refresh = uuid.uuid4().hex, uuid.uuid4().hex
+            with self.lock:
+                self.tokens[jwt] = params.get('clientcode')
+            return {"status": True, "message": "SUCCESS", "errorcode": "", "data": {
+                "jwtToken": jwt, "refreshToken": refresh, "feedToken": f"feed_{jwt[:8]}"}}
+        if method == "tokens":
+            jwt = uuid.uuid4().hex
+            with self.lock:
+                self.tokens[jwt] = None
+            return {"status": True, "message": "SUCCESS", "errorcode": "", "data": {
+                "jwtToken": jwt, "refreshToken": params.get('refreshToken'), "feedToken": f"feed_{jwt[:8]}"}}
+        if method == "profile":
+            jwt = request.headers['Authorization'].removeprefix("Bearer ")
+            return {"status": True, "message": "SUCCESS", "errorcode": "", "data": {
+                "clientcode": self.tokens[jwt], "name": "Mock Client", "exchanges": ["NSE", "NFO"], "products": ["MIS", "NRML"]}}
+        if method == "logout":
+            return {"status": True, "message": "SUCCESS", "errorcode": "", "data": ""}
+
+        if method == "ltpData":
+            return self.market.ltpData(params.get('exchange'), params.get('tradingsymbol'), params.get('symboltoken'))
+        if method == "getMarketData":
+            return self.market.getMarketData(params.get('mode'), params.get('exchangeTokens') or {})
+        if method == "getCandleData":
+            return self.market.getCandleData(params)
+        if method in ("orderBook", "rmsLimit"):
+            return getattr(self.market, method)()
+
+        # Orders: the simulator returns the order id (None when refused)
+        if method == "cancelOrder":
+            order_id = self.market.cancelOrder(params.get('orderid'), params.get('variety'))
+        else:
+            order_id = getattr(self.market, method)(params)
+        if order_id is None:
+            return dict(FAILURE)
+        order = self.market.by_id.get(order_id, {})
+        return {"status": True, "message": "SUCCESS", "errorcode": "", "data": {
+            "script": order.get('tradingsymbol'), "orderid": order_id, "uniqueorderid": order_id}}
+
+    @staticmethod
+    def respond(request, code, payload, content_type="application/json"):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        request.send_response(code)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
@@ -1,67 +1,190 @@
-import logging
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Config
+from utils.clock import system_clock
+from utils.logger import logger
+
+class ChainSnapshotCache:
+    """
+    Option-chain scan results per (expiry, atm_strike, width), shared by every OIAnalyzer.
+    A snapshot younger than ttl is returned as is; an older one is still returned while a
+    single background refresh rescans the chain (up to max_stale, after which callers wait).
+    The previous snapshot is kept so each row carries its OI change since the last scan.
+    """
+    def __init__(self, ttl=None, max_stale=None):
+        self.ttl = Config.OI_CACHE_TTL if ttl is None else ttl
+        self.max_stale = Config.OI_CACHE_MAX_STALE if max_stale is None else max_stale
+        self.entries = {} # {key: {'snapshot', 'previous', 'fetched_at'}}
+        self.refreshing = set()
+        self.lock = threading.Lock()
+
+    def get(self, key, scan, now=None):
+        """
+        scan() -> fresh snapshot dict. Returns the cached (or freshly scanned) snapshot.
+        now: the caller's clock time (epoch seconds), defaults to time.time().
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            entry = self.entries.get(key)
+            age = now - entry['fetched_at'] if entry else None
+            if entry and age < self.ttl:
+                return entry['snapshot']
+
+            if entry and age < self.max_stale:
+                if key not in self.refreshing:
+                    self.refreshing.add(key)
+                    threading.Thread(target=self.refresh, args=(key, scan, now), daemon=True).start()
+                return entry['snapshot']
+
+        return self.refresh(key, scan, now)
+
+    def refresh(self, key, scan, now=None):
+        try:
+            snapshot = scan()
+            with self.lock:
+                entry = self.entries.get(key)
+                previous = entry['snapshot'] if entry else None
+                self.add_changes(snapshot, previous)
+                self.entries[key] = {'snapshot': snapshot, 'previous': previous, 'fetched_at': time.time() if now is None else now}
+            return snapshot
+        except Exception as e:
+            logger.error(f"OI Cache: Refresh failed for {key}: {e}")
+            with self.lock:
+                entry = self.entries.get(key)
+            return entry['snapshot'] if entry else None
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def previous(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry['previous'] if entry else None
+
+    @staticmethod
+    def add_changes(snapshot, previous):
+        """OI change per strike vs the previous snapshot (0 when there is none)"""
+        before = {r['strike']: r for r in previous['rows']} if previous else {}
+        for row in snapshot['rows']:
+            old = before.get(row['strike'])
+            row['ce_oi_chg'] = row['ce_oi'] - old['ce_oi'] if old else 0
+            row['pe_oi_chg'] = row['pe_oi'] - old['pe_oi'] if old else 0
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+# One cache for the whole process: repeat PCR queries from any strategy hit the same snapshot
+shared_chain_cache = ChainSnapshotCache()
 
 class OIAnalyzer:
-    def __init__(self, api, token_loader):
+    def __init__(self, api, token_loader, cache=None, clock=None):
         self.api = api
         self.loader = token_loader
+        self.cache = cache or shared_chain_cache
+        self.clock = clock or system_clock
         
-    def get_pcr(self, expiry, atm_strike):
+    def get_pcr(self, expiry, atm_strike, width=None):
         """
         Calculates Put-Call Ratio (PCR) based on Open Interest (OI) 
-        of 5 Strikes around ATM (ATM, +1, +2, -1, -2).
+        of the listed strikes around ATM (ATM +/- width, default Config.OI_STRIKE_WIDTH).
         
         PCR = Total Put OI / Total Call OI
         PCR > 1.0 => Bullish (More Puts writen/sold -> Support)
         PCR < 1.0 => Bearish (More Calls written/sold -> Resistance)
         """
-        print(f">>> [AI] Scanning Option Chain (Live Volume/OI) for {expiry} around {atm_strike}...")
-        
-        strikes = [atm_strike, atm_strike+50, atm_strike+100, atm_strike-50, atm_strike-100]
-        
+        snapshot = self.get_snapshot(expiry, atm_strike, width)
+        return snapshot['pcr'] if snapshot else 1.0
+
+    def get_snapshot(self, expiry, atm_strike, width=None):
+        """Chain scan result (see scan_chain) served from the shared ChainSnapshotCache"""
+        width = Config.OI_STRIKE_WIDTH if width is None else width
+        return self.cache.get((expiry, atm_strike, width), lambda: self.scan_chain(expiry, atm_strike, width), self.clock.time())
+
+    def scan_chain(self, expiry, atm_strike, width=None):
+        """
+        Concurrent OI/Volume scan of ATM +/- width strikes.
+        Tokens go out in batched getMarketData("FULL") requests on a bounded worker pool
+        (every call still passes the shared RateLimiter); tokens the batch did not return
+        fall back to daily candles on the same pool.
+
+        Returns {'rows': [{'strike', 'ce_oi', 'pe_oi'}...], 'ce_total', 'pe_total', 'pcr', 'elapsed'}
+        """
+        width = Config.OI_STRIKE_WIDTH if width is None else width
+        print(f">>> [AI] Scanning Option Chain (Live Volume/OI) for {expiry} around {atm_strike} (+/- {width} strikes)...")
+        start = time.perf_counter()
+
+        # 1. Get Tokens (ATM +/- width listed strikes, resolved in one call)
+        chain = self.loader.get_option_chain("NIFTY", expiry)
+        rows = [(strike, ce[0], pe[0]) for strike, ce, pe in chain.strikes_around(atm_strike, width) if ce[0] and pe[0]]
+        tokens = list(dict.fromkeys(t for _, ce, pe in rows for t in (ce, pe)))
+
+        # 2. Fetch OI/Volume Data concurrently
+        values = {}
+        batch = Config.OI_SCAN_BATCH
+        with ThreadPoolExecutor(max_workers=Config.OI_SCAN_WORKERS) as pool:
+            chunks = [tokens[i:i + batch] for i in range(0, len(tokens), batch)]
+            for result in pool.map(self.fetch_oi_batch, chunks):
+                values.update(result)
+
+            missing = [t for t in tokens if t not in values]
+            for token, value in zip(missing, pool.map(self.fetch_oi_value, missing)):
+                values[token] = value
+
+        table = []
         total_ce_oi = 0
         total_pe_oi = 0
-        
-        for strike in strikes:
-            # 1. Get Tokens
-            ce_token, ce_symbol = self.loader.get_token("NIFTY", expiry, strike, "CE")
-            pe_token, pe_symbol = self.loader.get_token("NIFTY", expiry, strike, "PE")
-            
-        for strike in strikes:
-            # 1. Get Tokens
-            ce_token, _ = self.loader.get_token("NIFTY", expiry, strike, "CE")
-            pe_token, _ = self.loader.get_token("NIFTY", expiry, strike, "PE")
-            
-            if not ce_token or not pe_token:
-                continue
-
-            # 2. Fetch OI/Volume Data
-            time.sleep(0.4) # Rate Limit Protection
-            ce_vol = self.fetch_oi_value(ce_token)
-            
-            time.sleep(0.4) # Rate Limit Protection
-            pe_vol = self.fetch_oi_value(pe_token)
-            
+        for strike, ce_token, pe_token in rows:
+            ce_vol = values.get(ce_token, 0)
+            pe_vol = values.get(pe_token, 0)
             total_ce_oi += ce_vol
             total_pe_oi += pe_vol
-            
+            table.append({'strike': strike, 'ce_oi': ce_vol, 'pe_oi': pe_vol})
+
             # Print row for user visibility
             print(f"    Strike: {strike} | CE Vol: {int(ce_vol):,} | PE Vol: {int(pe_vol):,}")
 
         print(f"    ------------------------------------------------")
         print(f"    [Aggregated] CE Vol: {int(total_ce_oi):,} | PE Vol: {int(total_pe_oi):,}")
-        
-        if total_ce_oi == 0: return 1.0 # Avoid DivByZero
-        
-        pcr = total_pe_oi / total_ce_oi
-        return round(pcr, 2)
+
+        pcr = round(total_pe_oi / total_ce_oi, 2) if total_ce_oi else 1.0 # Avoid DivByZero
+        elapsed = time.perf_counter() - start
+        logger.info(f"OI Scan: {len(rows)} strikes ({len(tokens)} tokens) in {elapsed*1000:.0f}ms | PCR: {pcr}")
+
+        return {
+            'rows': table,
+            'ce_total': total_ce_oi,
+            'pe_total': total_pe_oi,
+            'pcr': pcr,
+            'elapsed': elapsed,
+        }
+
+    def fetch_oi_batch(self, tokens):
+        """
+        One FULL market-data request for up to 50 NFO tokens.
+        Returns {token: OI} (falls back to traded volume when OI is not reported).
+        """
+        try:
+            resp = self.api.getMarketData("FULL", {"NFO": tokens})
+            if not resp or not resp.get('status') or not resp.get('data'):
+                return {}
+
+            values = {}
+            for quote in resp['data'].get('fetched', []):
+                oi = float(quote.get('opnInterest') or 0)
+                values[str(quote['symbolToken'])] = oi if oi else float(quote.get('tradeVolume') or 0)
+            return values
+        except Exception as e:
+            logger.warning(f"OI Scan: Market data batch failed ({e}). Falling back to candles.")
+            return {}
 
     def fetch_oi_value(self, token):
         try:
             # REAL API LOGIC:
             # Fetch Daily Candle to get the latest Open Interest (OI)
             import datetime
-            today = datetime.datetime.now()
+            today = self.clock.now()
             # Look back 3 days to ensure we get at least one candle even after weekends
             from_date = (today - datetime.timedelta(days=3)).strftime("%Y-%m-%d %H:%M")
             to_date = today.strftime("%Y-%m-%d %H:%M")
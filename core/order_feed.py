@@ -0,0 +1,91 @@
+import json
+import time
+from config.settings import Config
+from core.tick_feed import TickFeed
+from utils.logger import logger
+
+class OrderFeed(TickFeed):
+    """
+    Order status updates over the SmartAPI order websocket (smart-order-update).
+
+    Connection handling is TickFeed's: a daemon thread, "ping" heartbeats, reconnects with
+    exponential backoff. Each update's orderData (order-book fields plus 'received_at') goes
+    into the attached OrderService, whose state machine fires the trigger / fill / reject
+    callbacks, and then to the callbacks and queues registered here.
+    """
+    NAME = "OrderFeed"
+    # 'order-status' codes by order status; AB00 acknowledges the connection
+    STATUS_CODES = {
+        "open": "AB01", "cancelled": "AB02", "rejected": "AB03", "complete": "AB05",
+        "trigger pending": "AB08", "open pending": "AB09",
+    }
+    CONNECTED = "AB00"
+
+    def __init__(self, auth_token, api_key, client_code, feed_token, url=None, orders=None, max_backoff=None):
+        super().__init__(auth_token, api_key, client_code, feed_token,
+                         url=url or Config.ORDER_FEED_URL, max_backoff=max_backoff)
+        self.statuses = {v: k for k, v in self.STATUS_CODES.items()}
+        self.orders = None
+        if orders is not None:
+            self.attach(orders)
+
+    @classmethod
+    def from_session(cls, api, orders=None, url=None):
+        """Builds the feed from a logged-in SmartConnect (or its RateLimitedAPI wrapper)"""
+        return cls(**cls.credentials(api), url=url, orders=orders)
+
+    def attach(self, orders):
+        """Pushes every update into the OrderService snapshot"""
+        self.orders = orders
+        orders.feed = self
+
+    # The order feed streams every order of the session: there is nothing to (re)subscribe
+    def subscribe(self, exchange, tokens):
+        pass
+
+    def unsubscribe(self, exchange, tokens):
+        pass
+
+    def resubscribe(self):
+        pass
+
+    def on_message(self, ws, message):
+        if isinstance(message, bytes):
+            message = message.decode()
+        if message == "pong":
+            return
+        order = self.parse(message)
+        if order is not None:
+            order['received_at'] = time.time()
+            self.dispatch(order)
+
+    def dispatch(self, order):
+        if self.orders is not None:
+            self.orders.update(order)
+        super().dispatch(order)
+
+    # --- Messages ---
+
+    def parse(self, message):
+        """An update's orderData with its status filled in, or None for acknowledgements"""
+        try:
+            update = json.loads(message)
+        except ValueError:
+            logger.warning(f"{self.NAME}: Unreadable update: {message[:100]}")
+            return None
+        order = update.get('orderData') or {}
+        if update.get('order-status') == self.CONNECTED or not order.get('orderid'):
+            return None
+        order['status'] = order.get('status') or order.get('orderstatus') or self.statuses.get(update.get('order-status'), 'unknown')
+        return order
+
+    @classmethod
+    def message(cls, order, client_code="MOCK1"):
+        """Encodes one order update (used by the stand-in order feed server)"""
+        return json.dumps({
+            "user-id": client_code,
+            "status-code": "200",
+            "order-status": cls.STATUS_CODES.get(order['status'], "AB01") if order else cls.CONNECTED,
+            "error-message": "",
+            "orderData": {**order, "orderstatus": order['status']} if order else {},
+        })
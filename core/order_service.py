@@ -0,0 +1,190 @@
+import threading
+from config.settings import Config
+from utils.clock import system_clock
+from utils.logger import logger
+
+class OrderService:
+    """
+    Shared order-book snapshot. One orderBook() round-trip refreshes every order; the
+    snapshot is indexed by order id and by trading symbol, and status / fill / open-order
+    queries are answered from it. A query only triggers a refresh when the snapshot is
+    older than max_age, so the order-book calls per interval stay the same however many
+    legs, strategies or fill waits read from it.
+
+    When an OrderFeed is attached, pushed order updates go through the same state machine
+    and known orders are no longer re-polled. Listeners hear of transitions as they are
+    applied (from the stream or a poll): 'trigger' when a stop leaves trigger pending,
+    'fill', 'reject' and 'cancel'. A finished order never moves again, so late or
+    out-of-order updates cannot undo a fill.
+    """
+    OPEN_STATES = ('open', 'pending') # Working orders that block a duplicate entry
+    TERMINAL = ('complete', 'rejected', 'cancelled')
+    EVENTS = {'complete': 'fill', 'rejected': 'reject', 'cancelled': 'cancel'}
+
+    def __init__(self, api, max_age=None, clock=None):
+        self.api = api
+        self.clock = clock or system_clock
+        self.max_age = Config.ORDER_BOOK_MAX_AGE if max_age is None else max_age
+        self.by_id = {} # {order id: order}
+        self.by_symbol = {} # {trading symbol: {order id: order}}
+        self.fetched_at = None
+        self.round_trips = 0
+        self.listeners = []
+        self.sequence = 0 # updates applied so far; see wait_for_update(since=...)
+        self.lock = threading.RLock()
+        self.refreshing = threading.Lock() # one orderBook() in flight; other stale readers wait for it
+        self.updated = threading.Condition(self.lock)
+        self.feed = None # OrderFeed pushing into this snapshot (see OrderFeed.attach)
+
+    def is_streaming(self):
+        """True while an attached OrderFeed is connected and pushing updates"""
+        return bool(self.feed and self.feed.connected)
+
+    def add_listener(self, callback):
+        """callback(event, order) is called for every 'trigger' / 'fill' / 'reject' / 'cancel'"""
+        self.listeners.append(callback)
+
+    def wait_for_update(self, timeout, since=None):
+        """
+        Blocks until the next order update (pushed or polled) or timeout.
+        Returns True if an update arrived. With since (a 'sequence' read earlier), updates
+        applied after that read count too, so one landing between a check and the wait is not missed.
+        """
+        with self.updated:
+            if since is None:
+                return self.updated.wait(timeout)
+            return self.updated.wait_for(lambda: self.sequence > since, timeout)
+
+    def refresh(self):
+        """
+        One orderBook() request applied to the snapshot. False if the book could not be read.
+        The request (which may wait on the rate limiter) is made without the lock, so queries
+        and pushed updates are not held up behind it; listeners run once the lock is released.
+        """
+        with self.lock:
+            self.round_trips += 1
+        try:
+            book = self.api.orderBook()
+        except Exception as e:
+            logger.warning(f"Orders: Order book fetch failed: {e}")
+            return False
+        if not book or not book.get('status'):
+            logger.warning(f"Orders: Order book unavailable: {(book or {}).get('message')}")
+            return False
+
+        with self.lock:
+            applied = [(order, self.apply(order)) for order in book.get('data') or []] # an empty book comes back as data=None
+            self.fetched_at = self.clock.time()
+        for order, events in applied:
+            self.notify(events or [], order)
+        return True
+
+    def update(self, order):
+        """Applies one order row (order-book or pushed); returns False if the state machine refused it"""
+        with self.lock:
+            events = self.apply(order)
+        if events is None: return False
+        self.notify(events, order)
+        return True
+
+    def apply(self, order):
+        """The state machine (caller holds the lock): the row's events, or None if it was refused"""
+        order_id = str(order['orderid'])
+        previous = self.by_id.get(order_id)
+        before = previous['status'] if previous else None
+        status = order['status']
+        if before in self.TERMINAL and status != before:
+            return None
+        self.by_id[order_id] = order
+        self.by_symbol.setdefault(order['tradingsymbol'], {})[order_id] = order
+
+        events = []
+        if status != before:
+            if before == 'trigger pending' and status in ('open', 'complete'):
+                events.append('trigger')
+            if status in self.EVENTS:
+                events.append(self.EVENTS[status])
+        return events
+
+    def notify(self, events, order):
+        """Runs the listeners for one applied row and wakes the waiters; never under the lock"""
+        for event in events:
+            for callback in self.listeners:
+                try:
+                    callback(event, order)
+                except Exception as e:
+                    logger.error(f"Orders: Listener error: {e}")
+        with self.lock:
+            self.sequence += 1
+            self.updated.notify_all()
+
+    def current(self, max_age=None, order_id=None):
+        """
+        Refreshes the snapshot if it is older than max_age. Returns False when no
+        snapshot could be read at all; a failed refresh keeps serving the last one.
+        While streaming, only an order the stream has not delivered yet forces a poll.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        if self.is_fresh(max_age, order_id):
+            return True
+        with self.refreshing:
+            # Another reader may have refreshed while this one waited for it
+            if not self.is_fresh(max_age, order_id):
+                self.refresh()
+        with self.lock:
+            return self.fetched_at is not None
+
+    def is_fresh(self, max_age, order_id=None):
+        with self.lock:
+            if self.fetched_at is None: return False
+            if self.is_streaming() and (order_id is None or str(order_id) in self.by_id): return True
+            return self.clock.time() - self.fetched_at <= max_age
+
+    def order(self, order_id, max_age=None):
+        """The order's order-book row, or None if it is not (yet) in the book"""
+        if not self.current(max_age, order_id): return None
+        with self.lock:
+            return self.by_id.get(str(order_id))
+
+    def status(self, order_id, max_age=None):
+        """'complete', 'open', 'rejected', ...; 'unknown' if the order is not in the book"""
+        order = self.order(order_id, max_age)
+        return order['status'] if order else 'unknown'
+
+    def fill_price(self, order_id, max_age=None):
+        """Average fill price once the order is complete, else None"""
+        order = self.order(order_id, max_age)
+        if order and order['status'] == 'complete':
+            return float(order['averageprice'])
+        return None
+
+    def wait_for_fill(self, order_id, timeout=None):
+        """
+        Blocks until the order is filled and returns its average price; None once it is
+        rejected or cancelled, or after timeout seconds. Pushed updates end the wait as they
+        arrive; without a stream the snapshot is re-polled every max_age.
+        """
+        timeout = Config.ORDER_FILL_TIMEOUT if timeout is None else timeout
+        deadline = self.clock.time() + timeout
+        while True:
+            order = self.order(order_id)
+            if order and order['status'] in self.TERMINAL:
+                return float(order['averageprice']) if order['status'] == 'complete' else None
+            remaining = deadline - self.clock.time()
+            if remaining <= 0: return None
+            with self.updated:
+                if self.is_streaming():
+                    # An update applied since the check above is not waited for
+                    if self.by_id.get(str(order_id)) is order:
+                        self.updated.wait(min(remaining, self.max_age))
+                    continue
+            self.clock.sleep(min(remaining, self.max_age))
+
+    def open_orders(self, symbol, max_age=None):
+        """
+        Working orders for a trading symbol. None if the order book cannot be read,
+        so callers can fail closed.
+        """
+        if not self.current(max_age): return None
+        with self.lock:
+            return [o for o in self.by_symbol.get(symbol, {}).values() if o['status'] in self.OPEN_STATES]
@@ -1,11 +1,14 @@
-import time
 import datetime
 from config.settings import Config
+from core.quote_service import QuoteService
+from utils.clock import system_clock
 
 class PositionManager:
-    def __init__(self, api, dry_run=False):
+    def __init__(self, api, dry_run=False, quotes=None, clock=None):
         self.api = api
         self.dry_run = dry_run
+        self.clock = clock or system_clock
+        self.quotes = quotes or QuoteService(api, clock=self.clock)
         self.target_percent = 0.20 # 20% Profit Target
 
     def monitor(self, active_positions):
@@ -13,18 +16,20 @@ class PositionManager:
         active_positions: List of dicts [{'symbol': '...', 'token': '...', 'entry_price': 100.0, 'qty': 50}]
         """
         print(f">>> [Manager] Activating Superhuman Trade Management (TSL) 🚀")
-        print(f">>> [TSL] Logic: Initial SL -10%. At +10% Profit, SL moves to Breakeven. Then trails Peak - 10%.")
+        print(f">>> [TSL] Logic: Initial SL -{Config.TSL_STOP_LOSS*100:g}%. At +{Config.TSL_BREAKEVEN*100:g}% Profit, SL moves to Breakeven. Then trails Peak - {Config.TSL_TRAIL*100:g}%.")
         
         # Initialize TSL State
         for pos in active_positions:
             pos['highest_pnl'] = -1.0 # Track Peak P&L
-            pos['sl_level'] = -0.10   # Initial Hard SL (-10%)
+            pos['sl_level'] = -Config.TSL_STOP_LOSS # Initial Hard SL (-10%)
             pos['tsl_active'] = False # Flag for Breakeven activation
+            # All legs share one batched quote refresh per cycle
+            self.quotes.watch("NFO", pos['token'], pos['symbol'])
 
         while True:
             try:
                 # 1. Check Time Exit
-                now = datetime.datetime.now().time()
+                now = self.clock.now().time()
                 if now > datetime.time(15, 15):
                     print(">>> [Exit] Time is 15:15. Squaring off all positions.")
                     self.exit_all(active_positions, "TIME_EXIT")
@@ -47,16 +52,16 @@ class PositionManager:
                     # --- TSL LOGIC START ---
                     
                     # A. Activate Breakeven (Risk-Free) at +10%
-                    if pnl_pct >= 0.10 and not pos['tsl_active']:
+                    if pnl_pct >= Config.TSL_BREAKEVEN and not pos['tsl_active']:
                         pos['sl_level'] = 0.0
                         pos['tsl_active'] = True
-                        print(f">>> [TSL] 🔒 Profit Hit +10%. Risk Eliminated! SL moved to BREAKEVEN (0%).")
+                        print(f">>> [TSL] 🔒 Profit Hit +{Config.TSL_BREAKEVEN*100:g}%. Risk Eliminated! SL moved to BREAKEVEN (0%).")
 
                     # B. Dynamic Trailing (Keep 10% distance from Peak)
                     # Only active after Breakeven is triggered
                     if pos['tsl_active']:
                         # Example: Peak 15% -> SL 5%. Peak 20% -> SL 10%.
-                        potential_sl = pos['highest_pnl'] - 0.10
+                        potential_sl = pos['highest_pnl'] - Config.TSL_TRAIL
                         
                         # Optimization: Round to 1 decimal (e.g. 0.05) to avoid noise
                         potential_sl = round(potential_sl, 2)
@@ -68,8 +73,11 @@ class PositionManager:
 
                     # --- TSL LOGIC END ---
 
-                    tsl_status = f"SL: {pos['sl_level']*100:.1f}%"
-                    print(f"    {pos['symbol']} | CMP: {ltp} | P&L: {pnl_pct*100:.2f}% | {tsl_status}")
+                    # Status line at most every 5s per position (ticks arrive far more often)
+                    if self.clock.time() - pos.get('last_status', 0) >= 5 or not self.quotes.is_streaming():
+                        pos['last_status'] = self.clock.time()
+                        tsl_status = f"SL: {pos['sl_level']*100:.1f}%"
+                        print(f"    {pos['symbol']} | CMP: {ltp} | P&L: {pnl_pct*100:.2f}% | {tsl_status}")
                     
                     # 3. Check Exit Condition (Price hits SL)
                     if pnl_pct <= pos['sl_level']:
@@ -77,27 +85,33 @@ class PositionManager:
                         print(f">>> [Exit] {reason} 🔻 P&L: {pnl_pct*100:.2f}% dropped below SL {pos['sl_level']*100:.2f}%")
                         self.exit_trade(pos, ltp, reason=reason)
                         pos['exited'] = True
+                        pos['exit_reason'] = reason
+                        self.quotes.unwatch(pos['token'])
 
                 # Check if all exited
                 if all(p.get('exited') for p in active_positions):
                     print(">>> [Manager] All positions closed.")
                     break
-                    
-                time.sleep(5)
+
+                # Streaming: re-check on the next tick. Polling: every 5 seconds.
+                if self.quotes.is_streaming():
+                    self.quotes.wait_for_update(5)
+                else:
+                    self.clock.sleep(5)
                 
             except KeyboardInterrupt:
                 print(">>> [User] Manual Stop.")
                 break
             except Exception as e:
                 print(f">>> [Error] Monitor Loop: {e}")
-                time.sleep(5)
+                self.clock.sleep(5)
 
     def get_ltp(self, token):
         try:
             # Exchange is usually NFO for options
-            resp = self.api.ltpData("NFO", "token_lookup", token)
-            if resp and resp.get('status'):
-                return resp['data']['ltp']
+            ltp = self.quotes.get_ltp(token, "NFO")
+            if ltp is not None:
+                return ltp
             
             # Check for Mock Mode Fallback if API returns None and we are testing
             if self.dry_run or (hasattr(self.api, 'api_key') and self.api.api_key is None):
@@ -113,6 +127,9 @@ class PositionManager:
         for pos in positions:
             if not pos.get('exited'):
                 self.exit_trade(pos, "MKT", reason)
+                pos['exited'] = True
+                pos['exit_reason'] = reason
+                self.quotes.unwatch(pos['token'])
 
     def exit_trade(self, pos, price, reason="TARGET"):
         if self.dry_run:
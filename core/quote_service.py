@@ -0,0 +1,173 @@
+import threading
+from config.settings import Config
+from core.rate_limiter import RateLimitExceeded, is_throttled
+from utils.clock import system_clock
+from utils.logger import logger
+
+class QuoteService:
+    """
+    Batched LTP snapshot for every instrument of interest (index, VIX, open legs, ATM +/- N).
+    One getMarketData("LTP") round-trip refreshes all watched tokens; consumers read
+    from the snapshot and only trigger a refresh when their token's quote is older than max_age.
+
+    When a TickFeed is attached, watched tokens are subscribed on the stream and their
+    ticks update the snapshot directly; REST refreshes are then only a fallback.
+    """
+    MAX_TOKENS_PER_REQUEST = 50 # SmartAPI market data limit
+
+    def __init__(self, api, max_age=None, clock=None):
+        self.api = api
+        self.clock = clock or system_clock
+        self.max_age = Config.QUOTE_MAX_AGE if max_age is None else max_age
+        self.watched = {} # {token: (exchange, symbol)}
+        self.snapshot = {} # {token: (ltp, fetched_at)}
+        self.listeners = []
+        self.round_trips = 0
+        self.lock = threading.RLock()
+        self.updated = threading.Condition(self.lock)
+        self.feed = None # TickFeed pushing into this snapshot (see TickFeed.attach)
+        self.refreshing = None # thread whose refresh() is in flight
+        self.requested = set() # tokens that refresh asked for
+        self.refreshed = threading.Condition(self.lock)
+
+    def watch(self, exchange, token, symbol=None):
+        token = str(token)
+        with self.lock:
+            if token in self.watched: return
+            self.watched[token] = (exchange, symbol or token)
+        if self.feed:
+            self.feed.subscribe(exchange, [token])
+
+    def unwatch(self, token):
+        token = str(token)
+        with self.lock:
+            entry = self.watched.pop(token, None)
+            self.snapshot.pop(token, None)
+        if self.feed and entry:
+            self.feed.unsubscribe(entry[0], [token])
+
+    def is_streaming(self):
+        """True while an attached TickFeed is connected and pushing ticks"""
+        return bool(self.feed and self.feed.connected)
+
+    def wait_for_update(self, timeout):
+        """
+        Blocks until the next quote update (tick or refresh) or timeout.
+        Returns True if an update arrived.
+        """
+        with self.updated:
+            return self.updated.wait(timeout)
+
+    def add_listener(self, callback):
+        """callback(token, ltp, timestamp) is called for every quote update"""
+        self.listeners.append(callback)
+
+    def get_ltp(self, token, exchange="NFO", symbol=None, max_age=None):
+        """
+        LTP from the snapshot. Unknown tokens are added to the watch list;
+        a stale snapshot is refreshed for all watched tokens in one request.
+        """
+        token = str(token)
+        max_age = self.max_age if max_age is None else max_age
+        self.watch(exchange, token, symbol)
+
+        with self.lock:
+            quote = self.snapshot.get(token)
+            # Streamed tokens are kept current by ticks; an illiquid contract may just not be trading
+            streamed = self.is_streaming()
+            stale = quote is None or (not streamed and self.clock.time() - quote[1] > max_age)
+        if stale:
+            # Not under the lock: refresh() runs listeners, which take their own locks
+            self.refresh()
+            with self.lock:
+                quote = self.snapshot.get(token)
+        return quote[0] if quote else None
+
+    def refresh(self):
+        """
+        One batched market-data request (per 50 tokens) for everything watched. The requests
+        (and any rate-limiter wait) run without the lock, so ticks keep updating the snapshot,
+        and listeners run once it is released. Only one refresh is in flight: a caller that
+        finds one running waits for its quotes instead of sending its own, unless it watches
+        tokens that request did not ask for.
+        """
+        with self.lock:
+            while self.refreshing is not None:
+                if self.refreshing is threading.current_thread(): return
+                self.refreshed.wait()
+                # Woken by a finished refresh; another caller may already have started the next
+                if self.refreshing is None and self.watched.keys() <= self.requested: return
+            watched = dict(self.watched)
+            if not watched: return
+            self.refreshing = threading.current_thread()
+            self.requested = set(watched)
+
+        try:
+            for token, ltp, timestamp in self.fetch(watched):
+                self.update(token, ltp, timestamp)
+        finally:
+            with self.lock:
+                self.refreshing = None
+                self.refreshed.notify_all()
+
+    def fetch(self, watched):
+        """[(token, ltp, timestamp)] for the watched tokens, batched; never under the lock"""
+        fetched = []
+        tokens = list(watched)
+        for i in range(0, len(tokens), self.MAX_TOKENS_PER_REQUEST):
+            batch = tokens[i:i + self.MAX_TOKENS_PER_REQUEST]
+            exchange_tokens = {}
+            for token in batch:
+                exchange_tokens.setdefault(watched[token][0], []).append(token)
+
+            try:
+                quotes = self.fetch_batch(exchange_tokens)
+            except Exception as e:
+                if is_throttled(e):
+                    # N single calls would only dig the hole deeper; keep the last snapshot
+                    logger.warning(f"Quotes: Market data throttled ({e}). Keeping the last snapshot.")
+                    break
+                logger.warning(f"Quotes: Batched market data failed ({e}). Falling back to ltpData.")
+                quotes = None
+            if quotes is None:
+                # Fallback for sessions without market-data access: per-token LTP
+                quotes = [self.fetch_single(token, *watched[token]) for token in batch]
+            fetched.extend(q for q in quotes if q)
+        return fetched
+
+    def fetch_batch(self, exchange_tokens):
+        """[(token, ltp, timestamp)] from one getMarketData call; None if it was answered without quotes"""
+        with self.lock:
+            self.round_trips += 1
+        resp = self.api.getMarketData("LTP", exchange_tokens)
+        if not resp or not resp.get('status') or not resp.get('data'):
+            if is_throttled((resp or {}).get('message', "")):
+                raise RateLimitExceeded(resp['message'])
+            return None
+
+        now = self.clock.time()
+        return [(str(q['symbolToken']), float(q['ltp']), now) for q in resp['data'].get('fetched', [])]
+
+    def fetch_single(self, token, exchange, symbol):
+        """(token, ltp, timestamp) from one ltpData call, or None"""
+        try:
+            with self.lock:
+                self.round_trips += 1
+            resp = self.api.ltpData(exchange, symbol, token)
+            if resp and resp.get('status'):
+                return (token, float(resp['data']['ltp']), self.clock.time())
+        except Exception as e:
+            logger.warning(f"Quotes: LTP fetch failed for {symbol} ({token}): {e}")
+        return None
+
+    def update(self, token, ltp, timestamp):
+        with self.lock:
+            self.snapshot[token] = (ltp, timestamp)
+        for callback in self.listeners:
+            try:
+                callback(token, ltp, timestamp)
+            except Exception as e:
+                logger.error(f"Quotes: Listener error: {e}")
+        # Waiters wake after listeners (e.g. bar aggregators) have seen the update
+        with self.lock:
+            self.updated.notify_all()
@@ -0,0 +1,122 @@
+import time
+import threading
+from config.settings import Config
+from utils.logger import logger
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would have to wait longer than the limiter's max_wait"""
+    pass
+
+def is_throttled(error):
+    """True for the limiter's own refusal or the broker's 'exceeding access rate' answer"""
+    return isinstance(error, RateLimitExceeded) or "exceeding access rate" in str(error).lower()
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: 'rate' tokens per second, bursts up to 'capacity'.
+    A caller that finds the bucket empty reserves the next token (the balance goes
+    negative) and sleeps outside the lock, so concurrent callers queue fairly.
+    """
+    def __init__(self, name, rate, capacity=None):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.used = 0
+        self.waited = 0
+        self.wait_time = 0.0
+        self.rejected = 0
+
+    def acquire(self, max_wait=None):
+        """Takes one token, sleeping if needed. Returns the time waited."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                self.rejected += 1
+                raise RateLimitExceeded(f"{self.name}: needs {wait:.2f}s wait (max {max_wait:.2f}s)")
+
+            self.tokens -= 1
+            self.used += 1
+            if wait > 0:
+                self.waited += 1
+                self.wait_time += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def metrics(self):
+        with self.lock:
+            return {
+                'used': self.used,
+                'waited': self.waited,
+                'wait_time': round(self.wait_time, 3),
+                'rejected': self.rejected,
+            }
+
+class RateLimiter:
+    """
+    One TokenBucket per SmartAPI endpoint class (see Config.RATE_LIMITS).
+    """
+    def __init__(self, limits=None, max_wait=None):
+        limits = limits or Config.RATE_LIMITS
+        self.max_wait = Config.RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        self.buckets = {name: TokenBucket(name, rate, burst) for name, (rate, burst) in limits.items()}
+
+    def acquire(self, endpoint_class):
+        bucket = self.buckets.get(endpoint_class)
+        if bucket is None: return 0.0
+        return bucket.acquire(self.max_wait)
+
+    def metrics(self):
+        return {name: bucket.metrics() for name, bucket in self.buckets.items()}
+
+    def log_metrics(self):
+        for name, m in self.metrics().items():
+            if m['used'] or m['rejected']:
+                logger.info(f"RateLimit: {name:<10} used: {m['used']} | waited: {m['waited']} ({m['wait_time']:.2f}s) | rejected: {m['rejected']}")
+
+# Budgets are per account, so every API wrapper in the process shares one limiter
+shared_rate_limiter = RateLimiter()
+
+class RateLimitedAPI:
+    """
+    Wraps a SmartConnect (or Mock) session. Every rate-limited call first takes a token
+    from its endpoint class bucket; all other attributes pass straight through.
+    """
+    ENDPOINTS = {
+        'getCandleData': 'historical',
+        'getOIData': 'historical',
+        'ltpData': 'quote',
+        'getMarketData': 'quote',
+        'placeOrder': 'orders',
+        'modifyOrder': 'orders',
+        'cancelOrder': 'orders',
+        'orderBook': 'orderbook',
+        'tradeBook': 'orderbook',
+        'rmsLimit': 'rms',
+    }
+
+    def __init__(self, api, limiter=None):
+        self.api = api
+        self.limiter = limiter or shared_rate_limiter
+
+    def __getattr__(self, name):
+        if name == 'api': raise AttributeError(name)
+        attr = getattr(self.api, name)
+        endpoint_class = self.ENDPOINTS.get(name)
+        if endpoint_class is None or not callable(attr):
+            return attr
+
+        def limited(*args, **kwargs):
+            self.limiter.acquire(endpoint_class)
+            return attr(*args, **kwargs)
+        return limited
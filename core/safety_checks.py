@@ -1,17 +1,24 @@
 import datetime
-import time
+from core.quote_service import QuoteService
+from core.order_service import OrderService
+from utils.clock import system_clock
 
 class SafetyGatekeeper:
-    def __init__(self, api):
+    def __init__(self, api, quotes=None, clock=None, orders=None):
         self.api = api
+        self.clock = clock or system_clock
+        self.quotes = quotes or QuoteService(api, clock=self.clock)
+        self.orders = orders or OrderService(api, clock=self.clock)
         self.cached_rms = None
         self.last_rms_time = 0
+        self.cached_vix_mult = None
+        self.last_vix_time = 0
 
     def is_market_open(self):
         """
         Hard rule: 09:15 to 15:29 IST
         """
-        now = datetime.datetime.now().time()
+        now = self.clock.now().time()
         start = datetime.time(9, 15)
         end = datetime.time(15, 29)
         
@@ -29,7 +36,7 @@ class SafetyGatekeeper:
             print(">>> [Gatekeeper] Error: No Timestamp provided.")
             return False
             
-        now = datetime.datetime.now()
+        now = self.clock.now()
         # Ensure timezone awareness compatibility if needed. Assuming both are naive or same TZ.
         diff = (now - tick_timestamp).total_seconds()
         
@@ -38,22 +45,26 @@ class SafetyGatekeeper:
         print(f">>> [Gatekeeper] Data Stale! Delay: {diff:.2f}s")
         return False
 
+    def get_rms_limit(self):
+        """
+        Returns the rmsLimit response, cached for 10 seconds.
+        """
+        if self.clock.time() - self.last_rms_time < 10 and self.cached_rms:
+            return self.cached_rms
+
+        # SmartAPI rmsLimit fetch (throttled by the shared RateLimiter)
+        limit = self.api.rmsLimit()
+        self.cached_rms = limit
+        self.last_rms_time = self.clock.time()
+        return limit
+
     def check_funds(self, required_margin_per_lot=150000):
         """
         Rule: Available Cash > Required Margin * 1.1 (10% Buffer)
         Note: required_margin_per_lot is an estimate.
         """
         try:
-            # Check cache (10 seconds validity)
-            if time.time() - self.last_rms_time < 10 and self.cached_rms:
-                limit = self.cached_rms
-            else:
-                # 0.5s delay to prevent burst rate limit
-                time.sleep(0.5) 
-                # SmartAPI rmsLimit fetch
-                limit = self.api.rmsLimit()
-                self.cached_rms = limit
-                self.last_rms_time = time.time()
+            limit = self.get_rms_limit()
             
             if limit and limit.get('status'):
                 # 'net' or 'availableCash' depending on response structure
@@ -96,15 +107,7 @@ class SafetyGatekeeper:
         This is a hard check before placing an order.
         """
         try:
-            # Reuse cache if available and fresh
-            if time.time() - self.last_rms_time < 10 and self.cached_rms:
-                limit = self.cached_rms
-            else:
-                # Small delay
-                time.sleep(0.5)
-                limit = self.api.rmsLimit()
-                self.cached_rms = limit
-                self.last_rms_time = time.time()
+            limit = self.get_rms_limit()
 
             if limit and limit.get('status'):
                 available_cash = float(limit['data']['net'])
@@ -127,12 +130,13 @@ class SafetyGatekeeper:
         Rule: No PENDING orders for the same symbol to avoid duplicates.
         """
         try:
-            book = self.api.orderBook()
-            if book and book.get('status'):
-                for order in book['data']:
-                    if order['tradingsymbol'] == symbol and order['status'] in ['open', 'pending']:
-                        print(f">>> [Gatekeeper] Active Order exists for {symbol}. Blocking duplicate.")
-                        return False
+            active = self.orders.open_orders(symbol)
+            if active is None:
+                print(">>> [Gatekeeper] Order book unavailable. Blocking entry.")
+                return False
+            if active:
+                print(f">>> [Gatekeeper] Active Order exists for {symbol}. Blocking duplicate.")
+                return False
             return True
         except Exception as e:
             print(f">>> [Gatekeeper] OrderBook Check Error: {e}")
@@ -153,7 +157,7 @@ class SafetyGatekeeper:
         """
         Rule: No new trades between 11:30 AM - 01:00 PM.
         """
-        now = datetime.datetime.now().time()
+        now = self.clock.now().time()
         start = datetime.time(11, 30)
         end = datetime.time(13, 0)
         
@@ -165,8 +169,12 @@ class SafetyGatekeeper:
     def get_vix_adjustment(self):
         """
         Rule: If India VIX > 25, reduce quantity by 50%.
-        Returns multiplier (1.0 or 0.5).
+        Returns multiplier (1.0 or 0.5). Cached for 60 seconds.
         """
+        if self.clock.time() - self.last_vix_time < 60 and self.cached_vix_mult is not None:
+            return self.cached_vix_mult
+
+        mult = 1.0
         try:
             # Try to fetch INDIA VIX. Token for INDIA VIX on NSE is usually 26009 or similar, 
             # but depends on broker mapping. 
@@ -176,14 +184,16 @@ class SafetyGatekeeper:
             # Assuming 99926009 is India VIX based on Nifty being 99926000
             vix_token = "99926017" 
             
-            response = self.api.ltpData("NSE", "INDIA VIX", vix_token)
-            if response and response.get('status'):
-                vix = float(response['data']['ltp'])
+            # Read from the shared quote snapshot (refreshed together with the index and open legs)
+            vix = self.quotes.get_ltp(vix_token, "NSE", "INDIA VIX")
+            if vix is not None:
                 # print(f">>> [Market] India VIX: {vix}")
                 
                 if vix > 25.0:
                     print(f">>> [Risk] ⚠️ High VIX ({vix} > 25). Reducing Quantity by 50%.")
-                    return 0.5
+                    mult = 0.5
+                self.cached_vix_mult = mult
+                self.last_vix_time = self.clock.time()
             else:
                 # print(">>> [Risk] Could not fetch VIX. Assuming Normal.")
                 pass
@@ -192,4 +202,4 @@ class SafetyGatekeeper:
             # print(f">>> [Risk] VIX Check Error: {e}")
             pass
             
-        return 1.0
+        return mult
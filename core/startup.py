@@ -0,0 +1,131 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Config
+from core.quote_service import QuoteService
+from core.vol_surface import VolSurface
+from utils.expiry_calculator import get_next_weekly_expiry
+from utils.logger import logger
+
+class StartupOrchestrator:
+    """
+    Runs the independent startup phases concurrently so the first signal
+    is not held up by the slowest one:
+
+        login ──┬── strategy (auto-select + constructor) ── RMS / VIX warm-up
+                └── Nifty LTP ──┐
+        scrip master ───────────┴── ATM +/- N token pre-resolution ── vol surface
+        expiry
+
+    The session's QuoteService watches the index, VIX and ATM +/- N contracts,
+    so one batched request refreshes all of them. The ATM +/- N chain is registered on
+    the session's VolSurface, which the auto-selector can wait for (surface.wait_ready).
+    Per-phase timings are logged at the end.
+    """
+    NIFTY_TOKEN = "99926000"
+    VIX_TOKEN = "99926017"
+
+    def __init__(self, connect, loader, atm_window=None, max_workers=4):
+        self.connect = connect # Callable returning an api session (or None)
+        self.loader = loader
+        self.atm_window = Config.STARTUP_ATM_WINDOW if atm_window is None else atm_window
+        self.max_workers = max_workers
+
+        self.timings = {}
+        self.lock = threading.Lock()
+
+        # Filled by run()
+        self.api = None
+        self.quotes = None
+        self.surface = None
+        self.bot = None
+        self.expiry = None
+        self.spot = None
+        self.atm_contracts = []
+
+    def timed(self, phase, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self.lock:
+                self.timings[phase] = time.perf_counter() - start
+
+    def run(self, strategy_factory):
+        """
+        strategy_factory(api, quotes) -> strategy instance (or None to abort).
+        Returns the strategy, with api / expiry / spot available on the orchestrator.
+        """
+        start = time.perf_counter()
+        print(">>> [Startup] Running login, Scrip Master and warm-up in parallel...")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            login_f = pool.submit(self.timed, "login", self.connect)
+            scrip_f = pool.submit(self.timed, "scrip_master", self.loader.load_scrip_master)
+            self.expiry = self.timed("expiry", get_next_weekly_expiry)
+
+            self.api = login_f.result()
+            if not self.api:
+                scrip_f.result()
+                self.log_timings(start)
+                return None
+
+            self.quotes = QuoteService(self.api)
+            self.quotes.watch("NSE", self.NIFTY_TOKEN, "Nifty 50")
+            self.quotes.watch("NSE", self.VIX_TOKEN, "INDIA VIX")
+            self.surface = VolSurface(self.quotes)
+            ltp_f = pool.submit(self.timed, "nifty_ltp", self.fetch_spot)
+            # ATM resolution needs the spot and the Scrip Master, not the strategy
+            atm_f = pool.submit(self.prepare_chain, scrip_f, ltp_f)
+
+            # Strategy construction only needs the session; overlaps with the Scrip Master load
+            self.bot = self.timed("strategy", strategy_factory, self.api, self.quotes)
+
+            warmup_fs = []
+            if self.bot is not None:
+                gatekeeper = self.bot.gatekeeper
+                warmup_fs.append(pool.submit(self.timed, "rms", gatekeeper.get_rms_limit))
+                warmup_fs.append(pool.submit(self.timed, "vix", gatekeeper.get_vix_adjustment))
+
+            atm_f.result()
+
+            for f in warmup_fs:
+                try:
+                    f.result()
+                except Exception as e:
+                    logger.warning(f"Startup: Warm-up call failed: {e}")
+
+        self.log_timings(start)
+        return self.bot
+
+    def fetch_spot(self):
+        # One batched request: index and VIX together
+        spot = self.quotes.get_ltp(self.NIFTY_TOKEN, "NSE", "Nifty 50")
+        if spot is None:
+            logger.warning("Startup: Nifty LTP warm-up failed")
+        return spot
+
+    def prepare_chain(self, scrip_f, ltp_f):
+        scrip_f.result()
+        self.spot = ltp_f.result()
+        self.timed("atm_tokens", self.resolve_atm_contracts)
+
+    def resolve_atm_contracts(self):
+        """Builds the expiry's OptionChain and resolves ATM +/- N so entries hit warm caches"""
+        if not self.spot: return
+
+        chain = self.loader.get_option_chain("NIFTY", self.expiry)
+        self.atm_contracts = chain.strikes_around(self.spot, self.atm_window)
+        for strike, ce, pe in self.atm_contracts:
+            for token, symbol in (ce, pe):
+                if token: self.quotes.watch("NFO", token, symbol)
+        if self.atm_contracts:
+            lo, hi = self.atm_contracts[0][0], self.atm_contracts[-1][0]
+            logger.info(f"Startup: Pre-resolved {len(self.atm_contracts)} strikes ({lo}-{hi}) around spot {self.spot} for {self.expiry}")
+            self.surface.add_chain(chain, self.spot, self.atm_window)
+
+    def log_timings(self, start):
+        total = time.perf_counter() - start
+        logger.info(f"Startup: Ready in {total:.2f}s (phases overlap, so they sum to more than the total)")
+        for phase, elapsed in sorted(self.timings.items(), key=lambda kv: -kv[1]):
+            logger.info(f"Startup:   {phase:<14} {elapsed:7.3f}s")
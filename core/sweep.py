@@ -0,0 +1,179 @@
+import contextlib
+import itertools
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from core.backtest import HistoricalStore, Backtester
+from utils.logger import logger
+
+# Summary columns where a smaller value ranks higher
+LOWER_IS_BETTER = {"max_drawdown", "charges", "avg_slippage"}
+
+def parameter_grid(grid):
+    """{'MOMENTUM_EMA_FAST': [5, 9], 'TSL_TRAIL': [0.1, 0.2]} -> every combination as a dict"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+@contextlib.contextmanager
+def config_overrides(params):
+    """Sets Config attributes for the duration of the block (a sweep worker runs one combination at a time)"""
+    unknown = [name for name in params if not hasattr(Config, name)]
+    if unknown:
+        raise ValueError(f"Unknown Config parameters: {', '.join(unknown)}")
+    saved = {name: getattr(Config, name) for name in params}
+    try:
+        for name, value in params.items():
+            setattr(Config, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+class SharedBars:
+    """
+    A HistoricalStore's 1-minute series copied once into shared memory (one block per token:
+    int64 timestamps followed by float64 OHLCV rows). Worker processes attach() by block name
+    and get a HistoricalStore over views of the shared blocks, so the history is neither
+    pickled per task nor copied per worker.
+    """
+    def __init__(self, store):
+        self.blocks = []
+        self.layout = {} # {token: (block name, rows)}
+        for token, (ts, ohlcv) in store.series.items():
+            rows = len(ts)
+            block = shared_memory.SharedMemory(create=True, size=max(1, rows * 48))
+            self.blocks.append(block)
+            np.ndarray(rows, dtype=np.int64, buffer=block.buf)[:] = ts
+            np.ndarray((rows, 5), dtype=np.float64, buffer=block.buf, offset=rows * 8)[:] = ohlcv
+            self.layout[token] = (block.name, rows)
+
+    @staticmethod
+    def attach(layout):
+        """(HistoricalStore over the shared blocks, blocks); keep the blocks referenced while the store is used"""
+        store = HistoricalStore()
+        blocks = []
+        for token, (name, rows) in layout.items():
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            ts = np.ndarray(rows, dtype=np.int64, buffer=block.buf)
+            ohlcv = np.ndarray((rows, 5), dtype=np.float64, buffer=block.buf, offset=rows * 8)
+            store.series[token] = (ts, ohlcv)
+        return store, blocks
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Per-process state of a sweep worker (set by _init_worker)
+_worker = {}
+
+def _init_worker(layout, strategy_cls, options):
+    store, blocks = SharedBars.attach(layout)
+    _worker.update(store=store, blocks=blocks, strategy_cls=strategy_cls, options=options)
+    logger.setLevel(logging.WARNING)
+
+def _run_task(task):
+    """One backtest: (params, first session, last session) -> summary dict"""
+    params, start, end = task
+    with config_overrides(params):
+        backtester = Backtester(_worker['store'], _worker['strategy_cls'], **_worker['options'])
+        return backtester.run(start, end).summary()
+
+class ParameterSweep:
+    """
+    Grid search of Config parameters over stored history, one backtest per combination.
+
+    Combinations are fanned out over a process pool (Config.SWEEP_WORKERS). The bars are
+    placed in shared memory once per sweep and every worker replays from the same blocks;
+    each worker applies a combination as Config overrides in its own process, so runs are
+    independent and the sweep scales with the number of cores.
+
+    run() ranks every combination over one period; walk_forward() optimises on rolling
+    in-sample windows and reports each window's best combination on the sessions after it.
+    """
+    def __init__(self, store, strategy_cls, grid, workers=None, metric=None, **options):
+        self.store = store
+        self.strategy_cls = strategy_cls
+        self.combinations = parameter_grid(grid)
+        self.names = list(grid)
+        self.workers = workers or Config.SWEEP_WORKERS
+        self.metric = metric or Config.SWEEP_METRIC
+        self.options = options # Backtester keyword arguments (action, capital, start, repeat, ...)
+
+    def evaluate(self, tasks):
+        """Summaries for [(params, start, end), ...] in task order"""
+        workers = max(1, min(self.workers, len(tasks)))
+        with SharedBars(self.store) as shared:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared.layout, self.strategy_cls, self.options)) as pool:
+                return list(pool.map(_run_task, tasks))
+
+    def rank(self, rows):
+        table = pd.DataFrame(rows)
+        table = table.sort_values(self.metric, ascending=self.metric in LOWER_IS_BETTER, kind='stable')
+        table.insert(0, 'rank', range(1, len(table) + 1))
+        return table.reset_index(drop=True)
+
+    def run(self, start=None, end=None):
+        """Ranked table: one row per combination (parameters, then the backtest summary)"""
+        began = time.perf_counter()
+        summaries = self.evaluate([(params, start, end) for params in self.combinations])
+        table = self.rank([{**params, **summary} for params, summary in zip(self.combinations, summaries)])
+        logger.info(f"Sweep: {len(self.combinations)} combinations on {self.workers} workers in {time.perf_counter() - began:.1f}s")
+        return table
+
+    def folds(self, train, test, step=None):
+        """Rolling (in-sample, out-of-sample) session windows: 'train' sessions, then the next 'test'"""
+        sessions = self.store.sessions()
+        step = step or test
+        return [(sessions[i:i + train], sessions[i + train:i + train + test])
+                for i in range(0, len(sessions) - train - test + 1, step)]
+
+    def walk_forward(self, train, test, step=None):
+        """
+        Per fold: every combination is run in-sample and the best by 'metric' is replayed
+        out-of-sample. Returns one row per fold (window dates, chosen parameters, in-sample
+        and out-of-sample results). All in-sample runs go to the pool as one batch.
+        """
+        folds = self.folds(train, test, step)
+        if not folds:
+            raise ValueError(f"Walk-forward needs at least {train + test} sessions, history has {len(self.store.sessions())}")
+
+        began = time.perf_counter()
+        tasks = [(params, fold[0][0], fold[0][-1]) for fold in folds for params in self.combinations]
+        in_sample = self.evaluate(tasks)
+
+        best = []
+        for n, fold in enumerate(folds):
+            rows = in_sample[n * len(self.combinations):(n + 1) * len(self.combinations)]
+            ranked = self.rank([{**params, **summary} for params, summary in zip(self.combinations, rows)])
+            best.append(ranked.iloc[0])
+        out_sample = self.evaluate([({name: row[name] for name in self.names}, fold[1][0], fold[1][-1])
+                                    for row, fold in zip(best, folds)])
+
+        report = []
+        for n, (fold, row, oos) in enumerate(zip(folds, best, out_sample)):
+            report.append({
+                'fold': n + 1,
+                'is_start': fold[0][0], 'is_end': fold[0][-1],
+                'oos_start': fold[1][0], 'oos_end': fold[1][-1],
+                **{name: row[name] for name in self.names},
+                f'is_{self.metric}': row[self.metric],
+                **{f'oos_{key}': oos[key] for key in ('trades', 'win_rate', 'net_pnl', 'max_drawdown')},
+            })
+        table = pd.DataFrame(report)
+        logger.info(f"Walk-forward: {len(folds)} folds x {len(self.combinations)} combinations in {time.perf_counter() - began:.1f}s | "
+                    f"Out-of-sample net P&L: {table['oos_net_pnl'].sum():,.2f}")
+        return table
@@ -0,0 +1,247 @@
+import json
+import ssl
+import time
+import queue
+import struct
+import threading
+import websocket
+from config.settings import Config
+from utils.logger import logger
+
+class TickFeed:
+    """
+    Streaming LTP ticks over the SmartAPI market-data websocket (SmartStream v2 protocol).
+
+    The socket runs in a daemon thread. Dropped connections are retried with exponential
+    backoff and every subscription is re-sent on reconnect. Each tick updates the attached
+    QuoteService snapshot (waking quotes.wait_for_update), then goes to the registered
+    callbacks and queues as {'token', 'exchange', 'ltp', 'exchange_timestamp', 'received_at'}.
+    """
+    NAME = "TickFeed"
+    LTP_MODE = 1
+    SUBSCRIBE = 1
+    UNSUBSCRIBE = 0
+    EXCHANGE_TYPES = {"NSE": 1, "NFO": 2, "BSE": 3, "BFO": 4, "MCX": 5}
+    # mode(1) exchange(1) token(25) sequence(8) exchange_ts(8) ltp in paise(8), little endian
+    LTP_PACKET = struct.Struct("<BB25sqqq")
+
+    def __init__(self, auth_token, api_key, client_code, feed_token, url=None, quotes=None, max_backoff=None):
+        self.url = url or Config.TICK_FEED_URL
+        self.headers = {
+            "Authorization": auth_token,
+            "x-api-key": api_key,
+            "x-client-code": client_code,
+            "x-feed-token": feed_token,
+        }
+        self.max_backoff = Config.TICK_FEED_MAX_BACKOFF if max_backoff is None else max_backoff
+
+        self.subscriptions = {} # {exchange: set(tokens)}
+        self.exchanges = {v: k for k, v in self.EXCHANGE_TYPES.items()}
+        self.callbacks = []
+        self.queues = []
+        self.lock = threading.Lock()
+
+        self.ws = None
+        self.thread = None
+        self.running = False
+        self.connected = False
+        self.reconnects = 0
+        self.ticks = 0
+
+        self.quotes = None
+        if quotes is not None:
+            self.attach(quotes)
+
+    @classmethod
+    def from_session(cls, api, quotes=None, url=None):
+        """Builds the feed from a logged-in SmartConnect (or its RateLimitedAPI wrapper)"""
+        return cls(**cls.credentials(api), url=url, quotes=quotes)
+
+    @staticmethod
+    def credentials(api):
+        """Socket auth headers' values from a session (mock placeholders when it has none)"""
+        token = getattr(api, 'access_token', None) or "mock_jwt_token"
+        if not token.startswith("Bearer "):
+            token = f"Bearer {token}"
+        return {
+            'auth_token': token,
+            'api_key': getattr(api, 'api_key', None) or Config.API_KEY,
+            'client_code': getattr(api, 'userId', None) or Config.CLIENT_ID,
+            'feed_token': getattr(api, 'feed_token', None) or "mock_feed_token",
+        }
+
+    def attach(self, quotes):
+        """Streams every token the QuoteService watches (now and later) into its snapshot"""
+        self.quotes = quotes
+        quotes.feed = self
+        with quotes.lock:
+            watched = list(quotes.watched.items())
+        for token, (exchange, _) in watched:
+            self.subscribe(exchange, [token])
+
+    def add_callback(self, callback):
+        """callback(tick) runs on the feed thread; keep it short"""
+        self.callbacks.append(callback)
+
+    def queue(self, maxsize=0):
+        """Returns a Queue receiving every tick (oldest ticks dropped when full)"""
+        q = queue.Queue(maxsize)
+        self.queues.append(q)
+        return q
+
+    # --- Subscriptions ---
+
+    def subscribe(self, exchange, tokens):
+        tokens = [str(t) for t in tokens]
+        with self.lock:
+            new = [t for t in tokens if t not in self.subscriptions.setdefault(exchange, set())]
+            self.subscriptions[exchange].update(new)
+        if new and self.connected:
+            self.send_request(self.SUBSCRIBE, {exchange: new})
+
+    def unsubscribe(self, exchange, tokens):
+        tokens = [str(t) for t in tokens]
+        with self.lock:
+            subscribed = self.subscriptions.get(exchange, set())
+            gone = [t for t in tokens if t in subscribed]
+            subscribed.difference_update(gone)
+        if gone and self.connected:
+            self.send_request(self.UNSUBSCRIBE, {exchange: gone})
+
+    def resubscribe(self):
+        with self.lock:
+            subscriptions = {ex: list(tokens) for ex, tokens in self.subscriptions.items() if tokens}
+        if subscriptions:
+            self.send_request(self.SUBSCRIBE, subscriptions)
+
+    def send_request(self, action, exchange_tokens):
+        request = {
+            "correlationID": "nifty_bot",
+            "action": action,
+            "params": {
+                "mode": self.LTP_MODE,
+                "tokenList": [
+                    {"exchangeType": self.EXCHANGE_TYPES[ex], "tokens": tokens}
+                    for ex, tokens in exchange_tokens.items()
+                ],
+            },
+        }
+        try:
+            self.ws.send(json.dumps(request))
+        except Exception as e:
+            # The reconnect path re-sends every subscription
+            if self.running: logger.warning(f"{self.NAME}: Subscription request failed: {e}")
+
+    # --- Connection ---
+
+    def start(self):
+        if self.running: return self
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=self.NAME, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.ws:
+            self.ws.close()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def wait_connected(self, timeout):
+        deadline = time.time() + timeout
+        while not self.connected and time.time() < deadline:
+            time.sleep(0.01)
+        return self.connected
+
+    def run(self):
+        backoff = min(0.5, self.max_backoff)
+        while self.running:
+            self.ws = websocket.WebSocketApp(
+                self.url, header=self.headers,
+                on_open=self.on_open, on_message=self.on_message,
+                on_error=self.on_error, on_close=self.on_close,
+            )
+            opened_at = time.time()
+            self.ws.run_forever(
+                sslopt=self.ssl_options(),
+                ping_interval=Config.TICK_FEED_HEARTBEAT, ping_payload="ping",
+            )
+            self.connected = False
+            if not self.running: break
+
+            # A connection that stayed up for a while resets the backoff
+            if time.time() - opened_at > 60: backoff = min(0.5, self.max_backoff)
+            self.reconnects += 1
+            logger.warning(f"{self.NAME}: Disconnected. Reconnecting in {backoff:.1f}s (attempt {self.reconnects})")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def ssl_options(self):
+        """websocket-client's default certificate checks unless explicitly opted out (ws:// has no TLS)"""
+        if Config.TICK_FEED_INSECURE_TLS and self.url.startswith("wss://"):
+            logger.warning(f"{self.NAME}: TLS certificate verification disabled (TICK_FEED_INSECURE_TLS)")
+            return {"cert_reqs": ssl.CERT_NONE}
+        return None
+
+    def on_open(self, ws):
+        self.connected = True
+        logger.info(f"{self.NAME}: Connected to {self.url}")
+        self.resubscribe()
+
+    def on_close(self, ws, status_code=None, message=None):
+        self.connected = False
+
+    def on_error(self, ws, error):
+        if self.running: logger.warning(f"{self.NAME}: {error}")
+
+    def on_message(self, ws, message):
+        if isinstance(message, str):
+            return # "pong" heartbeat replies and control messages
+        if len(message) < self.LTP_PACKET.size:
+            return
+
+        exchange_type, token, exchange_ts, ltp = self.parse_ltp(message)
+        tick = {
+            'token': token,
+            'exchange': self.exchanges.get(exchange_type, str(exchange_type)),
+            'ltp': ltp,
+            'exchange_timestamp': exchange_ts,
+            'received_at': time.time(),
+        }
+        self.dispatch(tick)
+
+    def dispatch(self, tick):
+        self.ticks += 1
+        if self.quotes is not None:
+            self.quotes.update(tick['token'], tick['ltp'], tick['received_at'])
+
+        for callback in self.callbacks:
+            try:
+                callback(tick)
+            except Exception as e:
+                logger.error(f"{self.NAME}: Callback error: {e}")
+
+        for q in self.queues:
+            try:
+                q.put_nowait(tick)
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                    q.put_nowait(tick)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    # --- Binary protocol ---
+
+    @classmethod
+    def parse_ltp(cls, packet):
+        """LTP-mode packet -> (exchange_type, token, exchange_timestamp_ms, ltp in rupees)"""
+        _, exchange_type, token, _, exchange_ts, ltp_paise = cls.LTP_PACKET.unpack_from(packet)
+        return exchange_type, token.split(b"\x00", 1)[0].decode(), exchange_ts, ltp_paise / 100.0
+
+    @classmethod
+    def pack_ltp(cls, exchange_type, token, ltp, sequence=0, exchange_ts=None):
+        """Encodes an LTP-mode packet (used by the stand-in feed server)"""
+        exchange_ts = int(time.time() * 1000) if exchange_ts is None else exchange_ts
+        return cls.LTP_PACKET.pack(cls.LTP_MODE, exchange_type, str(token).encode(), sequence, exchange_ts, int(round(ltp * 100)))
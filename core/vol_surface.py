@@ -0,0 +1,261 @@
+import bisect
+import datetime
+import threading
+import numpy as np
+from config.settings import Config
+from utils import black_scholes as bs
+from utils.clock import system_clock
+from utils.logger import logger
+
+class VolSurface:
+    """
+    Implied-volatility surface (strike x expiry) kept current from the quote stream.
+
+    Every registered contract is a point holding its latest premium, its IV, and when and
+    at what spot that IV was solved. Quote updates only mark points dirty (O(1) per tick);
+    the next query re-solves just the dirty points in one vectorized call, plus any point
+    whose spot has since moved more than Config.VOL_SURFACE_RESPOT. Per expiry the smile
+    (out-of-the-money side per strike) is kept strike-sorted, so iv()/delta() for any strike
+    is a bisect plus a linear interpolation. Expiries between listed ones are interpolated
+    in total variance.
+    """
+    def __init__(self, quotes=None, spot_token="99926000", max_age=None, respot=None, rate=None, clock=None):
+        self.quotes = quotes
+        self.clock = clock or system_clock
+        self.spot_token = str(spot_token)
+        self.max_age = Config.VOL_SURFACE_MAX_AGE if max_age is None else max_age
+        self.respot = Config.VOL_SURFACE_RESPOT if respot is None else respot
+        self.rate = rate
+
+        self.spot = None
+        self.slices = {} # {expiry: {'strikes', 'expiry_date', 'CE'/'PE': {tokens, premium, quoted_at, iv, solved_spot, solved_at}, 'curve'}}
+        self.points = {} # {token: (expiry, option_type, position)}
+        self.dirty = set()
+        self.last_pull = 0
+        self.solved_count = 0 # points solved since creation (for metrics / tests)
+        self.lock = threading.RLock()
+        self.ready = threading.Event()
+
+        if quotes is not None:
+            quotes.watch("NSE", self.spot_token, "Nifty 50")
+            quotes.add_listener(self.on_quote)
+
+    # --- Contracts ---
+
+    def add_chain(self, chain, spot=None, width=None):
+        """
+        Registers an OptionChain (TokenLookup.get_option_chain): every strike, or ATM +/- width
+        around spot. Contracts are watched on the QuoteService so their quotes flow in.
+        """
+        rows = chain.strikes_around(spot, width) if spot and width else list(zip(chain.strikes, chain.ce, chain.pe))
+        if not rows: return
+
+        strikes = np.array([r[0] for r in rows], dtype=np.float64)
+        entry = {'strikes': strikes, 'expiry_date': datetime.datetime.strptime(chain.expiry, "%d%b%Y").date(), 'curve': ([], [])}
+        watch = []
+        with self.lock:
+            for side, legs in (("CE", [r[1] for r in rows]), ("PE", [r[2] for r in rows])):
+                entry[side] = {
+                    'tokens': [token for token, _ in legs],
+                    'premium': np.full(len(rows), np.nan),
+                    'quoted_at': np.zeros(len(rows)),
+                    'iv': np.full(len(rows), np.nan),
+                    'solved_spot': np.full(len(rows), np.nan),
+                    'solved_at': np.zeros(len(rows)),
+                }
+                for i, (token, symbol) in enumerate(legs):
+                    if token is None: continue
+                    self.points[str(token)] = (chain.expiry, side, i)
+                    watch.append((token, symbol))
+            self.slices[chain.expiry] = entry
+            if spot: self.spot = self.spot or spot
+
+        # The QuoteService calls on_quote under no lock of its own; never call into it holding ours
+        if self.quotes is not None:
+            for token, symbol in watch:
+                self.quotes.watch("NFO", token, symbol)
+                quote = self.quotes.snapshot.get(str(token))
+                if quote:
+                    self.on_quote(str(token), *quote)
+
+        logger.info(f"Surface: Tracking {chain.underlying} {chain.expiry} ({len(rows)} strikes, {strikes[0]:g}-{strikes[-1]:g})")
+        self.ready.set()
+
+    def wait_ready(self, timeout):
+        """True once at least one expiry is registered"""
+        return self.ready.wait(timeout)
+
+    def on_quote(self, token, ltp, timestamp):
+        """QuoteService listener: records the premium and marks the point dirty (O(1))"""
+        if token == self.spot_token:
+            self.spot = ltp
+            return
+        point = self.points.get(token)
+        if point is None: return
+        expiry, side, i = point
+        with self.lock:
+            leg = self.slices[expiry][side]
+            leg['premium'][i] = ltp
+            leg['quoted_at'][i] = timestamp
+            self.dirty.add(point)
+
+    # --- Solving ---
+
+    def pull_quotes(self):
+        """Polling sessions: one batched quote refresh once the surface's quotes are older than max_age"""
+        if self.quotes is None or self.quotes.is_streaming(): return
+        if self.clock.time() - self.last_pull < self.max_age: return
+        self.last_pull = self.clock.time()
+        self.quotes.refresh()
+
+    def refresh(self, now=None):
+        """Re-solves dirty points (and points whose spot moved too far). Returns how many were solved."""
+        self.pull_quotes()
+        return self.solve(now)
+
+    def solve(self, now=None):
+        """refresh() without the quote pull; queries call it holding the lock, after pulling"""
+        now = now or self.clock.now()
+        with self.lock:
+            if not self.spot or not self.slices: return 0
+
+            points = set(self.dirty)
+            self.dirty.clear()
+            for expiry, entry in self.slices.items():
+                for side in ("CE", "PE"):
+                    leg = entry[side]
+                    moved = np.abs(leg['solved_spot'] - self.spot) > self.respot * self.spot
+                    for i in np.flatnonzero(moved & np.isfinite(leg['premium'])):
+                        points.add((expiry, side, int(i)))
+            if not points: return 0
+
+            points = sorted(points)
+            premium = np.empty(len(points))
+            strike = np.empty(len(points))
+            t = np.empty(len(points))
+            is_call = np.empty(len(points), dtype=bool)
+            times = {expiry: bs.time_to_expiry(entry['expiry_date'], now) for expiry, entry in self.slices.items()}
+            for n, (expiry, side, i) in enumerate(points):
+                entry = self.slices[expiry]
+                premium[n] = entry[side]['premium'][i]
+                strike[n] = entry['strikes'][i]
+                t[n] = times[expiry]
+                is_call[n] = side == "CE"
+
+            iv = bs.implied_vol(premium, self.spot, strike, t, is_call, self.rate)
+
+            solved_at = self.clock.time()
+            for n, (expiry, side, i) in enumerate(points):
+                leg = self.slices[expiry][side]
+                leg['iv'][i] = iv[n]
+                leg['solved_spot'][i] = self.spot
+                leg['solved_at'][i] = solved_at
+            for expiry in {p[0] for p in points}:
+                self.build_curve(expiry)
+            self.solved_count += len(points)
+            return len(points)
+
+    def build_curve(self, expiry):
+        """Smile for one expiry: the OTM side's IV per strike (the other side where it has none)"""
+        entry = self.slices[expiry]
+        strikes = entry['strikes']
+        otm_call = strikes >= self.spot
+        iv = np.where(otm_call, entry['CE']['iv'], entry['PE']['iv'])
+        iv = np.where(np.isfinite(iv), iv, np.where(otm_call, entry['PE']['iv'], entry['CE']['iv']))
+        valid = np.isfinite(iv)
+        entry['curve'] = (strikes[valid].tolist(), iv[valid].tolist())
+
+    # --- Queries ---
+
+    def expiries(self):
+        return sorted(self.slices, key=lambda e: self.slices[e]['expiry_date'])
+
+    def smile_iv(self, expiry, strike):
+        """IV at strike on one expiry's smile: linear between quoted strikes, flat beyond them"""
+        strikes, ivs = self.slices[expiry]['curve']
+        if not strikes: return None
+        i = bisect.bisect_left(strikes, strike)
+        if i == 0: return ivs[0]
+        if i == len(strikes): return ivs[-1]
+        lo, hi = strikes[i - 1], strikes[i]
+        w = (strike - lo) / (hi - lo)
+        return ivs[i - 1] + w * (ivs[i] - ivs[i - 1])
+
+    def iv(self, strike, expiry=None, now=None):
+        """
+        IV for any strike. expiry defaults to the nearest one; an expiry between two
+        tracked ones gets total variance (iv^2 * t) interpolated linearly in time.
+        """
+        self.pull_quotes()
+        with self.lock:
+            self.solve(now)
+            return self.interpolate(strike, expiry, now)
+
+    def interpolate(self, strike, expiry=None, now=None):
+        """iv() on the surface as solved (caller holds the lock)"""
+        expiries = self.expiries()
+        if not expiries: return None
+        expiry = expiry or expiries[0]
+        if expiry in self.slices:
+            return self.smile_iv(expiry, strike)
+
+        now = now or self.clock.now()
+        t = bs.time_to_expiry(expiry, now)
+        times = [bs.time_to_expiry(self.slices[e]['expiry_date'], now) for e in expiries]
+        i = bisect.bisect_left(times, t)
+        if i == 0: return self.smile_iv(expiries[0], strike)
+        if i == len(times): return self.smile_iv(expiries[-1], strike)
+        iv_lo, iv_hi = self.smile_iv(expiries[i - 1], strike), self.smile_iv(expiries[i], strike)
+        if iv_lo is None or iv_hi is None: return iv_lo or iv_hi
+        w = (t - times[i - 1]) / (times[i] - times[i - 1])
+        variance = (1 - w) * iv_lo ** 2 * times[i - 1] + w * iv_hi ** 2 * times[i]
+        return float(np.sqrt(variance / t))
+
+    def atm_iv(self, expiry=None, now=None):
+        self.pull_quotes()
+        with self.lock:
+            self.solve(now)
+            if not self.spot: return None
+            return self.interpolate(self.spot, expiry, now)
+
+    def delta(self, strike, option_type, expiry=None, now=None):
+        """Black-Scholes delta at the surface IV (None when the surface has no IV there)"""
+        self.pull_quotes()
+        with self.lock:
+            self.solve(now)
+            expiry = expiry or (self.expiries() or [None])[0]
+            vol = self.interpolate(strike, expiry, now)
+            if vol is None or expiry is None: return None
+            t = bs.time_to_expiry(expiry, now or self.clock.now())
+            return float(bs.greeks(self.spot, strike, t, vol, option_type == "CE", self.rate)['delta'])
+
+    def point(self, strike, option_type, expiry=None, now=None):
+        """
+        Metadata for one contract: premium, IV, quote and IV age (seconds), the spot it was
+        solved at, and 'stale' when its quote is older than max_age or the spot moved since.
+        """
+        self.pull_quotes()
+        with self.lock:
+            self.solve(now)
+            expiry = expiry or (self.expiries() or [None])[0]
+            entry = self.slices.get(expiry)
+            if entry is None: return None
+            i = int(np.searchsorted(entry['strikes'], strike))
+            if i >= len(entry['strikes']) or entry['strikes'][i] != strike: return None
+
+            leg = entry[option_type]
+            stamp = self.clock.time()
+            quoted_at, solved_spot = leg['quoted_at'][i], leg['solved_spot'][i]
+            quote_age = stamp - quoted_at if quoted_at else None
+            moved = not np.isfinite(solved_spot) or abs(solved_spot - self.spot) > self.respot * self.spot
+            return {
+                'expiry': expiry,
+                'strike': strike,
+                'type': option_type,
+                'premium': float(leg['premium'][i]),
+                'iv': float(leg['iv'][i]),
+                'solved_spot': float(solved_spot),
+                'quote_age': quote_age,
+                'iv_age': stamp - leg['solved_at'][i] if leg['solved_at'][i] else None,
+                'stale': quote_age is None or quote_age > self.max_age or moved,
+            }
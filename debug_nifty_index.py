@@ -1,16 +1,14 @@
-import pandas as pd
-import requests
 import time
-from config.settings import Config
+from utils.token_lookup import TokenLookup
 from core.angel_connect import get_angel_session
 import datetime
 
 def check_nifty_index():
-    print(">>> Downloading Scrip Master...")
+    print(">>> Loading Scrip Master...")
     try:
-        response = requests.get(Config.SCRIP_MASTER_URL)
-        data = response.json()
-        df = pd.DataFrame(data)
+        loader = TokenLookup()
+        loader.load_scrip_master()
+        df = loader.df
         
         print(">>> Searching for Nifty Index...")
         # Search for Nifty 50 in NSE segment
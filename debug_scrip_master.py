@@ -1,13 +1,11 @@
-import pandas as pd
-import requests
-from config.settings import Config
+from utils.token_lookup import TokenLookup
 
 def check_vix():
-    print(">>> Downloading Scrip Master...")
+    print(">>> Loading Scrip Master...")
     try:
-        response = requests.get(Config.SCRIP_MASTER_URL)
-        data = response.json()
-        df = pd.DataFrame(data)
+        loader = TokenLookup()
+        loader.load_scrip_master()
+        df = loader.df
         
         print(">>> Loaded. Filtering for INDIA VIX...")
         
@@ -1,16 +1,26 @@
 import argparse
+import json
 import sys
 from core.angel_connect import get_angel_session
 from utils.token_lookup import TokenLookup
 from strategies.nifty_straddle import NiftyStrategy
 from core.mock_connect import MockSmartConnect, MockTokenLookup
-from utils.expiry_calculator import get_next_weekly_expiry
 from strategies.orb_strategy import ORBStrategy
 from strategies.momentum_strategy import MomentumStrategy
 from strategies.vwap_strategy import VWAPStrategy
 from strategies.ohl_strategy import OHLStrategy
 from strategies.inside_bar_strategy import InsideBarStrategy
 from core.decision_engine import DecisionEngine
+from core.startup import StartupOrchestrator
+from core.rate_limiter import RateLimitedAPI, shared_rate_limiter
+from core.tick_feed import TickFeed
+from core.mock_feed_server import MockFeedServer
+from core.order_feed import OrderFeed
+from core.mock_order_feed_server import MockOrderFeedServer
+from core.mock_rest_server import MockRestServer
+from core.backtest import HistoricalStore, Backtester, NIFTY_TOKEN, VIX_TOKEN
+from core.sweep import ParameterSweep
+from config.settings import Config
 
 def run_bot():
     parser = argparse.ArgumentParser(description="Nifty Options Trading Bot")
@@ -18,82 +28,178 @@ def run_bot():
     parser.add_argument("--dry-run", action="store_true", help="Run with Real Data but DO NOT place orders")
     parser.add_argument("--strategy", type=str, default="STRADDLE", choices=["STRADDLE", "ORB", "MOMENTUM", "VWAP", "OHL", "INSIDE_BAR"], help="Choose Strategy")
     parser.add_argument("--auto", action="store_true", help="Enable Smart Auto-Mode (AI Selects Strategy)")
+    parser.add_argument("--http", action="store_true", help="Mock Mode: serve the simulated market over local HTTP and talk to it with the real SmartConnect client")
+    parser.add_argument("--replay", type=str, metavar="CSV", help="Mock Mode: replay stored 1-minute Nifty candles (latest sessions, moved to today) instead of a simulated market")
+    parser.add_argument("--backtest", type=str, metavar="CSV", help="Replay the strategy over stored 1-minute Nifty candles (timestamp,open,high,low,close,volume)")
+    parser.add_argument("--vix", type=str, metavar="CSV", help="Backtest: 1-minute India VIX candles for option pricing")
+    parser.add_argument("--repeat", type=int, metavar="MIN", help="Backtest: re-run a strategy that returned every MIN minutes")
+    parser.add_argument("--sweep", type=str, metavar="JSON", help='Backtest: rank a grid of Config parameters, inline (e.g. \'{"MOMENTUM_EMA_FAST": [5, 9, 13]}\') or a JSON file path')
+    parser.add_argument("--walk-forward", type=str, metavar="IS,OOS", help="Sweep: optimise on IS sessions, test on the next OOS sessions, rolling")
+    parser.add_argument("--workers", type=int, help="Sweep: worker processes (default: CPU count)")
+    parser.add_argument("--out", type=str, default="sweep_results.csv", metavar="CSV", help="Sweep: ranked results table")
     args = parser.parse_args()
 
+    if args.backtest:
+        run_backtest(args)
+        return
+
+    market, rest_server = None, None
     if args.test:
         print("\n>>> [System] STARTING IN MOCK MODE 🟢")
-        api = MockSmartConnect()
-        loader = MockTokenLookup()
-        loader.load_scrip_master() # Just to be consistent with the interface
+        # One simulated market behind the REST session, the token lookup and the tick stream
+        market = MockSmartConnect(history=HistoricalStore.from_csv({NIFTY_TOKEN: args.replay}) if args.replay else None)
+        if args.http:
+            rest_server = MockRestServer(market).start()
+            connect = lambda: RateLimitedAPI(rest_server.session())
+        else:
+            connect = lambda: RateLimitedAPI(market)
+        loader = MockTokenLookup(market)
     else:
         # 1. Initialize Connection
         if args.dry_run:
             print("\n>>> [System] STARTING IN DRY RUN MODE 🟡") 
             print("    (Real Data, No Orders)")
         
-        api = get_angel_session()
-        if not api:
-            return
+        connect = get_angel_session
 
         # 2. Initialize Data Loader
         loader = TokenLookup()
-        loader.load_scrip_master()
 
-    # 3. Smart Auto-Selection (The Brain)
-    if args.auto:
-        print("\n>>> [System] 🧠 SMART AUTO-MODE ACTIVATED")
-        engine = DecisionEngine(api)
-        selected_strategy = engine.analyze_and_select()
+    def build_strategy(api, quotes):
+        # 3. Smart Auto-Selection (The Brain)
+        if args.auto:
+            print("\n>>> [System] 🧠 SMART AUTO-MODE ACTIVATED")
+            engine = DecisionEngine(api, quotes, surface=startup.surface)
+            selected_strategy = engine.analyze_and_select()
+            
+            if selected_strategy:
+                print(f">>> [Auto] 🤖 Brain selected: {selected_strategy}")
+                args.strategy = selected_strategy
+            else:
+                print(">>> [Auto] ❌ Brain could not select a strategy (Low Funds or Market Closed). Exiting.")
+                return None
+
+        # 4. Initialize Strategy Strategies logic...
+        # In test mode, api and loader are mocks. Strategy should work transparently.
+        # In dry_run mode, we pass True to dry_run arg of Strategy
         
-        if selected_strategy:
-            print(f">>> [Auto] 🤖 Brain selected: {selected_strategy}")
-            args.strategy = selected_strategy
+        if args.strategy == "ORB":
+            print(f"\n>>> [Strategy] Selected: Open Range Breakout (ORB)")
+            return ORBStrategy(api, loader, dry_run=args.dry_run, quotes=quotes)
+        elif args.strategy == "MOMENTUM":
+            print(f"\n>>> [Strategy] Selected: Momentum (EMA Crossover) ⚡")
+            return MomentumStrategy(api, loader, dry_run=args.dry_run, quotes=quotes)
+        elif args.strategy == "VWAP":
+            print(f"\n>>> [Strategy] Selected: VWAP Institutional Trend (Pro Mode) 🚀")
+            return VWAPStrategy(api, loader, dry_run=args.dry_run, quotes=quotes)
+        elif args.strategy == "OHL":
+            print(f"\n>>> [Strategy] Selected: Open High Low (OHL) Scalp 🎯")
+            return OHLStrategy(api, loader, dry_run=args.dry_run, quotes=quotes)
+        elif args.strategy == "INSIDE_BAR":
+            print(f"\n>>> [Strategy] Selected: Inside Bar Breakout 🔥")
+            return InsideBarStrategy(api, loader, dry_run=args.dry_run, quotes=quotes)
         else:
-            print(">>> [Auto] ❌ Brain could not select a strategy (Low Funds or Market Closed). Exiting.")
-            return
+            print(f"\n>>> [Strategy] Selected: 9:20 Straddle (Short) 📉")
+            return NiftyStrategy(api, loader, dry_run=args.dry_run, quotes=quotes)
 
-    # 4. Initialize Strategy Strategies logic...
-    # In test mode, api and loader are mocks. Strategy should work transparently.
-    # In dry_run mode, we pass True to dry_run arg of Strategy
-    
-    if args.strategy == "ORB":
-        print(f"\n>>> [Strategy] Selected: Open Range Breakout (ORB)")
-        bot = ORBStrategy(api, loader, dry_run=args.dry_run)
-    elif args.strategy == "MOMENTUM":
-        print(f"\n>>> [Strategy] Selected: Momentum (EMA Crossover) ⚡")
-        bot = MomentumStrategy(api, loader, dry_run=args.dry_run)
-    elif args.strategy == "VWAP":
-        print(f"\n>>> [Strategy] Selected: VWAP Institutional Trend (Pro Mode) 🚀")
-        bot = VWAPStrategy(api, loader, dry_run=args.dry_run)
-    elif args.strategy == "OHL":
-        print(f"\n>>> [Strategy] Selected: Open High Low (OHL) Scalp 🎯")
-        bot = OHLStrategy(api, loader, dry_run=args.dry_run)
-    elif args.strategy == "INSIDE_BAR":
-        print(f"\n>>> [Strategy] Selected: Inside Bar Breakout 🔥")
-        bot = InsideBarStrategy(api, loader, dry_run=args.dry_run)
-    else:
-        print(f"\n>>> [Strategy] Selected: 9:20 Straddle (Short) 📉")
-        bot = NiftyStrategy(api, loader, dry_run=args.dry_run)
+    # Login, Scrip Master load, strategy setup and warm-up calls run concurrently
+    startup = StartupOrchestrator(connect, loader)
+    bot = startup.run(build_strategy)
+    if not bot:
+        if rest_server: rest_server.stop()
+        return
+
+    # Streaming ticks keep the shared quote snapshot current (REST polling is the fallback)
+    feed, feed_server = None, None
+    if Config.TICK_FEED_ENABLED:
+        if args.test:
+            feed_server = MockFeedServer(market=market).start()
+        feed = TickFeed.from_session(startup.api, startup.quotes, url=feed_server.url if feed_server else None)
+        if not feed.start().wait_connected(timeout=3):
+            print(">>> [Feed] Tick stream not connected yet. Using polled quotes until it is.")
+
+    # Pushed order updates keep the strategy's order snapshot current (order-book polling is the fallback)
+    order_feed, order_server = None, None
+    if Config.ORDER_FEED_ENABLED and getattr(bot, 'orders', None) is not None:
+        if args.test:
+            order_server = MockOrderFeedServer(market).start()
+        order_feed = OrderFeed.from_session(startup.api, bot.orders, url=order_server.url if order_server else None)
+        if not order_feed.start().wait_connected(timeout=3):
+            print(">>> [Feed] Order stream not connected yet. Polling the order book until it is.")
 
     # 4. Input Trade Parameters
     print("\n--- NIFTY OPTION TRADER ---")
     
-    # Calculate Dynamic Weekly Expiry (Next Tuesday)
-    expiry = get_next_weekly_expiry()
+    # Dynamic Weekly Expiry (Next Tuesday), computed during startup
+    expiry = startup.expiry
     print(f">>> [Setup] Target Expiry: {expiry}")
     
     # 5. Execute Strategy
     # WARNING: This places a REAL order if credentials are valid (and not in test mode).
     # Strike is now calculated dynamically (ATM)
     
-    if args.strategy in ["ORB", "OHL", "INSIDE_BAR"]:
-        # Directional buying
-        bot.execute(expiry=expiry, action="BUY")
-    elif args.strategy == "MOMENTUM":
-        bot.execute(expiry=expiry)
+    try:
+        if args.strategy in ["ORB", "OHL", "INSIDE_BAR"]:
+            # Directional buying
+            bot.execute(expiry=expiry, action="BUY")
+        elif args.strategy == "MOMENTUM":
+            bot.execute(expiry=expiry)
+        else:
+            # Straddle (Short)
+            bot.execute(expiry=expiry, action="SELL")
+    finally:
+        if feed: feed.stop()
+        if feed_server: feed_server.stop()
+        if order_feed: order_feed.stop()
+        if order_server: order_server.stop()
+        if rest_server: rest_server.stop()
+        # API budget usage for the session (tokens used / wait time / rejected calls)
+        shared_rate_limiter.log_metrics()
+        # Multi-leg entries: time and price skew between the legs
+        if getattr(bot, 'basket', None): bot.basket.log_metrics()
+
+STRATEGIES = {
+    "STRADDLE": (NiftyStrategy, "SELL"),
+    "ORB": (ORBStrategy, "BUY"),
+    "MOMENTUM": (MomentumStrategy, "BUY"),
+    "VWAP": (VWAPStrategy, "BUY"),
+    "OHL": (OHLStrategy, "BUY"),
+    "INSIDE_BAR": (InsideBarStrategy, "BUY"),
+}
+
+def run_backtest(args):
+    print(f"\n>>> [System] BACKTEST: {args.strategy} over {args.backtest} ⏪")
+    paths = {NIFTY_TOKEN: args.backtest}
+    if args.vix:
+        paths[VIX_TOKEN] = args.vix
+    strategy_cls, action = STRATEGIES[args.strategy]
+    store = HistoricalStore.from_csv(paths)
+    if args.sweep:
+        run_sweep(args, store, strategy_cls, action)
+        return
+    result = Backtester(store, strategy_cls, action=action, repeat=args.repeat).run()
+    if not result.trades.empty:
+        print(result.trades.to_string(index=False))
+
+def run_sweep(args, store, strategy_cls, action):
+    # Inline JSON or a file holding it
+    if args.sweep.lstrip().startswith("{"):
+        spec = json.loads(args.sweep)
+    else:
+        with open(args.sweep) as f:
+            spec = json.load(f)
+    grid = {name: [tuple(map(tuple, v)) if isinstance(v, list) and v and isinstance(v[0], list) else v for v in values]
+            for name, values in spec.items()}
+    sweep = ParameterSweep(store, strategy_cls, grid, workers=args.workers, action=action, repeat=args.repeat)
+    print(f">>> [Sweep] {len(sweep.combinations)} combinations on {sweep.workers} workers")
+    if args.walk_forward:
+        train, test = (int(n) for n in args.walk_forward.split(","))
+        table = sweep.walk_forward(train, test)
     else:
-        # Straddle (Short)
-        bot.execute(expiry=expiry, action="SELL")
+        table = sweep.run()
+    table.to_csv(args.out, index=False)
+    print(table.head(20).to_string(index=False))
+    print(f">>> [Sweep] Results written to {args.out}")
 
 if __name__ == "__main__":
     run_bot()
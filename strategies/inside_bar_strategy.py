@@ -1,15 +1,25 @@
 import datetime
-import time
 import pandas as pd
 from config.settings import Config
 from core.safety_checks import SafetyGatekeeper
+from core.quote_service import QuoteService
+from core.order_service import OrderService
+from core.data_fetcher import DataFetcher
+from core.bar_aggregator import BarAggregator
+from utils.black_scholes import stop_loss_premium
+from utils.clock import system_clock
 
 class InsideBarStrategy:
-    def __init__(self, api, token_loader, dry_run=False):
+    def __init__(self, api, token_loader, dry_run=False, quotes=None, clock=None, orders=None):
         self.api = api
         self.token_loader = token_loader
         self.dry_run = dry_run
-        self.gatekeeper = SafetyGatekeeper(self.api)
+        self.clock = clock or system_clock
+        self.quotes = quotes or QuoteService(self.api, clock=self.clock)
+        self.orders = orders or OrderService(self.api, clock=self.clock)
+        self.gatekeeper = SafetyGatekeeper(self.api, self.quotes, clock=self.clock, orders=self.orders)
+        self.data_fetcher = DataFetcher(self.api, clock=self.clock)
+        self.bars = BarAggregator("99926000", quotes=self.quotes, clock=self.clock)
 
     def execute(self, expiry, action="BUY"):
         """
@@ -72,13 +82,28 @@ class InsideBarStrategy:
         mult = self.gatekeeper.get_vix_adjustment()
         adjusted_lots = max(1, int(mult))
         qty = int(Config.NIFTY_LOT_SIZE * adjusted_lots)
-        strike = round(ltp / 50) * 50
+        strike = self.token_loader.get_option_chain("NIFTY", expiry).nearest_atm(ltp)
+        if not strike:
+            print(">>> [Error] No strikes listed for expiry.")
+            return
         
         if signal == "BUY_CE":
             self.place_trade(expiry, strike, "CE", qty, sl_level, "UP")
         elif signal == "BUY_PE":
             self.place_trade(expiry, strike, "PE", qty, sl_level, "DOWN")
 
+    def fetch_candles(self, interval):
+        # Streaming: bars built locally from ticks (seeded once from the broker)
+        if self.quotes.is_streaming():
+            self.bars.seed(self.data_fetcher)
+            return self.bars.frame(interval, include_forming=True)
+        # Nifty 50 Index candles via the shared candle cache
+        return self.data_fetcher.fetch_latest_candles("99926000", interval=interval)
+
+    def get_nifty_ltp(self):
+        # Nifty 50 Index LTP from the shared quote snapshot
+        return self.quotes.get_ltp("99926000", "NSE", "Nifty 50")
+
     def place_trade(self, expiry, strike, leg, qty, index_sl, direction):
         token, symbol = self.token_loader.get_token("NIFTY", expiry, strike, leg)
         if not token: return
@@ -99,11 +124,15 @@ class InsideBarStrategy:
              
              # Calculate SL price roughly
              fill = self.wait_for_fill(oid)
-             # Approx Option SL based on Index SL difference
+             if not fill: return
+             # Option SL: premium repriced at the Index SL (IV from our fill); delta 0.5 fallback
              curr = self.get_nifty_ltp()
-             diff = abs(curr - index_sl)
-             opt_diff = diff * 0.5
-             sl_price = round(fill - opt_diff, 1)
+             sl_premium, delta = stop_loss_premium(fill, curr, index_sl, strike, expiry, leg, now=self.clock.now())
+             if sl_premium is None or not 0 < sl_premium < fill:
+                 sl_premium = fill - abs(curr - index_sl) * 0.5
+             else:
+                 print(f">>> [Risk] Delta: {delta:.2f} | Option SL: {sl_premium:.1f}")
+             sl_price = round(sl_premium, 1)
              
              self.place_sl(token, symbol, sl_price, qty)
              
@@ -113,6 +142,12 @@ class InsideBarStrategy:
         except Exception as e:
              print(f">>> [Error] {e}")
 
+    def wait_for_fill(self, order_id):
+        fill_price = self.orders.wait_for_fill(order_id)
+        if fill_price is None:
+            print(f">>> [Error] Order {order_id} not filled (status: {self.orders.status(order_id)}). No SL placed.")
+        return fill_price
+
     def place_sl(self, token, symbol, price, qty):
         try:
              # Buy SL for Sell Entry? No, Inside Bar is direction based.
@@ -142,9 +177,9 @@ class InsideBarStrategy:
         
         while True:
             try:
-                time.sleep(5)
+                self.clock.sleep(5)
                 # 1. Time Check
-                if datetime.datetime.now().time() >= datetime.time(15, 15):
+                if self.clock.now().time() >= datetime.time(15, 15):
                      print(">>> [Exit] Time 15:15. Closing.")
                      # Exit Market
                      orderparams = {
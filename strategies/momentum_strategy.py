@@ -1,4 +1,3 @@
-import time
 import datetime
 import pandas as pd
 import json
@@ -9,17 +8,30 @@ from config.settings import Config
 from core.angel_connect import get_angel_session
 from core.safety_checks import SafetyGatekeeper
 from core.data_fetcher import DataFetcher
+from core.quote_service import QuoteService
+from core.bar_aggregator import BarAggregator
+from utils.clock import system_clock
+from utils.indicators import IndicatorSet, EMA, RSI, crossover_price
 from utils.logger import logger
 
 class MomentumStrategy:
     STATE_FILE = "trade_state.json"
 
-    def __init__(self, api, token_loader, dry_run=False):
+    def __init__(self, api, token_loader, dry_run=False, quotes=None, clock=None):
         self.api = api
         self.token_loader = token_loader
         self.dry_run = dry_run
-        self.gatekeeper = SafetyGatekeeper(self.api)
-        self.data_fetcher = DataFetcher(self.api)
+        self.clock = clock or system_clock
+        self.quotes = quotes or QuoteService(self.api, clock=self.clock)
+        self.gatekeeper = SafetyGatekeeper(self.api, self.quotes, clock=self.clock)
+        self.data_fetcher = DataFetcher(self.api, clock=self.clock)
+        # Nifty bars built locally from the quote stream
+        self.bars = BarAggregator("99926000", quotes=self.quotes, clock=self.clock)
+        # Streaming EMA/RSI: O(1) per new bar instead of recomputing the whole frame
+        self.indicators = IndicatorSet(ema_fast=EMA(Config.MOMENTUM_EMA_FAST), ema_slow=EMA(Config.MOMENTUM_EMA_SLOW),
+                                       rsi=RSI(Config.MOMENTUM_RSI_PERIOD))
+        self.triggers = None # Nifty prices at which the forming bar flips the signal
+        self.last_signal = None
         self.data_failure_count = 0
         self.active_position = None 
         self.load_state() # Restore state on startup
@@ -55,13 +67,8 @@ class MomentumStrategy:
         
         if entry_price == 0: return False # Dry run or missing data
         
-        # Get Current LTP
-        ltp = 0.0
-        try:
-             q_resp = self.api.ltpData("NFO", symbol, token)
-             if q_resp and q_resp.get('status'):
-                 ltp = float(q_resp['data']['ltp'])
-        except: pass
+        # Get Current LTP (shared quote snapshot)
+        ltp = self.quotes.get_ltp(token, "NFO", symbol) or 0.0
         
         if ltp == 0: return False
         
@@ -73,20 +80,14 @@ class MomentumStrategy:
             self.close_position("TRAILING_STOP")
             return True
             
-        # 2. Update SL (Step Ladder)
+        # 2. Update SL (Step Ladder: highest step reached locks its points)
         new_sl = current_sl
         
-        if profit_pts >= 60:
-            target_sl = entry_price + 45
-            if target_sl > current_sl: new_sl = target_sl
-            
-        elif profit_pts >= 40:
-            target_sl = entry_price + 25
-            if target_sl > current_sl: new_sl = target_sl
-            
-        elif profit_pts >= 20:
-            target_sl = entry_price + 5
-            if target_sl > current_sl: new_sl = target_sl
+        for reached, locked in sorted(Config.MOMENTUM_TRAIL_STEPS, reverse=True):
+            if profit_pts >= reached:
+                target_sl = entry_price + locked
+                if target_sl > current_sl: new_sl = target_sl
+                break
             
         if new_sl > current_sl:
             self.active_position['sl_price'] = new_sl
@@ -101,6 +102,7 @@ class MomentumStrategy:
         - Timeframe: 5 Minutes.
         - Buy Signal: 9 EMA > 21 EMA AND RSI < 70 -> Buy CE.
         - Sell Signal: 9 EMA < 21 EMA AND RSI > 30 -> Buy PE.
+        (Defaults; periods and thresholds are Config.MOMENTUM_* parameters.)
         - Exit: When crossover reverses.
         """
         logger.info(f"--- EMA CROSSOVER + RSI STRATEGY ({expiry}) ---")
@@ -116,14 +118,14 @@ class MomentumStrategy:
         while True:
             try:
                 # Time Check
-                now = datetime.datetime.now().time()
+                now = self.clock.now().time()
                 if now >= datetime.time(15, 15):
                     self.close_position("TIME_EXIT")
                     break
 
                 # 2. Analyze Trend
-                trend, ema9, ema21, rsi = self.analyze_market_trend()
-                logger.info(f"[Analysis] Trend: {trend} | EMA9: {ema9:.2f} | EMA21: {ema21:.2f} | RSI: {rsi:.2f} | Active: {self.active_position['leg'] if self.active_position else 'None'}")
+                trend, ema_fast, ema_slow, rsi = self.analyze_market_trend()
+                logger.info(f"[Analysis] Trend: {trend} | EMA{Config.MOMENTUM_EMA_FAST}: {ema_fast:.2f} | EMA{Config.MOMENTUM_EMA_SLOW}: {ema_slow:.2f} | RSI: {rsi:.2f} | Active: {self.active_position['leg'] if self.active_position else 'None'}")
                 
                 # Check for Data Failure
                 if trend == "NEUTRAL" and rsi == 0 and self.active_position:
@@ -135,7 +137,7 @@ class MomentumStrategy:
                         self.close_position("DATA_LOSS_SAFETY")
                         break 
                     
-                    time.sleep(60 if self.dry_run else 60)
+                    self.clock.sleep(60 if self.dry_run else 60)
                     continue
                 else:
                     self.data_failure_count = 0 # Reset on success
@@ -144,15 +146,15 @@ class MomentumStrategy:
                 # If No Position: Enter based on Trend & RSI
                 if not self.active_position:
                     if trend == "BULLISH":
-                        if rsi < 70:
+                        if rsi < Config.MOMENTUM_RSI_OVERBOUGHT:
                             self.enter_position(expiry, "CE")
                         else:
-                            logger.info("Signal Ignored: Bullish but RSI Overbought (>70).")
+                            logger.info(f"Signal Ignored: Bullish but RSI Overbought (>{Config.MOMENTUM_RSI_OVERBOUGHT}).")
                     elif trend == "BEARISH":
-                        if rsi > 30:
+                        if rsi > Config.MOMENTUM_RSI_OVERSOLD:
                             self.enter_position(expiry, "PE")
                         else:
-                            logger.info("Signal Ignored: Bearish but RSI Oversold (<30).")
+                            logger.info(f"Signal Ignored: Bearish but RSI Oversold (<{Config.MOMENTUM_RSI_OVERSOLD}).")
                 
                 # If Active Position: Check for Reversal
                 else:
@@ -166,7 +168,7 @@ class MomentumStrategy:
                     elif current_leg == "CE" and trend == "BEARISH":
                          logger.info("Signal: Trend Reversed to BEARISH. Exiting CE.")
                          self.close_position("REVERSAL")
-                         if rsi > 30:
+                         if rsi > Config.MOMENTUM_RSI_OVERSOLD:
                              self.enter_position(expiry, "PE") 
                          else:
                              logger.info("Reversal Entry Ignored: RSI Oversold.")
@@ -175,46 +177,98 @@ class MomentumStrategy:
                     elif current_leg == "PE" and trend == "BULLISH":
                          logger.info("Signal: Trend Reversed to BULLISH. Exiting PE.")
                          self.close_position("REVERSAL")
-                         if rsi < 70:
+                         if rsi < Config.MOMENTUM_RSI_OVERBOUGHT:
                              self.enter_position(expiry, "CE")
                          else:
                              logger.info("Reversal Entry Ignored: RSI Overbought.")
 
-                time.sleep(60 if self.dry_run else 60)
+                # Streaming: check each tick against the trigger levels until the 5-min bar
+                # closes (at the latest after 60s); re-evaluate as soon as the signal flips
+                if self.quotes.is_streaming() and not self.dry_run:
+                    self.wait_for_trigger(60)
+                else:
+                    self.clock.sleep(60 if self.dry_run else 60)
                 
             except KeyboardInterrupt:
                 logger.info("User Manual Stop.")
                 break
             except Exception as e:
                 logger.error(f"Loop Error: {e}")
-                time.sleep(10)
+                self.clock.sleep(10)
 
     def analyze_market_trend(self):
         # Fetch 5-min candles via DataFetcher
         # Using Index Token or Mock
         if self.dry_run:
             df = self.get_mock_df()
+        elif self.quotes.is_streaming():
+            # Local bars: seeded once from the broker, then built from ticks
+            self.bars.seed(self.data_fetcher)
+            df = self.bars.frame("FIVE_MINUTE", include_forming=True)
         else:
              # Nifty 50 Index Token: 99926000
             df = self.data_fetcher.fetch_latest_candles("99926000")
             
         if df is None or df.empty: return "NEUTRAL", 0, 0, 0
         
-        # Calc EMA
-        df['EMA9'] = df['close'].ewm(span=9, adjust=False).mean()
-        df['EMA21'] = df['close'].ewm(span=21, adjust=False).mean()
-        
-        # Calc RSI
-        df['RSI'] = self.calculate_rsi(df)
-        
-        last = df.iloc[-1]
-        ema9 = last['EMA9']
-        ema21 = last['EMA21']
-        rsi = last['RSI']
+        # Fast/slow EMA + RSI as of the latest (forming) bar
+        values = self.indicators.update_frame(df)
+        ema_fast = values['ema_fast']
+        ema_slow = values['ema_slow']
+        rsi = values['rsi']
+
+        # Indicator state now covers every closed bar: precompute where the forming bar's close flips things
+        self.triggers = self.compute_triggers()
+        if self.triggers:
+            self.last_signal = self.signal_at(df['close'].iloc[-1])
         
-        if ema9 > ema21: return "BULLISH", ema9, ema21, rsi
-        if ema9 < ema21: return "BEARISH", ema9, ema21, rsi
-        return "NEUTRAL", ema9, ema21, rsi
+        if ema_fast > ema_slow: return "BULLISH", ema_fast, ema_slow, rsi
+        if ema_fast < ema_slow: return "BEARISH", ema_fast, ema_slow, rsi
+        return "NEUTRAL", ema_fast, ema_slow, rsi
+
+    def compute_triggers(self):
+        """
+        Close prices for the forming bar at which:
+          cross    - fast and slow EMA are equal (above: BULLISH, below: BEARISH)
+          rsi_high - RSI reaches the overbought level (CE entries need the close below it)
+          rsi_low  - RSI reaches the oversold level (PE entries need the close above it)
+        """
+        ind = self.indicators.indicators
+        cross = crossover_price(ind['ema_fast'], ind['ema_slow'])
+        if cross is None: return None
+        return {
+            'cross': cross,
+            'rsi_high': ind['rsi'].price_for(Config.MOMENTUM_RSI_OVERBOUGHT),
+            'rsi_low': ind['rsi'].price_for(Config.MOMENTUM_RSI_OVERSOLD),
+        }
+
+    def signal_at(self, ltp):
+        """Constant-time (trend, RSI zone) for a live Nifty price, using the precomputed triggers"""
+        t = self.triggers
+        trend = "BULLISH" if ltp > t['cross'] else "BEARISH" if ltp < t['cross'] else "NEUTRAL"
+        zone = "HIGH" if ltp >= t['rsi_high'] else "LOW" if ltp <= t['rsi_low'] else "MID"
+        return trend, zone
+
+    def wait_for_trigger(self, timeout):
+        """
+        Waits for the next 5-min bar close, a tick that changes the signal, or timeout.
+        Each tick is one comparison against the trigger levels; no indicator recompute.
+        """
+        deadline = self.clock.time() + timeout
+        closes = self.bars.closed_count["FIVE_MINUTE"]
+        while self.clock.time() < deadline:
+            self.quotes.wait_for_update(min(1.0, max(0.0, deadline - self.clock.time())))
+            self.bars.check_close()
+            if self.bars.closed_count["FIVE_MINUTE"] != closes:
+                return "BAR_CLOSE"
+            if not self.triggers: continue
+
+            ltp = self.quotes.get_ltp("99926000", "NSE", "Nifty 50")
+            if ltp and self.signal_at(ltp) != self.last_signal:
+                logger.info(f"Trigger: Nifty {ltp} crossed a level (EMA cross {self.triggers['cross']:.2f}, "
+                            f"RSI {Config.MOMENTUM_RSI_OVERBOUGHT} @ {self.triggers['rsi_high']:.2f}, RSI {Config.MOMENTUM_RSI_OVERSOLD} @ {self.triggers['rsi_low']:.2f})")
+                return "TRIGGER"
+        return "TIMEOUT"
 
     def calculate_rsi(self, df, period=14):
         delta = df['close'].diff()
@@ -237,22 +291,19 @@ class MomentumStrategy:
             logger.error("Could not fetch Nifty LTP for Strike Selection.")
             return
 
-        strike = round(ltp / 50) * 50
+        chain = self.token_loader.get_option_chain("NIFTY", expiry)
+        strike = chain.nearest_atm(ltp)
         
-        token, symbol = self.token_loader.get_token("NIFTY", expiry, strike, leg)
+        token, symbol = chain.contract(strike, leg) if strike else (None, None)
         if not token: 
             logger.error(f"Could not find token for {strike} {leg}")
             return
         
         # Determine actual cost
-        quote_ltp = 0
-        try:
-             # Fetch LTP for the specific option to check margin
-             q_resp = self.api.ltpData("NFO", symbol, token)
-             if q_resp and q_resp.get('status'):
-                 quote_ltp = float(q_resp['data']['ltp'])
-        except Exception as e:
-            logger.warning(f"Could not fetch option LTP for margin check: {e}")
+        # Fetch LTP for the specific option to check margin
+        quote_ltp = self.quotes.get_ltp(token, "NFO", symbol) or 0
+        if not quote_ltp:
+            logger.warning(f"Could not fetch option LTP for margin check: {symbol}")
             
         estimated_cost = quote_ltp * qty
         if estimated_cost > 0:
@@ -294,6 +345,7 @@ class MomentumStrategy:
         
         logger.info(f"Exit: Closing {symbol} due to {reason}")
         if self.dry_run:
+            self.quotes.unwatch(token)
             self.active_position = None
             return
 
@@ -305,17 +357,14 @@ class MomentumStrategy:
             }
              oid = self.api.placeOrder(orderparams)
              logger.info(f"Success: Exit Order Placed: {oid}")
+             self.quotes.unwatch(token)
              self.active_position = None
              self.save_state()
         except Exception as e:
              logger.error(f"Exit Order Failure: {e}")
 
     def get_nifty_ltp(self):
-        try:
-            resp = self.api.ltpData("NSE", "Nifty 50", "99926000")
-            if resp: return resp['data']['ltp']
-        except: pass
-        return None
+        return self.quotes.get_ltp("99926000", "NSE", "Nifty 50")
 
     def get_mock_df(self):
          # Toggle trend based on time? Or just random
@@ -333,6 +382,7 @@ class MomentumStrategy:
         if new_api:
             self.api = new_api
             self.gatekeeper.api = new_api
+            self.quotes.api = new_api
             self.data_fetcher.api = new_api # Update data fetcher too
             logger.info("System: ✅ Re-login Successful! Session refreshed.")
             return True
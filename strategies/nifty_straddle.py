@@ -1,30 +1,36 @@
-import time
 import datetime
 from config.settings import Config
 from core.safety_checks import SafetyGatekeeper
+from core.quote_service import QuoteService
+from core.order_service import OrderService
+from core.basket_executor import BasketExecutor
+from utils.clock import system_clock
 
 class NiftyStrategy:
-    def __init__(self, api, token_loader, dry_run=False):
+    def __init__(self, api, token_loader, dry_run=False, quotes=None, clock=None, orders=None):
         self.api = api
         self.token_loader = token_loader
         self.dry_run = dry_run
-        self.gatekeeper = SafetyGatekeeper(self.api)
+        self.clock = clock or system_clock
+        self.quotes = quotes or QuoteService(self.api, clock=self.clock)
+        self.orders = orders or OrderService(self.api, clock=self.clock)
+        self.gatekeeper = SafetyGatekeeper(self.api, self.quotes, clock=self.clock, orders=self.orders)
+        self.basket = BasketExecutor(self.api, self.orders, self.quotes, clock=self.clock, dry_run=self.dry_run)
         self.sl_orders = {} # { 'CE': order_id, 'PE': order_id }
         self.entry_prices = {} # { 'CE': price, 'PE': price }
         self.legs_active = {'CE': False, 'PE': False}
 
-    def get_atm_strike(self):
+    def get_atm_strike(self, chain):
         """
-        Fetches NIFTY 50 Spot Price and rounds to nearest 50.
+        Fetches NIFTY 50 Spot Price and picks the nearest listed strike.
         """
         try:
             # SmartAPI Nifty 50 Token: 99926000
-            response = self.api.ltpData("NSE", "Nifty 50", "99926000")
+            ltp = self.quotes.get_ltp("99926000", "NSE", "Nifty 50")
             
-            if response and response.get('status'):
-                ltp = response['data']['ltp']
+            if ltp is not None:
                 print(f">>> [Market] Nifty Spot Price: {ltp}")
-                return int(round(ltp / 50) * 50)
+                return chain.nearest_atm(ltp)
             else:
                 return None
         except Exception as e:
@@ -38,7 +44,7 @@ class NiftyStrategy:
         print(f"\n--- 9:20 STRADDLE STRATEGY ({expiry}) ---")
 
         # 1. Time Check (Ideally run at 09:20, but we allow manual run with check)
-        now = datetime.datetime.now().time()
+        now = self.clock.now().time()
         # if not (datetime.time(9, 15) <= now <= datetime.time(9, 30)):
         #     print(f">>> [Warning] Running 9:20 Strategy at {now}. Ensure this is intended.")
 
@@ -58,77 +64,68 @@ class NiftyStrategy:
         print(f">>> [Setup] Quantity per leg: {quantity} (VIX Multiplier: {quantity_multiplier} -> {adjusted_lots} Lots)")
 
         # 3. ATM Strike
-        strike = self.get_atm_strike()
+        chain = self.token_loader.get_option_chain("NIFTY", expiry)
+        strike = self.get_atm_strike(chain)
         if not strike:
             if self.dry_run: strike = 23000 # Mock
             else: return
         print(f">>> [Setup] ATM Strike: {strike}")
 
         # 4. Get Tokens
-        ce_token, ce_symbol = self.token_loader.get_token("NIFTY", expiry, strike, "CE")
-        pe_token, pe_symbol = self.token_loader.get_token("NIFTY", expiry, strike, "PE")
+        ce_token, ce_symbol = chain.contract(strike, "CE")
+        pe_token, pe_symbol = chain.contract(strike, "PE")
         
         if not ce_token or not pe_token:
             print(">>> [Error] Tokens not found.")
             return
 
-        # 5. Place Entry Orders (SELL)
+        # 5. Place Entry Orders (SELL) side by side; each leg's SL goes out as soon as it fills
         print(">>> [Trade] Selling Straddle Legs...")
-        ce_order = self.place_order(ce_token, ce_symbol, "SELL", quantity)
-        pe_order = self.place_order(pe_token, pe_symbol, "SELL", quantity)
-        
+        basket = self.basket.execute([
+            {'name': 'CE', 'token': ce_token, 'symbol': ce_symbol, 'action': "SELL", 'qty': quantity, 'stop': self.initial_stop},
+            {'name': 'PE', 'token': pe_token, 'symbol': pe_symbol, 'action': "SELL", 'qty': quantity, 'stop': self.initial_stop},
+        ])
+
+        # 6. Capture Fills & Stop Losses (a partial basket has been closed by the executor)
+        if not basket['complete']:
+            print(">>> [Error] Straddle not fully on. Filled legs closed; not monitoring.")
+            return
+        for leg in basket['legs']:
+            if leg.get('fill_price'):
+                self.entry_prices[leg['name']] = leg['fill_price']
+                self.legs_active[leg['name']] = True
+                self.sl_orders[leg['name']] = leg.get('sl_order_id')
         if self.dry_run:
              print(">>> [Dry Run] End of execution path (Simulated).")
-             # In Dry Run, we proceed to simulate Stop Loss placement if IDs are valid mocks
-             pass
-        else:
-             pass
-
-        # 6. Wait for Fills & Capture Prices
-        print(">>> [Trade] Waiting for fills to set SL...")
-        ce_price = self.wait_for_fill(ce_order)
-        pe_price = self.wait_for_fill(pe_order)
-
-        if ce_price: 
-            self.entry_prices['CE'] = ce_price
-            self.legs_active['CE'] = True
-        if pe_price: 
-            self.entry_prices['PE'] = pe_price
-            self.legs_active['PE'] = True
 
-        # 7. Place Initial Stop Loss (25%)
-        # For Sell Order, SL is Buy Stop Limit at (Price * 1.25)
-        if self.legs_active['CE']:
-            sl_price = round(ce_price * 1.25, 1)
-            trig_price = round(sl_price - 0.5, 1) # Trigger slightly lower for Buy SL? 
-            # Actually for Buy SL: Trigger < Price. 
-            # SL-Limit Buy Order: Trigger at X, Buy at >=X.
-            # SmartAPI StopLoss: transactiontype=BUY. triggerprice. price.
-            # Usually Trigger = 125, Price = 126 (Buy Limit above Trigger to ensure fill).
-            
-            buy_trigger = sl_price
-            buy_price = round(sl_price + 1.0, 1)
-            
-            self.sl_orders['CE'] = self.place_sl_order(ce_token, ce_symbol, buy_trigger, buy_price, quantity)
-            
-        if self.legs_active['PE']:
-            sl_price = round(pe_price * 1.25, 1)
-            buy_trigger = sl_price
-            buy_price = round(sl_price + 1.0, 1)
-            self.sl_orders['PE'] = self.place_sl_order(pe_token, pe_symbol, buy_trigger, buy_price, quantity)
-
-        # 8. Monitor Loop
+        # 7. Monitor Loop
         self.monitor_straddle(ce_token, pe_token, ce_symbol, pe_symbol, quantity)
 
 
+    @staticmethod
+    def initial_stop(fill_price):
+        """
+        Initial Stop Loss (25%): for a Sell entry the SL is a Buy Stop-Limit at Price * 1.25,
+        limit slightly above the trigger to ensure the fill (e.g. Trigger 125, Price 126).
+        """
+        sl_price = round(fill_price * 1.25, 1)
+        return sl_price, round(sl_price + 1.0, 1)
+
     def monitor_straddle(self, ce_token, pe_token, ce_symbol, pe_symbol, quantity):
         print(f"\n>>> [Monitor] Straddle Active. SL Orders: {self.sl_orders}")
         sl_moved_to_cost = False
+        seen = self.orders.sequence
         
         while True:
             try:
-                time.sleep(3)
-                now = datetime.datetime.now().time()
+                if self.orders.is_streaming():
+                    # Woken by the order stream: a stop-loss fill moves the other leg's SL at once.
+                    # Updates since the last check (e.g. during modify_sl_to_cost) end the wait at once.
+                    self.orders.wait_for_update(3, since=seen)
+                else:
+                    self.clock.sleep(3)
+                seen = self.orders.sequence
+                now = self.clock.now().time()
                 
                 # Check Time Exit
                 if now >= datetime.time(15, 15):
@@ -169,7 +166,7 @@ class NiftyStrategy:
                 break
             except Exception as e:
                 print(f">>> [Error] Monitor: {e}")
-                time.sleep(5)
+                self.clock.sleep(5)
 
     def modify_sl_to_cost(self, leg_type, token, symbol, quantity):
         # Move SL to Entry Price
@@ -189,7 +186,7 @@ class NiftyStrategy:
                  self.api.cancelOrder(order_id, "NORMAL") # Need to check if cancelOrder needs more args? Usually orderid.
                  # SmartAPI: cancelOrder(orderid, variety)
                  # Wait a bit?
-                 time.sleep(1)
+                 self.clock.sleep(1)
              
              # 2. Place New SL at Cost
              # Trigger at Cost, Price slightly above (Buy SL for Sell Entry)
@@ -205,84 +202,17 @@ class NiftyStrategy:
              print(f">>> [Error] Modify SL Failed: {e}")
 
     def place_order(self, token, symbol, action, qty):
-        if self.dry_run:
-            print(f">>> [Dry Run] Would place {action} MARKET Order for {symbol} (Token: {token})")
-            return "dry_run_id"
-
-        try:
-            orderparams = {
-                "variety": "NORMAL",
-                "tradingsymbol": symbol,
-                "symboltoken": token,
-                "transactiontype": action,
-                "exchange": "NFO",
-                "ordertype": "MARKET",
-                "producttype": "INTRADAY",
-                "duration": "DAY",
-                "quantity": qty
-            }
-            order_id = self.api.placeOrder(orderparams)
-            print(f">>> [Order] {action} {symbol} | ID: {order_id}")
-            return order_id
-        except Exception as e:
-            print(f">>> [Error] Place Order: {e}")
-            return None
+        return self.basket.place_market(token, symbol, action, qty)
 
     def place_sl_order(self, token, symbol, trigger_price, price, qty):
-        if self.dry_run:
-             print(f">>> [Dry Run] Would place SL for {symbol} | Trig: {trigger_price}")
-             return "dry_run_sl_id"
-
-        try:
-            # SL for Sell Entry is a BUY Order
-            orderparams = {
-                "variety": "STOPLOSS",
-                "tradingsymbol": symbol,
-                "symboltoken": token,
-                "transactiontype": "BUY",
-                "exchange": "NFO",
-                "ordertype": "STOPLOSS_LIMIT",
-                "producttype": "INTRADAY",
-                "duration": "DAY",
-                "triggerprice": trigger_price,
-                "price": price, 
-                "quantity": qty
-            }
-            oid = self.api.placeOrder(orderparams)
-            print(f">>> [Risk] SL Placed {symbol} | Trig: {trigger_price} | ID: {oid}")
-            return oid
-        except Exception as e:
-            print(f">>> [Error] SL Place: {e}")
-            return None
-
-    def wait_for_fill(self, order_id):
-        if not order_id: return None
-        if order_id == "dry_run_id": return 100.0 # Fast return
-        
-        # Simple polling
-        for _ in range(5):
-             try:
-                 book = self.api.orderBook()
-                 if book and book.get('data'):
-                     for o in book['data']:
-                         if o['orderid'] == order_id and o['status'] == 'complete':
-                             return float(o['averageprice'])
-             except: pass
-             time.sleep(1)
-        return 100.0 if self.dry_run else None # Mock
+        # SL for Sell Entry is a BUY Order
+        return self.basket.place_stop(token, symbol, "BUY", trigger_price, price, qty)
 
     def get_order_status(self, order_id):
         if not order_id: return None
         # return 'complete' or 'open'
         if self.dry_run: return 'open' # Mock always open
-        try:
-             book = self.api.orderBook()
-             if book and book.get('data'):
-                 for o in book['data']:
-                     if o['orderid'] == order_id:
-                         return o['status']
-        except: pass
-        return 'unknown'
+        return self.orders.status(order_id)
 
     def exit_at_market(self, token, symbol, qty, reason):
         if self.active_position_exists(symbol): # Check if open
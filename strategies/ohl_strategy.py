@@ -1,14 +1,23 @@
 import datetime
-import time
 from config.settings import Config
 from core.safety_checks import SafetyGatekeeper
+from core.quote_service import QuoteService
+from core.order_service import OrderService
+from core.bar_aggregator import BarAggregator
+from utils.black_scholes import stop_loss_premium
+from utils.clock import system_clock
 
 class OHLStrategy:
-    def __init__(self, api, token_loader, dry_run=False):
+    def __init__(self, api, token_loader, dry_run=False, quotes=None, clock=None, orders=None):
         self.api = api
         self.token_loader = token_loader
         self.dry_run = dry_run
-        self.gatekeeper = SafetyGatekeeper(self.api)
+        self.clock = clock or system_clock
+        self.quotes = quotes or QuoteService(self.api, clock=self.clock)
+        self.orders = orders or OrderService(self.api, clock=self.clock)
+        self.gatekeeper = SafetyGatekeeper(self.api, self.quotes, clock=self.clock, orders=self.orders)
+        # 1-min Nifty bars from the quote stream: the 09:15 bar is ready the moment it closes
+        self.bars = BarAggregator("99926000", intervals=["ONE_MINUTE"], quotes=self.quotes, clock=self.clock)
 
     def execute(self, expiry, action="BUY"):
         """
@@ -63,7 +72,10 @@ class OHLStrategy:
         qty = int(Config.NIFTY_LOT_SIZE * adjusted_lots)
 
         # 4. Entry
-        strike = round(c_close / 50) * 50
+        strike = self.token_loader.get_option_chain("NIFTY", expiry).nearest_atm(c_close)
+        if not strike:
+            print(">>> [Error] No strikes listed for expiry.")
+            return
         print(f">>> [Trade] Target Strike: {strike} | Qty: {qty}")
         
         if signal == "BUY_CE":
@@ -98,19 +110,22 @@ class OHLStrategy:
              if not fill_price: return
              
              # 4. Calculate Option SL & Target
-             # NOTE: SL is based on Index Level. Option Price SL is approximate.
-             # Option Delta approx 0.5 (ATM).
-             # Risk = (Entry Index - SL Index). Option Risk ~= Risk * 0.5.
+             # NOTE: SL is based on Index Level. The option is repriced at the Index SL
+             # with the IV implied by our fill (Black-Scholes); delta 0.5 only as a fallback.
              
              # Get Index LTP to calculate Points Risk
              curr_index = self.get_nifty_ltp() 
              points_risk = abs(curr_index - index_sl_level)
-             option_risk = points_risk * 0.5 # Delta 0.5 assumption
+             sl_premium, delta = stop_loss_premium(fill_price, curr_index, index_sl_level, strike, expiry, leg_type, now=self.clock.now())
+             if sl_premium is None or not 0 < sl_premium < fill_price:
+                 delta = 0.5 if leg_type == "CE" else -0.5
+                 sl_premium = fill_price - points_risk * 0.5
+             option_risk = fill_price - sl_premium
              
-             sl_price = round(fill_price - option_risk, 1)
+             sl_price = round(sl_premium, 1)
              target_price = round(fill_price + (option_risk * 2), 1) # 1:2 R:R
              
-             print(f">>> [Risk] Index Risk: {points_risk:.1f} pts. Option Risk: {option_risk:.1f} pts.")
+             print(f">>> [Risk] Index Risk: {points_risk:.1f} pts. Delta: {delta:.2f}. Option Risk: {option_risk:.1f} pts.")
              print(f">>> [Risk] SL: {sl_price} | Target: {target_price}")
              
              # 5. Place SL Order
@@ -126,8 +141,15 @@ class OHLStrategy:
         # Fetch 09:15 candle logic
         # For simplicity, fetching last 5 candles and picking 09:15 if available, 
         # or most recent if running live at 09:16.
+        if self.quotes.is_streaming():
+             first_bar = datetime.datetime.combine(self.clock.today(), datetime.time(9, 15))
+             self.bars.check_close()
+             bar = self.bars.bar_at("ONE_MINUTE", first_bar)
+             if bar:
+                 return {'open': bar[1], 'high': bar[2], 'low': bar[3], 'close': bar[4]}
+
         try:
-             today = datetime.date.today().strftime("%Y-%m-%d")
+             today = self.clock.today().strftime("%Y-%m-%d")
              from_time = f"{today} 09:00"
              to_time = f"{today} 09:20"
              
@@ -156,14 +178,14 @@ class OHLStrategy:
          return {'open': 22000, 'low': 22000, 'high': 22050, 'close': 22040}
 
     def wait_for_fill(self, order_id):
-        time.sleep(1)
-        return 100.0 if self.dry_run else None
+        fill_price = self.orders.wait_for_fill(order_id)
+        if fill_price is None:
+            print(f">>> [Error] Order {order_id} not filled (status: {self.orders.status(order_id)}). No SL placed.")
+        return fill_price
 
     def get_nifty_ltp(self):
-        try:
-            resp = self.api.ltpData("NSE", "Nifty 50", "99926000")
-            if resp: return resp['data']['ltp']
-        except: pass
+        ltp = self.quotes.get_ltp("99926000", "NSE", "Nifty 50")
+        if ltp is not None: return ltp
         return 22040.0 if self.dry_run else None
 
     def place_sl_order(self, token, symbol, price, qty):
@@ -184,9 +206,9 @@ class OHLStrategy:
          print(f">>> [Monitor] Target: {target} | SL: {sl}")
          while True:
             try:
-                time.sleep(5)
+                self.clock.sleep(5)
                 # 1. Time Check
-                if datetime.datetime.now().time() >= datetime.time(15, 15):
+                if self.clock.now().time() >= datetime.time(15, 15):
                      print(">>> [Exit] Time 15:15. Closing.")
                      self.place_entry(None, 0, "CE" if "CE" in symbol else "PE", qty, 0, "EXIT") # Re-use entry? No.
                      # Exit Market
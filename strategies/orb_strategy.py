@@ -1,14 +1,20 @@
-import time
 import datetime
 from config.settings import Config
 from core.safety_checks import SafetyGatekeeper
+from core.quote_service import QuoteService
+from core.order_service import OrderService
+from utils.black_scholes import stop_loss_premium
+from utils.clock import system_clock
 
 class ORBStrategy:
-    def __init__(self, api, token_loader, dry_run=False):
+    def __init__(self, api, token_loader, dry_run=False, quotes=None, clock=None, orders=None):
         self.api = api
         self.token_loader = token_loader
         self.dry_run = dry_run
-        self.gatekeeper = SafetyGatekeeper(self.api)
+        self.clock = clock or system_clock
+        self.quotes = quotes or QuoteService(self.api, clock=self.clock)
+        self.orders = orders or OrderService(self.api, clock=self.clock)
+        self.gatekeeper = SafetyGatekeeper(self.api, self.quotes, clock=self.clock, orders=self.orders)
         
         # State
         self.range_high = -1
@@ -49,14 +55,15 @@ class ORBStrategy:
         ltp = self.get_nifty_ltp() 
         if ltp:
             # Fake range for demo/mock if real data not fully available historically
-            self.range_high = round(ltp + 20, 2)
-            self.range_low = round(ltp - 20, 2)
+            self.range_high = round(ltp + Config.ORB_RANGE_POINTS, 2)
+            self.range_low = round(ltp - Config.ORB_RANGE_POINTS, 2)
             self.range_set = True
         else:
             print(">>> [ORB] Could not fetch LTP to set range.")
 
     def monitor_breakout(self, expiry):
         print(">>> [ORB] Monitoring for Breakout...")
+        last_status = 0
         
         while True:
             # 1. Safety Check: Gatekeepers
@@ -66,10 +73,13 @@ class ORBStrategy:
                 
             ltp = self.get_nifty_ltp()
             if not ltp:
-                time.sleep(1)
+                self.clock.sleep(1)
                 continue
-                
-            print(f"    LTP: {ltp} | Range: {self.range_low} - {self.range_high}")
+
+            # Ticks arrive far more often than the old 2s poll; keep the status line at that pace
+            if self.clock.time() - last_status >= 2:
+                last_status = self.clock.time()
+                print(f"    LTP: {ltp} | Range: {self.range_low} - {self.range_high}")
             
             # 2. Check Breakout / Signal
             
@@ -78,7 +88,7 @@ class ORBStrategy:
                 print(">>> [ORB] Upside Breakout! Buying CE.")
                 print(">>> [ORB] Upside Breakout! Buying CE.")
                 print(">>> [ORB] Upside Breakout! Buying CE.")
-                self.place_entry_order(expiry, "CE")
+                self.place_entry_order(expiry, "CE", index_sl=self.range_low)
                 # Monitor is called inside place_entry_order now
                 break # Exit loop after trade (or continue to manage)
                 
@@ -86,24 +96,29 @@ class ORBStrategy:
             elif ltp < self.range_low:
                 print(">>> [ORB] Downside Breakout! Buying PE.")
                 print(">>> [ORB] Downside Breakout! Buying PE.")
-                self.place_entry_order(expiry, "PE")
+                self.place_entry_order(expiry, "PE", index_sl=self.range_high)
                 break
             
             # Demo Break: Don't loop forever in mock/dry-run if no breakout
             if self.dry_run or self.api.api_key is None: # Mock check
                 print(">>> [Only for Demo] Breaking loop to avoid infinite wait.")
                 break
-                
-            time.sleep(2)
 
-    def place_entry_order(self, expiry, option_type):
+            # Streaming: react on the next tick. Polling: every 2 seconds.
+            if self.quotes.is_streaming():
+                self.quotes.wait_for_update(2)
+            else:
+                self.clock.sleep(2)
+
+    def place_entry_order(self, expiry, option_type, index_sl=None):
         # Calculate Strike (ATM or slightly ITM based on breakout)
         # If Upside Breakout at 23050, we usually buy 23050 CE or 23000 CE.
         
         current_ltp = self.get_nifty_ltp()
-        strike = round(current_ltp / 50) * 50
+        chain = self.token_loader.get_option_chain("NIFTY", expiry)
+        strike = chain.nearest_atm(current_ltp)
         
-        token, symbol = self.token_loader.get_token("NIFTY", expiry, strike, option_type)
+        token, symbol = chain.contract(strike, option_type) if strike else (None, None)
         
         if not token:
             print(">>> [Error] Token not found.")
@@ -138,16 +153,17 @@ class ORBStrategy:
              print(">>> [ORB] Waiting for fill to place Stop Loss...")
              fill_price = self.wait_for_fill(order_id)
              if fill_price:
-                 # Use Range High/Low as SL if logical, or fixed %?
                  # Strategy says: Buy CE -> SL = Range Low. Buy PE -> SL = Range High.
-                 # Let's derive SL Price based on Option Premium or Spot? 
-                 # Usually Spot SL is better for ORB, but we can only place Option SL orders.
-                 # Let's stick to the User Request "STOP loss application... Copy logic from Straddle".
-                 # Straddle uses fixed 10%. User prompt for Strategy B says "SL is Low of range".
-                 # Since we trade Options, mapping Spot Range Levels to Option Premiums is complex without Delta.
-                 # COMPROMISE: We will safely use the robust 10% Premium SL for now to ensure safety,
-                 # as calculating the exact Option Price for the Spot Level is error-prone without Greeks.
-                 self.place_stop_loss(token, symbol, fill_price, Config.NIFTY_LOT_SIZE)
+                 # We can only place Option SL orders, so the option is repriced at the range
+                 # level with the IV implied by our fill (Black-Scholes Greeks).
+                 # Falls back to the 10% Premium SL if the IV cannot be solved.
+                 sl_price = None
+                 if index_sl is not None:
+                     sl_premium, delta = stop_loss_premium(fill_price, self.get_nifty_ltp(), index_sl, strike, expiry, option_type, now=self.clock.now())
+                     if sl_premium is not None and 0 < sl_premium < fill_price:
+                         print(f">>> [Risk] Range SL {index_sl} | Delta: {delta:.2f} | Option SL: {sl_premium:.1f}")
+                         sl_price = round(sl_premium, 1)
+                 self.place_stop_loss(token, symbol, fill_price, Config.NIFTY_LOT_SIZE, sl_price=sl_price)
                  
                  # START MONITORING
                  self.monitor_position(symbol, token, fill_price)
@@ -157,42 +173,29 @@ class ORBStrategy:
 
     def wait_for_fill(self, order_id):
         """
-        Polls the order book until the order is 'complete' (filled).
+        Waits on the shared order snapshot until the order is 'complete' (filled).
         Returns the average filled price.
         """
-        attempts = 0
-        max_attempts = 5 # Retry 5 times
-        while attempts < max_attempts:
-            try:
-                book = self.api.orderBook()
-                if book and book.get('status'):
-                    for order in book['data']:
-                        if order['orderid'] == order_id:
-                            if order['status'] == 'complete':
-                                avg_price = float(order['averageprice'])
-                                print(f">>> [Fill] Order {order_id} filled at ₹{avg_price}")
-                                return avg_price
-                            else:
-                                print(f">>> [Wait] Order {order_id} status: {order['status']}")
-            except Exception as e:
-                print(f">>> [Wait] Error fetching order book: {e}")
-            
-            time.sleep(1)
-            attempts += 1
-        
-        print(f">>> [Error] Order {order_id} failed to fill after waiting.")
+        fill_price = self.orders.wait_for_fill(order_id)
+        if fill_price is not None:
+            print(f">>> [Fill] Order {order_id} filled at ₹{fill_price}")
+            return fill_price
+
+        print(f">>> [Error] Order {order_id} failed to fill after waiting (status: {self.orders.status(order_id)}).")
         return None
 
-    def place_stop_loss(self, token, symbol, buy_price, quantity, sl_percent=0.10):
+    def place_stop_loss(self, token, symbol, buy_price, quantity, sl_percent=0.10, sl_price=None):
         """
-        Places a Stop Loss Sell Order at 10% below buy price.
+        Places a Stop Loss Sell Order at sl_price (default: 10% below buy price).
         """
         try:
-            sl_price = round(buy_price * (1 - sl_percent), 1)
+            if sl_price is None:
+                sl_price = round(buy_price * (1 - sl_percent), 1)
+                print(f">>> [Risk] Placing Stop Loss for {symbol} at ₹{sl_price} (10% SL)")
+            else:
+                print(f">>> [Risk] Placing Stop Loss for {symbol} at ₹{sl_price} (Range SL)")
             trigger_price = round(sl_price + 0.5, 1) # Trigger slightly higher than limit
             
-            print(f">>> [Risk] Placing Stop Loss for {symbol} at ₹{sl_price} (10% SL)")
-            
             orderparams = {
                 "variety": "STOPLOSS",
                 "tradingsymbol": symbol,
@@ -224,16 +227,10 @@ class ORBStrategy:
            'entry_price': fill_price, 'qty': Config.NIFTY_LOT_SIZE
         }]
         
-        manager = PositionManager(self.api, self.dry_run)
+        manager = PositionManager(self.api, self.dry_run, quotes=self.quotes, clock=self.clock)
         manager.monitor(pos)
 
     def get_nifty_ltp(self):
         # Helper to get Nifty Index LTP
-        try:
-            # Nifty 50 Token: 99926000
-            resp = self.api.ltpData("NSE", "Nifty 50", "99926000")
-            if resp and resp.get('status'):
-                return resp['data']['ltp']
-        except:
-            pass
-        return None
+        # Nifty 50 Token: 99926000 (shared quote snapshot)
+        return self.quotes.get_ltp("99926000", "NSE", "Nifty 50")
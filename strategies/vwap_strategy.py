@@ -1,16 +1,22 @@
-import time
-import datetime
 import pandas as pd
 import numpy as np
 from config.settings import Config
 from core.safety_checks import SafetyGatekeeper
+from core.quote_service import QuoteService
+from core.data_fetcher import DataFetcher
+from utils.clock import system_clock
+from utils.indicators import IndicatorSet, EMA, VWAP
 
 class VWAPStrategy:
-    def __init__(self, api, token_loader, dry_run=False):
+    def __init__(self, api, token_loader, dry_run=False, quotes=None, clock=None):
         self.api = api
         self.token_loader = token_loader
         self.dry_run = dry_run
-        self.gatekeeper = SafetyGatekeeper(self.api)
+        self.clock = clock or system_clock
+        self.quotes = quotes or QuoteService(self.api, clock=self.clock)
+        self.gatekeeper = SafetyGatekeeper(self.api, self.quotes, clock=self.clock)
+        self.data_fetcher = DataFetcher(self.api, clock=self.clock)
+        self.indicators = IndicatorSet(ema20=EMA(20), vwap=VWAP())
 
     def execute(self, expiry, action="BUY"):
         """
@@ -42,10 +48,10 @@ class VWAPStrategy:
         if trend != "NEUTRAL":
              # 3. "X-Ray" Vision Check (OI Analysis) 🧠
              from core.oi_analyzer import OIAnalyzer
-             analyzer = OIAnalyzer(self.api, self.token_loader)
+             analyzer = OIAnalyzer(self.api, self.token_loader, clock=self.clock)
              
              # Calculate ATM for OI Check
-             atm = round(ltp / 50) * 50
+             atm = self.token_loader.get_option_chain("NIFTY", expiry).nearest_atm(ltp)
              pcr = analyzer.get_pcr(expiry, atm)
              sentiment = analyzer.analyze_sentiment(pcr)
              
@@ -77,23 +83,16 @@ class VWAPStrategy:
         if df is None or df.empty:
             return "NEUTRAL", "No Data", 0
 
-        # Technical Indicators Calculation
-        
+        # Technical Indicators Calculation (streaming, only new bars are applied)
         # 1. EMA 20 (Trend Baseline)
-        df['EMA_20'] = df['close'].ewm(span=20, adjust=False).mean()
-        
-        # 2. VWAP (Volume Weighted Average Price)
-        # VWAP = Cumulative(Price * Volume) / Cumulative(Volume)
-        # We calculate 'Rolling' or 'Intraday' VWAP. For simplicity on fetched data:
-        v = df['volume'].values
-        tp = (df['high'] + df['low'] + df['close']) / 3
-        df['vwap'] = (tp * v).cumsum() / v.cumsum()
+        # 2. VWAP (Volume Weighted Average Price), session-anchored:
+        #    VWAP = Cumulative(Typical Price * Volume) / Cumulative(Volume)
+        values = self.indicators.update_frame(df)
         
         # Current Candle Analysis
-        last = df.iloc[-1]
-        price = last['close']
-        vwap = last['vwap']
-        ema = last['EMA_20']
+        price = df['close'].iloc[-1]
+        vwap = values['vwap']
+        ema = values['ema20']
         
         print(f"    [Data] Price: {price:.2f} | VWAP: {vwap:.2f} | EMA(20): {ema:.2f}")
         
@@ -116,25 +115,10 @@ class VWAPStrategy:
 
     def fetch_nifty_data(self):
         try:
-            today_str = datetime.date.today().strftime("%Y-%m-%d")
-            # Fetch data from 09:15 to current time
-            historicParam={
-                "exchange": "NSE",
-                "symboltoken": "99926000", 
-                "interval": "FIVE_MINUTE",
-                "fromdate": f"{today_str} 09:15", 
-                "todate": f"{today_str} 15:30"
-            }
-            
-            data = self.api.getCandleData(historicParam)
+            # Today's 5-min candles from 09:15 (session-anchored VWAP), via the shared candle cache
+            df = self.data_fetcher.fetch_latest_candles("99926000", interval="FIVE_MINUTE", days=0)
             
-            if data and data.get('data'):
-                candles = data['data']
-                df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['close'] = df['close'].astype(float)
-                df['high'] = df['high'].astype(float)
-                df['low'] = df['low'].astype(float)
-                df['volume'] = df['volume'].astype(float)
+            if df is not None and not df.empty:
                 return df
             else:
                  # Mock Data Fallback
@@ -159,13 +143,11 @@ class VWAPStrategy:
         
         # 1. Select Strike (Slightly ITM for higher delta/probability)
         # Pros prefer ITM to reduce Theta decay impact compared to ATM/OTM
-        strike = round(ltp / 50) * 50
-        if option_type == "CE": strike -= 50 # 1 Strike ITM
-        if option_type == "PE": strike += 50
+        chain = self.token_loader.get_option_chain("NIFTY", expiry)
+        strike, token, symbol = chain.itm(ltp, option_type, 1) # 1 Strike ITM
         
         print(f">>> [Pro Tip] Selecting In-The-Money (ITM) Strike {strike} for better Delta.")
         
-        token, symbol = self.token_loader.get_token("NIFTY", expiry, strike, option_type)
         if not token: 
             print(">>> [Error] Token not found")
             return
@@ -205,7 +187,7 @@ class VWAPStrategy:
 
     # Reused Helpers (Ideally refactor to a Mixin)
     def wait_for_fill(self, order_id):
-        time.sleep(1)
+        self.clock.sleep(1)
         return 120.0 # Higher price simulation for ITM
         
     def place_stop_loss(self, token, symbol, buy_price, qty):
@@ -217,7 +199,7 @@ class VWAPStrategy:
         if self.dry_run: return
         print(">>> [Manager] Monitoring Trade (Target: 20%)...")
         from core.position_manager import PositionManager
-        manager = PositionManager(self.api, self.dry_run)
+        manager = PositionManager(self.api, self.dry_run, quotes=self.quotes, clock=self.clock)
         manager.monitor([{
            'symbol': symbol, 'token': token, 
            'entry_price': fill_price, 'qty': Config.NIFTY_LOT_SIZE
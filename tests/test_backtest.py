@@ -0,0 +1,129 @@
+import sys
+import os
+import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from core.backtest import HistoricalStore, SimulatedClock, BacktestAPI, BacktestTokenLookup, Backtester
+from config.settings import Config
+from strategies.momentum_strategy import MomentumStrategy
+from utils.clock import SessionEnded
+
+NIFTY = "99926000"
+DAY = datetime.date(2025, 1, 6)
+
+def minute_frame(opens, closes, highs=None, lows=None, start="2025-01-06 09:15"):
+    opens, closes = np.asarray(opens, dtype=float), np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start, periods=len(opens), freq="1min"),
+        'open': opens, 'close': closes,
+        'high': np.maximum(opens, closes) + 1 if highs is None else highs,
+        'low': np.minimum(opens, closes) - 1 if lows is None else lows,
+        'volume': np.full(len(opens), 100.0),
+    })
+
+def make_api(store, at):
+    clock = SimulatedClock(datetime.datetime.combine(DAY, at))
+    return BacktestAPI(store, clock, capital=100000, slippage=0.01, brokerage=20), clock
+
+def test_quotes_and_candles_without_lookahead():
+    print(">>> [Test] Backtest: LTP and candles only show what traded by the clock")
+    store = HistoricalStore()
+    store.add(NIFTY, minute_frame([100, 102, 104, 106, 108, 110], [101, 103, 105, 107, 109, 111]))
+    api, clock = make_api(store, datetime.time(9, 17, 30))
+
+    # 09:17 is in progress: its open is the LTP
+    assert api.ltpData("NSE", "Nifty 50", NIFTY)['data']['ltp'] == 104
+    params = {"exchange": "NSE", "symboltoken": NIFTY, "interval": "FIVE_MINUTE",
+              "fromdate": "2025-01-06 09:15", "todate": "2025-01-06 15:30"}
+    bars = api.getCandleData(params)['data']
+    assert bars == [["2025-01-06T09:15:00+05:30", 100, 104, 99, 104, 200]]
+
+    clock.set(datetime.datetime.combine(DAY, datetime.time(9, 21)))
+    bars = api.getCandleData(params)['data']
+    assert [b[0][11:16] for b in bars] == ["09:15", "09:20"]
+    assert bars[0][1:5] == [100, 110, 99, 109] and bars[1][1:5] == [110, 112, 109, 111]
+    assert api.ltpData("NSE", "Nifty 50", "123")['status'] is False
+
+def test_fills_slippage_and_resting_stops():
+    print(">>> [Test] Backtest: market fills with slippage, stop-loss triggered by a later bar")
+    store = HistoricalStore()
+    # Option with stored history: steady, then gaps down through the stop at 09:18
+    store.add("555", minute_frame([100, 100, 100, 90, 88], [100, 100, 100, 89, 87]))
+    store.add(NIFTY, minute_frame([22000] * 5, [22000] * 5))
+    api, clock = make_api(store, datetime.time(9, 16))
+
+    base = {"variety": "NORMAL", "tradingsymbol": "OPT", "symboltoken": "555", "exchange": "NFO",
+            "producttype": "INTRADAY", "duration": "DAY", "quantity": 65}
+    buy = api.placeOrder({**base, "transactiontype": "BUY", "ordertype": "MARKET"})
+    sl = api.placeOrder({**base, "variety": "STOPLOSS", "transactiontype": "SELL", "ordertype": "STOPLOSS_MARKET", "triggerprice": 95})
+    book = {o['orderid']: o for o in api.orderBook()['data']}
+    assert book[buy]['status'] == "complete" and book[buy]['averageprice'] == 101.0 # 1% slippage
+    assert book[sl]['status'] == "trigger pending"
+    assert float(api.rmsLimit()['data']['net']) == 100000 - 65 * 101 - 20
+
+    clock.sleep(60) # 09:17 bar: no trigger
+    assert api.by_id[sl]['status'] == "trigger pending"
+    clock.sleep(120) # 09:18 bar opens at 90, below the 95 trigger
+    assert api.by_id[sl]['status'] == "complete"
+    assert api.by_id[sl]['averageprice'] == 89.1 # gap: the open (90) less 1%
+    trade = api.trades[0]
+    assert trade['pnl'] == round(65 * (89.1 - 101), 2) and trade['exit_time'].time() == datetime.time(9, 19)
+
+    # Cancelled orders never fill
+    limit = api.placeOrder({**base, "transactiontype": "BUY", "ordertype": "LIMIT", "price": 50})
+    assert api.cancelOrder(limit, "NORMAL") == limit and api.by_id[limit]['status'] == "cancelled"
+
+def test_square_off_after_session_end():
+    print(">>> [Test] Backtest: positions left open are closed at the square-off even if the clock ran past it")
+    store = HistoricalStore()
+    opens = np.arange(375, dtype=float) + 100 # one point higher every minute
+    store.add("555", minute_frame(opens, opens))
+    store.add(NIFTY, minute_frame([22000] * 375, [22000] * 375))
+    api, clock = make_api(store, datetime.time(9, 16))
+    clock.deadline = datetime.datetime.combine(DAY, datetime.time(15, 30))
+    api.placeOrder({"variety": "NORMAL", "tradingsymbol": "OPT", "symboltoken": "555", "exchange": "NFO",
+                    "producttype": "INTRADAY", "duration": "DAY", "quantity": 65, "transactiontype": "BUY", "ordertype": "MARKET"})
+    try:
+        clock.sleep(8 * 3600)
+    except SessionEnded:
+        pass
+    assert clock.now().time() == datetime.time(15, 30)
+
+    api.close_session(DAY)
+    exit_fill = api.fills[-1]
+    square_off = datetime.datetime.combine(DAY, datetime.time(*Config.BACKTEST_SQUARE_OFF))
+    assert exit_fill['time'] == square_off and exit_fill['side'] == "SELL"
+    # Priced off the square-off minute's open, not the 15:30 tick
+    minute = (square_off - datetime.datetime.combine(DAY, datetime.time(9, 15))).seconds // 60
+    assert exit_fill['ltp'] == 100 + minute and api.positions["555"]['qty'] == 0
+    assert clock.now().time() == datetime.time(15, 30)
+
+def test_strategy_replay_squares_off_each_session():
+    print(">>> [Test] Backtest: Momentum replayed over synthetic sessions")
+    rng = np.random.default_rng(3)
+    frames = []
+    for day in ("2025-01-06", "2025-01-07"):
+        close = 22000 + np.cumsum(rng.normal(0, 5, 375))
+        frames.append(minute_frame(np.r_[close[0], close[:-1]], close, start=f"{day} 09:15"))
+    store = HistoricalStore()
+    store.add(NIFTY, pd.concat(frames))
+
+    backtester = Backtester(store, MomentumStrategy)
+    result = backtester.run()
+    assert result.summary()['sessions'] == 2 and len(result.trades) > 0
+    # Every position is flat by the end of each session, and option fills carry slippage
+    assert all(p['qty'] == 0 for p in backtester.api.positions.values())
+    assert (result.fills['slippage'] > 0).all()
+    assert (result.trades['exit_time'].dt.time <= datetime.time(15, 20)).all()
+    # The live strategy's state file was not touched
+    assert MomentumStrategy.STATE_FILE == "trade_state.json"
+    chain = BacktestTokenLookup(backtester.api).get_option_chain("NIFTY", "07JAN2025")
+    assert chain.contract(22000, "CE")[1] == "NIFTY07JAN2522000CE"
+
+if __name__ == "__main__":
+    test_quotes_and_candles_without_lookahead()
+    test_fills_slippage_and_resting_stops()
+    test_square_off_after_session_end()
+    test_strategy_replay_squares_off_each_session()
@@ -0,0 +1,96 @@
+import sys
+import os
+import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from core.bar_aggregator import BarAggregator
+
+DAY = datetime.datetime(2026, 1, 20)
+
+def at(hh, mm, ss=0):
+    return DAY.replace(hour=hh, minute=mm, second=ss)
+
+def test_multi_timeframe_bars():
+    print(">>> [Test] BarAggregator: 1/5/15-min bars and close events from ticks")
+    bars = BarAggregator("99926000")
+    events = []
+    bars.add_listener(lambda interval, bar: events.append((interval, bar[0].strftime("%H:%M"))))
+
+    # One tick every 20s from 09:15:00 to 09:31:40, price rising by 1
+    for i in range(51):
+        ts = at(9, 15) + datetime.timedelta(seconds=20 * i)
+        bars.on_tick(23000.0 + i, ts)
+
+    one = bars.frame("ONE_MINUTE")
+    five = bars.frame("FIVE_MINUTE")
+    fifteen = bars.frame("FIFTEEN_MINUTE")
+    assert len(one) == 16 and len(five) == 3 and len(fifteen) == 1
+
+    first = one.iloc[0]
+    assert (first['open'], first['high'], first['low'], first['close']) == (23000.0, 23002.0, 23000.0, 23002.0)
+    assert five.iloc[0]['timestamp'] == at(9, 15) and five.iloc[0]['close'] == 23014.0
+    assert fifteen.iloc[0]['close'] == 23044.0
+
+    assert ("FIFTEEN_MINUTE", "09:15") in events and ("FIVE_MINUTE", "09:25") in events
+    # Forming bars are only included on request
+    assert len(bars.frame("FIVE_MINUTE", include_forming=True)) == 4
+
+    # Timer close without a further tick
+    bars.check_close(now=at(9, 35))
+    assert len(bars.frame("FIVE_MINUTE")) == 4
+
+class FakeFetcher:
+    """Broker bars from the session 'days' back onwards, like DataFetcher's window"""
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    def fetch_latest_candles(self, token, interval="FIVE_MINUTE", days=1, exchange="NSE"):
+        self.calls += 1
+        since = (DAY - datetime.timedelta(days=days)).date()
+        rows = [r for r in self.rows if r[0].date() >= since]
+        return pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+def test_seed_and_reconcile():
+    print(">>> [Test] BarAggregator: seeded from the broker, local bars reconciled")
+    ts = lambda hh, mm: pd.Timestamp(at(hh, mm)).tz_localize("Asia/Kolkata")
+    broker = [
+        (ts(9, 15), 100.0, 110.0, 95.0, 105.0, 0.0),
+        (ts(9, 20), 105.0, 108.0, 101.0, 102.0, 0.0),
+    ]
+    fetcher = FakeFetcher(broker)
+    bars = BarAggregator("99926000", intervals=["FIVE_MINUTE"])
+
+    # Ticks missed the 09:20 bar's high
+    bars.on_tick(105.0, at(9, 20, 1))
+    bars.on_tick(102.0, at(9, 24, 50))
+    bars.on_tick(103.0, at(9, 25, 1))
+
+    bars.seed(fetcher)
+    assert bars.mismatches == 1 and fetcher.calls == 1
+    bars.seed(fetcher) # seeding happens once
+    assert fetcher.calls == 1
+    df = bars.frame("FIVE_MINUTE", include_forming=True)
+    assert list(df['high']) == [110.0, 108.0, 103.0] # broker values replace local ones; forming bar kept
+
+def test_seed_includes_previous_session():
+    print(">>> [Test] BarAggregator: seeding loads the previous session, later reconciles only today")
+    ts = lambda day, hh, mm: pd.Timestamp(day.replace(hour=hh, minute=mm)).tz_localize("Asia/Kolkata")
+    yesterday = DAY - datetime.timedelta(days=1)
+    broker = [(ts(yesterday, 15, 20 + 5 * i), 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 0.0) for i in range(2)]
+    broker.append((ts(DAY, 9, 15), 104.0, 106.0, 103.0, 105.0, 0.0))
+    fetcher = FakeFetcher(broker)
+    bars = BarAggregator("99926000", intervals=["FIVE_MINUTE"])
+    bars.on_tick(105.0, at(9, 20, 1))
+
+    bars.seed(fetcher)
+    df = bars.frame("FIVE_MINUTE", include_forming=True)
+    assert [t.strftime("%d %H:%M") for t in df['timestamp']] == ["19 15:20", "19 15:25", "20 09:15", "20 09:20"]
+    # Reconciling again only asks for today's bars; the warm-up stays
+    assert bars.reconcile() == 0 and len(bars.frame("FIVE_MINUTE")) == 3
+
+if __name__ == "__main__":
+    test_multi_timeframe_bars()
+    test_seed_and_reconcile()
+    test_seed_includes_previous_session()
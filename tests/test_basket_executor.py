@@ -0,0 +1,169 @@
+import sys
+import os
+import time
+import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.backtest import BacktestTokenLookup
+from core.basket_executor import BasketExecutor
+from core.market_simulator import MarketSimulator
+from core.order_service import OrderService
+from core.quote_service import QuoteService
+from strategies.nifty_straddle import NiftyStrategy
+from utils.clock import SimulatedClock, SessionEnded
+
+def at(hour, minute, second=0):
+    return datetime.datetime(2026, 2, 10, hour, minute, second)
+
+class SlowOrders:
+    """Simulated market whose order entry takes 'delay' seconds of real time"""
+    def __init__(self, market, delay):
+        self.market = market
+        self.delay = delay
+
+    def placeOrder(self, orderparams):
+        time.sleep(self.delay)
+        return self.market.placeOrder(orderparams)
+
+    def __getattr__(self, name):
+        return getattr(self.market, name)
+
+def test_legs_and_stops_go_out_together():
+    print(">>> [Test] Basket: entry legs and their stops placed concurrently, leg skew recorded")
+    clock = SimulatedClock(at(10, 0))
+    market = MarketSimulator(clock=clock, seed=5, days=0)
+    api = SlowOrders(market, delay=0.2)
+    lookup = BacktestTokenLookup(market)
+    orders = OrderService(api, max_age=0.5, clock=clock)
+    basket = BasketExecutor(api, orders, QuoteService(api, clock=clock), clock=clock)
+
+    legs = []
+    for option_type in ("CE", "PE"):
+        token, symbol = lookup.get_token("NIFTY", "17FEB2026", 23000, option_type)
+        legs.append({'name': option_type, 'token': token, 'symbol': symbol, 'action': "SELL", 'qty': 65,
+                     'stop': lambda fill: (round(fill * 1.25, 1), round(fill * 1.25 + 1, 1))})
+
+    started = time.perf_counter()
+    result = basket.execute(legs)
+    # Two entries and two stops at 0.2s each: sequential would take 0.8s
+    assert time.perf_counter() - started < 0.6
+
+    for leg in result['legs']:
+        order, stop = market.by_id[leg['order_id']], market.by_id[leg['sl_order_id']]
+        assert order['status'] == "complete" and leg['fill_price'] == order['averageprice']
+        assert stop['status'] == "trigger pending" and stop['transactiontype'] == "BUY"
+        assert stop['triggerprice'] == round(leg['fill_price'] * 1.25, 1)
+        # Sold one tick under the LTP seen before sending
+        assert leg['slippage'] == round(leg['ref_price'] - leg['fill_price'], 2) >= 0.05
+    skew = result['skew']
+    assert skew['filled'] == 2 and skew['send_skew'] == 0.0
+    # Without an order stream a fill is seen at the next order-book poll (one per leg's wait on a simulated clock)
+    assert skew['fill_skew'] <= 2 * orders.max_age
+    assert skew['price_skew'] == round(abs(result['legs'][0]['slippage'] - result['legs'][1]['slippage']), 2)
+    assert basket.skews == [skew] and result['complete']
+
+class RefusingOrders(SlowOrders):
+    """Entry orders for 'refused' symbols fail at the broker"""
+    def __init__(self, market, refused):
+        super().__init__(market, delay=0)
+        self.refused = refused
+
+    def placeOrder(self, orderparams):
+        if orderparams['tradingsymbol'] in self.refused and orderparams['variety'] == "NORMAL":
+            raise Exception("Order rejected: insufficient margin")
+        return super().placeOrder(orderparams)
+
+def test_partial_basket_is_unwound():
+    print(">>> [Test] Basket: a rejected leg or a failed stop closes the legs that filled")
+    clock = SimulatedClock(at(10, 0))
+    market = MarketSimulator(clock=clock, seed=5, days=0)
+    lookup = BacktestTokenLookup(market)
+    contracts = {t: lookup.get_token("NIFTY", "17FEB2026", 23000, t) for t in ("CE", "PE")}
+    stop = lambda fill: (round(fill * 1.25, 1), round(fill * 1.25 + 1, 1))
+
+    def broken_stop(fill):
+        raise ValueError("no volatility for the stop")
+
+    def legs(pe_stop):
+        return [{'name': t, 'token': contracts[t][0], 'symbol': contracts[t][1], 'action': "SELL", 'qty': 65,
+                 'stop': pe_stop if t == "PE" else stop} for t in ("CE", "PE")]
+
+    # The PE entry is refused: the CE leg's stop is cancelled and the leg bought back
+    api = RefusingOrders(market, refused={contracts["PE"][1]})
+    basket = BasketExecutor(api, OrderService(api, max_age=0.5, clock=clock), clock=clock)
+    result = basket.execute(legs(stop))
+    ce, pe = result['legs']
+    assert not result['complete'] and pe['order_id'] is None and not pe.get('flattened')
+    assert market.by_id[ce['sl_order_id']]['status'] == "cancelled"
+    cover = market.by_id[ce['exit_order_id']]
+    assert ce['flattened'] and cover['transactiontype'] == "BUY" and cover['quantity'] == 65
+
+    # Both legs fill but the PE stop cannot be computed: both are closed
+    basket = BasketExecutor(market, OrderService(market, max_age=0.5, clock=clock), clock=clock)
+    result = basket.execute(legs(broken_stop))
+    assert not result['complete'] and all(leg['flattened'] for leg in result['legs'])
+    assert result['legs'][1].get('sl_order_id') is None
+    assert all(market.by_id[leg['exit_order_id']]['transactiontype'] == "BUY" for leg in result['legs'])
+
+    # Without unwinding the legs stay open (and the partial basket is only logged)
+    basket = BasketExecutor(market, OrderService(market, max_age=0.5, clock=clock), clock=clock, unwind_partial=False)
+    result = basket.execute(legs(broken_stop))
+    assert not result['complete'] and not any(leg.get('flattened') for leg in result['legs'])
+
+class LateCancel(SlowOrders):
+    """The entry fills while its cancel request is on the way"""
+    def __init__(self, market):
+        super().__init__(market, delay=0)
+
+    def cancelOrder(self, order_id, variety):
+        self.market.clock.sleep(120)
+        return self.market.cancelOrder(order_id, variety)
+
+def test_unfilled_entry_is_cancelled():
+    print(">>> [Test] Basket: an entry still working at the fill timeout is cancelled, or stopped if it filled meanwhile")
+    clock = SimulatedClock(at(10, 0))
+    market = MarketSimulator(clock=clock, seed=5, days=0, fill_delay=60)
+    token, symbol = BacktestTokenLookup(market).get_token("NIFTY", "17FEB2026", 23000, "CE")
+    stop = lambda fill: (round(fill * 1.25, 1), round(fill * 1.25 + 1, 1))
+
+    def leg():
+        return [{'name': "CE", 'token': token, 'symbol': symbol, 'action': "SELL", 'qty': 65, 'stop': stop}]
+
+    # Still open after 5s: cancelled, and it stays cancelled (no naked short later)
+    basket = BasketExecutor(market, OrderService(market, max_age=0.5, clock=clock), clock=clock, fill_timeout=5)
+    result = basket.execute(leg())
+    entry = result['legs'][0]
+    assert not result['complete'] and entry['cancelled'] and entry.get('fill_price') is None
+    clock.sleep(120)
+    assert market.by_id[entry['order_id']]['status'] == "cancelled"
+
+    # Filled before the cancel arrived: the leg is a normal filled leg with its stop
+    api = LateCancel(market)
+    basket = BasketExecutor(api, OrderService(api, max_age=0.5, clock=clock), clock=clock, fill_timeout=5)
+    result = basket.execute(leg())
+    entry = result['legs'][0]
+    assert result['complete'] and not entry.get('cancelled')
+    assert entry['fill_price'] == market.by_id[entry['order_id']]['averageprice']
+    assert market.by_id[entry['sl_order_id']]['status'] == "trigger pending"
+
+def test_straddle_entry_through_basket():
+    print(">>> [Test] Basket: the straddle sells both legs and protects each on the simulated market")
+    clock = SimulatedClock(at(9, 20), deadline=at(9, 40))
+    market = MarketSimulator(clock=clock, seed=6)
+    strategy = NiftyStrategy(market, BacktestTokenLookup(market), quotes=QuoteService(market, clock=clock), clock=clock)
+    try:
+        strategy.execute(expiry="17FEB2026")
+    except SessionEnded:
+        pass
+    entries = [o for o in market.orders if o['variety'] == "NORMAL"]
+    assert sorted(o['tradingsymbol'][-2:] for o in entries[:2]) == ["CE", "PE"]
+    assert all(o['transactiontype'] == "SELL" and o['status'] == "complete" for o in entries[:2])
+    assert set(strategy.sl_orders) == {'CE', 'PE'} and strategy.basket.skews[0]['filled'] == 2
+    for leg in ('CE', 'PE'):
+        assert market.by_id[strategy.sl_orders[leg]]['triggerprice'] == round(strategy.entry_prices[leg] * 1.25, 1)
+
+if __name__ == "__main__":
+    test_legs_and_stops_go_out_together()
+    test_partial_basket_is_unwound()
+    test_unfilled_entry_is_cancelled()
+    test_straddle_entry_through_basket()
@@ -0,0 +1,112 @@
+import sys
+import os
+import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.backtest import BacktestTokenLookup
+from core.market_simulator import MarketSimulator
+from core.quote_service import QuoteService
+from strategies.ohl_strategy import OHLStrategy
+from strategies.inside_bar_strategy import InsideBarStrategy
+from utils import black_scholes as bs
+from utils.clock import SimulatedClock, SessionEnded
+from utils.option_chain import OptionChain
+
+SPOT = 23000.0
+STRIKES = np.arange(21000, 25001, 50.0)
+
+def smile(strikes):
+    return 0.12 + 0.04 * ((strikes - SPOT) / 1000.0) ** 2
+
+def test_iv_round_trip():
+    print(">>> [Test] Black-Scholes: IV solved back from premiums across the chain")
+    t = 3 / 365
+    vol = smile(STRIKES)
+    call = bs.price(SPOT, STRIKES, t, vol, True)
+    put = bs.price(SPOT, STRIKES, t, vol, False)
+
+    # Put-call parity
+    assert np.max(np.abs(call - put - (SPOT - STRIKES * np.exp(-bs.Config.RISK_FREE_RATE * t)))) < 1e-6
+
+    for is_call, premium in ((True, call), (False, put)):
+        iv = bs.implied_vol(premium, SPOT, STRIKES, t, is_call)
+        # Only where the option still has quotable time value (ITM and OTM sides alike)
+        quotable = np.minimum(call, put) > 0.05
+        assert np.max(np.abs(iv[quotable] - vol[quotable])) < 1e-6
+
+    # Outside no-arbitrage bounds -> NaN
+    assert np.isnan(bs.implied_vol(0.0, SPOT, 23000, t, True))
+    assert np.isnan(bs.implied_vol(SPOT + 1, SPOT, 23000, t, True))
+
+def test_greeks_match_finite_differences():
+    print(">>> [Test] Black-Scholes: Greeks against bumped prices")
+    t, vol = 10 / 365, 0.14
+    for is_call in (True, False):
+        g = bs.greeks(SPOT, STRIKES, t, vol, is_call)
+        up = bs.price(SPOT + 1, STRIKES, t, vol, is_call)
+        down = bs.price(SPOT - 1, STRIKES, t, vol, is_call)
+        mid = bs.price(SPOT, STRIKES, t, vol, is_call)
+        assert np.max(np.abs(g['delta'] - (up - down) / 2)) < 1e-4
+        assert np.max(np.abs(g['gamma'] - (up - 2 * mid + down))) < 1e-5
+        vega = (bs.price(SPOT, STRIKES, t, vol + 0.0001, is_call) - bs.price(SPOT, STRIKES, t, vol - 0.0001, is_call)) / 2 * 100
+        assert np.max(np.abs(g['vega'] - vega)) < 1e-3
+        h = 1e-4 # years
+        theta = (bs.price(SPOT, STRIKES, t - h, vol, is_call) - bs.price(SPOT, STRIKES, t + h, vol, is_call)) / (2 * h) / 365
+        assert np.max(np.abs(g['theta'] - theta)) < 1e-3
+
+def test_chain_greeks_and_stop_loss():
+    print(">>> [Test] Black-Scholes: whole chain in one call, option SL from an index SL")
+    now = datetime.datetime(2026, 1, 15, 10, 0)
+    expiry = "20JAN2026"
+    t = bs.time_to_expiry(expiry, now)
+    assert abs(t - (5 * 24 + 5.5) / (365 * 24)) < 1e-9
+
+    strikes = [int(k) for k in STRIKES]
+    ce = [(f"{k}CE", f"NIFTY20JAN26{k}CE") for k in strikes]
+    pe = [(f"{k}PE", f"NIFTY20JAN26{k}PE") for k in strikes]
+    chain = OptionChain("NIFTY", expiry, strikes, ce, pe)
+    vol = smile(STRIKES)
+    prices = {}
+    prices.update(zip([c[0] for c in ce], bs.price(SPOT, STRIKES, t, vol, True)))
+    prices.update(zip([p[0] for p in pe], bs.price(SPOT, STRIKES, t, vol, False)))
+    del prices["23000PE"] # not quoted
+
+    df = bs.chain_greeks(chain, SPOT, prices, now=now)
+    assert len(df) == 2 * len(strikes)
+    atm = df[(df['strike'] == 23000) & (df['type'] == "CE")].iloc[0]
+    assert abs(atm['iv'] - 0.12) < 1e-6 and 0.5 < atm['delta'] < 0.6
+    assert np.isnan(df[(df['strike'] == 23000) & (df['type'] == "PE")].iloc[0]['iv'])
+
+    # Index SL 50 points below: the SL premium is the option's value there, between the
+    # delta-only estimate and the fill (gamma cushions a long option's loss)
+    fill = float(prices["23000CE"])
+    sl, delta = bs.stop_loss_premium(fill, SPOT, SPOT - 50, 23000, expiry, "CE", now=now)
+    assert abs(sl - bs.price(SPOT - 50, 23000, t, 0.12, True)) < 1e-4
+    assert fill - 50 * delta < sl < fill
+
+    assert bs.stop_loss_premium(0.0, SPOT, SPOT - 50, 23000, expiry, "CE", now=now) == (None, None)
+
+def test_directional_entries_place_repriced_stops():
+    print(">>> [Test] Black-Scholes: OHL and Inside Bar entries fill, then place the repriced option SL")
+    now = datetime.datetime(2026, 2, 10, 10, 0)
+    for strategy_cls, enter in ((OHLStrategy, "place_entry"), (InsideBarStrategy, "place_trade")):
+        clock = SimulatedClock(now, deadline=now + datetime.timedelta(minutes=5))
+        market = MarketSimulator(clock=clock, seed=8, days=0)
+        strategy = strategy_cls(market, BacktestTokenLookup(market), quotes=QuoteService(market, clock=clock), clock=clock)
+        spot = market.price("99926000")
+        try:
+            getattr(strategy, enter)("17FEB2026", 23000, "CE", 65, spot - 40, "UP")
+        except SessionEnded:
+            pass # monitoring until the deadline
+
+        entry, stop = market.orders[0], market.orders[1]
+        assert entry['status'] == "complete" and stop['variety'] == "STOPLOSS" and stop['transactiontype'] == "SELL"
+        sl, _ = bs.stop_loss_premium(entry['averageprice'], spot, spot - 40, 23000, "17FEB2026", "CE", now=now)
+        assert stop['price'] == round(sl, 1) and stop['triggerprice'] == round(round(sl, 1) + 0.5, 1)
+
+if __name__ == "__main__":
+    test_iv_round_trip()
+    test_greeks_match_finite_differences()
+    test_chain_greeks_and_stop_loss()
+    test_directional_entries_place_repriced_stops()
@@ -0,0 +1,70 @@
+import sys
+import os
+import datetime
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.safety_checks import SafetyGatekeeper
+from strategies.nifty_straddle import NiftyStrategy
+from utils.clock import Clock, SimulatedClock, SessionEnded, system_clock
+
+DAY = datetime.date(2026, 2, 10)
+
+def at(hour, minute, second=0):
+    return datetime.datetime.combine(DAY, datetime.time(hour, minute, second))
+
+class MockAPI:
+    def placeOrder(self, params):
+        return "TEST_ORDER_ID"
+
+def test_simulated_clock():
+    print(">>> [Test] Clock: simulated sleep advances instantly, stops at the deadline")
+    assert isinstance(system_clock, Clock)
+    clock = SimulatedClock(at(9, 15), deadline=at(15, 30))
+    seen = []
+    clock.on_advance = seen.append
+
+    clock.sleep(90)
+    assert clock.now() == at(9, 16, 30) and clock.today() == DAY and seen == [at(9, 16, 30)]
+    assert clock.time() == at(9, 16, 30).timestamp()
+
+    clock.set(at(15, 29))
+    try:
+        clock.sleep(120)
+        assert False, "sleep past the deadline must raise"
+    except SessionEnded:
+        pass
+    assert clock.now() == at(15, 30)
+
+def test_gatekeeper_follows_injected_clock():
+    print(">>> [Test] Clock: gatekeeper market hours and blackout on simulated time")
+    clock = SimulatedClock(at(9, 0))
+    gatekeeper = SafetyGatekeeper(MockAPI(), clock=clock)
+    assert not gatekeeper.is_market_open()
+
+    clock.set(at(9, 15))
+    assert gatekeeper.is_market_open() and not gatekeeper.is_blackout_period()
+    clock.sleep(2 * 3600 + 15 * 60) # 11:30
+    assert gatekeeper.is_blackout_period()
+    clock.sleep(90 * 60 + 1) # 13:00:01
+    assert not gatekeeper.is_blackout_period()
+    clock.set(at(15, 30))
+    assert not gatekeeper.is_market_open()
+
+def test_straddle_session_replays_in_seconds():
+    print(">>> [Test] Clock: straddle monitor runs 09:20-15:15 on a simulated clock")
+    clock = SimulatedClock(at(9, 20))
+    strategy = NiftyStrategy(MockAPI(), None, dry_run=True, clock=clock)
+    strategy.sl_orders = {'CE': "dry_run_sl_id", 'PE': "dry_run_sl_id"}
+    strategy.legs_active = {'CE': True, 'PE': True}
+
+    started = time.perf_counter()
+    strategy.monitor_straddle("1", "2", "NIFTYCE", "NIFTYPE", 65)
+    # 7,100 three-second polls
+    assert clock.now() >= at(15, 15) and clock.now() < at(15, 15, 3)
+    assert time.perf_counter() - started < 5.0
+
+if __name__ == "__main__":
+    test_simulated_clock()
+    test_gatekeeper_follows_injected_clock()
+    test_straddle_session_replays_in_seconds()
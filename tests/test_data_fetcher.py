@@ -0,0 +1,68 @@
+import sys
+import os
+import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_fetcher import DataFetcher, CandleCache
+
+class FakeCandleAPI:
+    """Serves 5-min bars from 09:15 up to 'now', the last one still forming"""
+    def __init__(self):
+        self.requests = []
+        self.bars = {} # 'HH:MM' -> close
+
+    def set_bar(self, hhmm, close):
+        self.bars[hhmm] = close
+
+    def getCandleData(self, params):
+        self.requests.append(dict(params))
+        day = datetime.date.today().isoformat()
+        start = params['fromdate'][-5:]
+        data = []
+        for hhmm in sorted(self.bars):
+            if hhmm >= start:
+                c = self.bars[hhmm]
+                data.append([f"{day}T{hhmm}:00+05:30", c, c + 1, c - 1, c, 100])
+        return {"status": True, "data": data}
+
+def test_incremental_fetch():
+    print(">>> [Test] DataFetcher: only new bars requested, forming bar replaced")
+    api = FakeCandleAPI()
+    cache = CandleCache(max_bars=100)
+    fetcher = DataFetcher(api, cache=cache)
+    other = DataFetcher(api, cache=cache) # e.g. another strategy
+
+    api.set_bar("09:15", 100)
+    api.set_bar("09:20", 101) # forming
+    df = fetcher.fetch_latest_candles("99926000", days=0)
+    assert list(df['close']) == [100, 101]
+    assert api.requests[-1]['fromdate'].endswith("09:15")
+
+    api.set_bar("09:20", 102) # 09:20 closed at 102
+    api.set_bar("09:25", 103) # new forming bar
+    df = other.fetch_latest_candles("99926000", days=0)
+    assert api.requests[-1]['fromdate'].endswith("09:20") # resumed from the last cached bar
+    assert list(df['close']) == [100, 102, 103]
+    assert str(df['timestamp'].iloc[-1].time()) == "09:25:00"
+
+    # A longer look-back than the cache covers forces a full fetch
+    fetcher.fetch_latest_candles("99926000", days=1)
+    assert api.requests[-1]['fromdate'].endswith("09:15")
+    assert api.requests[-1]['fromdate'][:10] != datetime.date.today().isoformat()
+
+def test_ring_buffer_bound():
+    print(">>> [Test] CandleCache: bounded ring buffer")
+    import pandas as pd
+    cache = CandleCache(max_bars=3)
+    key = ("NSE", "1", "ONE_MINUTE")
+    start = datetime.datetime(2026, 1, 20, 9, 15)
+    rows = [(pd.Timestamp(start + datetime.timedelta(minutes=i)), 1.0, 1.0, 1.0, float(i), 0.0) for i in range(5)]
+    cache.merge(key, rows, window_start=start)
+    df = cache.frame(key)
+    assert list(df['close']) == [2.0, 3.0, 4.0]
+    # Oldest bars were evicted, so the start of the window is no longer covered
+    assert cache.resume_from(key, start) is None
+
+if __name__ == "__main__":
+    test_incremental_fetch()
+    test_ring_buffer_bound()
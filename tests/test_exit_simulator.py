@@ -0,0 +1,114 @@
+import sys
+import os
+import datetime
+import functools
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.position_manager import PositionManager
+from strategies.momentum_strategy import MomentumStrategy
+from utils.clock import SimulatedClock
+from utils import exit_simulator as es
+
+class MockAPI:
+    def placeOrder(self, params):
+        return "TEST_ORDER_ID"
+
+class ReplayPositionManager(PositionManager):
+    """Live TSL loop fed from one price path; the clock ends the session right after the last price"""
+    def __init__(self, path):
+        start = datetime.datetime(2026, 2, 10, 15, 15) - datetime.timedelta(seconds=5 * (len(path) - 1))
+        super().__init__(MockAPI(), dry_run=True, clock=SimulatedClock(start))
+        self.path = list(path)
+        self.checks = 0
+
+    def get_ltp(self, token):
+        price = self.path[min(self.checks, len(self.path) - 1)]
+        self.checks += 1
+        return price
+
+def live_tsl(path):
+    manager = ReplayPositionManager(path)
+    pos = {'symbol': 'NIFTYTEST', 'token': '1', 'entry_price': float(path[0]), 'qty': 65}
+    manager.monitor([pos])
+    if pos.get('exit_reason') == "TIME_EXIT":
+        return len(path) - 1, es.TIME_EXIT
+    return manager.checks - 1, es.TRAILING_STOP if pos['tsl_active'] else es.STOP_LOSS
+
+def live_ladder(path):
+    strategy = MomentumStrategy.__new__(MomentumStrategy)
+    strategy.save_state = lambda: None
+    strategy.close_position = lambda reason: None
+    strategy.active_position = {'token': '1', 'symbol': 'X', 'entry_price': float(path[0]), 'sl_price': 0.0}
+    for step, price in enumerate(path):
+        strategy.quotes = type("Quote", (), {'get_ltp': lambda self, *a, p=price: p})()
+        if strategy.check_trailing_stop():
+            return step
+    return len(path) - 1
+
+def test_hand_written_path():
+    print(">>> [Test] Exit simulator: the test_tsl rally-then-crash path")
+    paths = np.array([[100, 105, 110, 115, 122, 115, 110]], dtype=float)
+    steps, prices, reasons = es.trailing_stop_exits(paths, paths[:, 0])
+    assert steps[0] == 6 and prices[0] == 110 and reasons[0] == es.TRAILING_STOP
+
+    # Ladder: +25 locks +5, +45 locks +25, then the drop to 120 hits it
+    paths = np.array([[100, 110, 125, 145, 130, 120, 150]], dtype=float)
+    steps, prices, _ = es.step_ladder_exits(paths, paths[:, 0])
+    assert steps[0] == 5 and prices[0] == 120
+
+def test_matches_live_rules():
+    print(">>> [Test] Exit simulator: vectorized rules agree with PositionManager and MomentumStrategy")
+    paths = es.simulate_paths(40, 60, start=100.0, vol=0.02, seed=11)
+    steps, _, reasons = es.trailing_stop_exits(paths, paths[:, 0])
+    ladder_steps, _, _ = es.step_ladder_exits(paths, paths[:, 0])
+    for i, path in enumerate(paths):
+        assert live_tsl(path) == (steps[i], reasons[i]), i
+        assert live_ladder(path) == ladder_steps[i], i
+    assert set(reasons) == {es.TIME_EXIT, es.STOP_LOSS, es.TRAILING_STOP}
+
+def test_distributions_and_bootstrap():
+    print(">>> [Test] Exit simulator: policy comparison and bootstrapped paths")
+    paths = es.simulate_paths(5000, 200, start=100.0, vol=0.01, seed=3)
+    assert paths.shape == (5000, 200) and (paths[:, 0] == 100.0).all()
+    results = es.evaluate(paths, {
+        "tsl_10": es.trailing_stop_exits,
+        "tsl_20": functools.partial(es.trailing_stop_exits, trail=0.20),
+        "ladder": es.step_ladder_exits,
+    }, qty=65, chunk=1500)
+    table = es.compare(results)
+    assert list(table['policy'].sort_values()) == ["ladder", "tsl_10", "tsl_20"]
+    assert table['mean_pnl'].is_monotonic_decreasing
+    row = table.set_index('policy').loc["tsl_10"]
+    # Every loss is capped near the initial stop (-10% of 100 x 65, plus the last step's gap)
+    assert row['p5'] >= -65 * 10 * 1.2 and row['cvar5'] <= row['p5']
+    assert abs(row['time_exit'] + row['stop_loss_hit'] + row['trailing_sl_hit'] - 1) < 1e-9
+    # Chunked evaluation is identical to one block
+    whole = es.evaluate(paths, {"tsl_10": es.trailing_stop_exits})["tsl_10"]
+    assert np.array_equal(whole.steps, results["tsl_10"].steps)
+    # Scanning a few checks at a time (dropping exited paths) is identical to one pass
+    original = es.WINDOW_STEPS
+    try:
+        es.WINDOW_STEPS = 7
+        narrow = [rule(paths, paths[:, 0]) for rule in (es.trailing_stop_exits, es.step_ladder_exits)]
+        es.WINDOW_STEPS = paths.shape[1]
+        wide = [rule(paths, paths[:, 0]) for rule in (es.trailing_stop_exits, es.step_ladder_exits)]
+    finally:
+        es.WINDOW_STEPS = original
+    for a, b in zip(narrow, wide):
+        assert all(np.array_equal(x, y) for x, y in zip(a, b))
+
+    single = es.simulate_paths(1000, 200, start=100.0, vol=0.01, seed=3, dtype=np.float32)
+    assert single.dtype == np.float32 and (single[:, 0] == 100.0).all()
+    assert es.trailing_stop_exits(single, single[:, 0])[1].dtype == np.float32
+
+    history = 100 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.01, 500)))
+    boot = es.bootstrap_paths(history, 1000, 50, start=80.0, block=5, seed=2)
+    assert boot.shape == (1000, 50) and (boot[:, 0] == 80.0).all()
+    ratios = np.diff(np.log(boot), axis=1)
+    assert np.isin(np.round(ratios[:, :5], 12), np.round(np.diff(np.log(history)), 12)).all()
+
+if __name__ == "__main__":
+    test_hand_written_path()
+    test_matches_live_rules()
+    test_distributions_and_bootstrap()
@@ -0,0 +1,95 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from utils.indicators import EMA, RSI, VWAP, ATR, Bollinger, IndicatorSet, crossover_price
+from strategies.momentum_strategy import MomentumStrategy
+
+def make_bars(n=900, seed=7):
+    # Three sessions of 1-min bars, including flat stretches (RSI 0/0 and loss == 0 cases)
+    rng = np.random.default_rng(seed)
+    close = 23000 + np.cumsum(rng.normal(0, 5, n))
+    close[:5] = 23000.0
+    close[100:110] = close[99]
+    high = close + rng.uniform(0, 4, n)
+    low = close - rng.uniform(0, 4, n)
+    days = [pd.Timestamp("2026-01-19 09:15"), pd.Timestamp("2026-01-20 09:15"), pd.Timestamp("2026-01-21 09:15")]
+    ts = [days[i // 300] + pd.Timedelta(minutes=i % 300) for i in range(n)]
+    volume = rng.integers(1000, 5000, n).astype(float)
+    return pd.DataFrame({'timestamp': ts, 'open': close, 'high': high, 'low': low, 'close': close, 'volume': volume})
+
+def test_match_pandas():
+    print(">>> [Test] Indicators: streaming values match the pandas computations")
+    df = make_bars()
+
+    ema9 = df['close'].ewm(span=9, adjust=False).mean()
+    rsi = MomentumStrategy.calculate_rsi(None, df)
+    tp = (df['high'] + df['low'] + df['close']) / 3
+    session = df['timestamp'].dt.date
+    vwap = (tp * df['volume']).groupby(session).cumsum() / df['volume'].groupby(session).cumsum()
+    prev = df['close'].shift()
+    tr = pd.concat([df['high'] - df['low'], (df['high'] - prev).abs(), (df['low'] - prev).abs()], axis=1).max(axis=1)
+    atr = tr.ewm(alpha=1/14, adjust=False).mean()
+    mid = df['close'].rolling(20).mean()
+    upper = mid + 2 * df['close'].rolling(20).std()
+
+    e, r, v, a, b = EMA(9), RSI(14), VWAP(), ATR(14), Bollinger(20, 2)
+    for i, bar in enumerate(df.itertuples(index=False)):
+        assert abs(e.update_bar(bar) - ema9[i]) < 1e-9
+        assert abs(r.update_bar(bar) - rsi[i]) < 1e-9
+        assert abs(v.update_bar(bar) - vwap[i]) < 1e-9
+        assert abs(a.update_bar(bar) - atr[i]) < 1e-9
+        bands = b.update_bar(bar)
+        if i >= 19:
+            assert abs(bands[0] - mid[i]) < 1e-6 and abs(bands[1] - upper[i]) < 1e-6
+        else:
+            assert bands is None
+
+def test_indicator_set_forming_bar_and_state():
+    print(">>> [Test] IndicatorSet: closed bars applied once, forming bar peeked, state round-trips")
+    df = make_bars(n=200)
+    expected = df['close'].ewm(span=21, adjust=False).mean()
+
+    ind = IndicatorSet(ema21=EMA(21), rsi=RSI(14))
+    for end in (50, 51, 51, 120, 200): # growing frame, last row still forming
+        values = ind.update_frame(df.iloc[:end])
+        assert abs(values['ema21'] - expected[end - 1]) < 1e-9
+
+    restored = IndicatorSet.from_dict(json.loads(json.dumps(ind.to_dict())))
+    more = make_bars(n=260).iloc[:230]
+    assert restored.update_frame(more) == ind.update_frame(more)
+
+    # Only the new tail of the frame is read: the already-applied rows are never visited
+    ema = ind.indicators['ema21']
+    applied = []
+    update_bar = ema.update_bar
+    ema.update_bar = lambda bar: applied.append(bar.timestamp) or update_bar(bar)
+    tail = make_bars(n=260).iloc[:233]
+    tail.loc[:200, 'close'] = np.nan # would poison the EMA if re-applied
+    values = ind.update_frame(tail)
+    assert applied == list(tail['timestamp'].iloc[229:232]) and not np.isnan(values['ema21'])
+
+def test_trigger_prices():
+    print(">>> [Test] Triggers: EMA crossover and RSI level prices for the next bar")
+    df = make_bars(n=300)
+    e9, e21, rsi = EMA(9), EMA(21), RSI(14)
+    for bar in df.itertuples(index=False):
+        e9.update_bar(bar); e21.update_bar(bar); rsi.update_bar(bar)
+
+        x = crossover_price(e9, e21)
+        assert abs(e9.peek(x) - e21.peek(x)) < 1e-6
+        assert e9.peek(x + 0.01) > e21.peek(x + 0.01) and e9.peek(x - 0.01) < e21.peek(x - 0.01)
+
+        for level in (30, 70):
+            p = rsi.price_for(level)
+            if rsi.avg_gain and rsi.avg_loss:
+                assert abs(rsi.peek(p) - level) < 1e-6
+            assert rsi.peek(p + 0.01) >= level - 1e-9 and rsi.peek(p - 0.01) <= level + 1e-9
+
+if __name__ == "__main__":
+    test_match_pandas()
+    test_indicator_set_forming_bar_and_state()
+    test_trigger_prices()
@@ -0,0 +1,143 @@
+import sys
+import os
+import datetime
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from core.backtest import HistoricalStore, BacktestTokenLookup
+from core.market_simulator import MarketSimulator, SimulatedAPIError
+from core.quote_service import QuoteService
+from strategies.momentum_strategy import MomentumStrategy
+from utils import black_scholes as bs
+from utils.clock import SimulatedClock, SessionEnded
+
+NIFTY = "99926000"
+DAY = datetime.date(2026, 2, 10)
+
+def at(hour, minute, second=0):
+    return datetime.datetime.combine(DAY, datetime.time(hour, minute, second))
+
+def candles(api, token, interval, start="09:15", end="15:30"):
+    return api.getCandleData({"exchange": "NSE", "symboltoken": token, "interval": interval,
+                              "fromdate": f"{DAY} {start}", "todate": f"{DAY} {end}"})['data']
+
+def order(token, symbol, side, ordertype="MARKET", **fields):
+    return {"variety": "NORMAL", "tradingsymbol": symbol, "symboltoken": token, "transactiontype": side,
+            "exchange": "NFO", "ordertype": ordertype, "producttype": "INTRADAY", "duration": "DAY",
+            "quantity": 65, **fields}
+
+def test_one_path_behind_quotes_candles_and_premiums():
+    print(">>> [Test] Simulator: seeded path, candles up to the clock, option premiums from the index")
+    clock = SimulatedClock(at(10, 0, 30))
+    api = MarketSimulator(clock=clock, seed=7, days=2)
+    assert MarketSimulator(clock=SimulatedClock(at(10, 0, 30)), seed=7, days=2).price(NIFTY) == api.price(NIFTY)
+
+    spot = api.ltpData("NSE", "Nifty 50", NIFTY)['data']['ltp']
+    bars = candles(api, NIFTY, "ONE_MINUTE")
+    assert len(bars) == 46 and bars[-1][0].startswith(f"{DAY}T10:00") # 09:15 .. the forming 10:00 bar
+    assert bars[-1][4] == spot and bars[-2][4] == api.price(NIFTY, api.now_seconds() - 31)
+    five = candles(api, NIFTY, "FIVE_MINUTE")
+    assert five[0][1] == bars[0][1] and five[0][2] == max(b[2] for b in bars[:5]) and five[0][4] == bars[4][4]
+    assert candles(api, NIFTY, "ONE_MINUTE", end="09:59")[-1][0].startswith(f"{DAY}T09:59")
+    # History: the previous weekday is there for look-backs
+    assert len(api.getCandleData({"exchange": "NSE", "symboltoken": NIFTY, "interval": "FIFTEEN_MINUTE",
+                                  "fromdate": "2026-02-09 09:15", "todate": f"{DAY} 15:30"})['data']) == 25 + 4
+
+    token, symbol = BacktestTokenLookup(api).get_token("NIFTY", "17FEB2026", 23000, "CE")
+    premium = api.price(token)
+    vix = api.price("99926017")
+    expected = bs.price(spot, 23000, bs.time_to_expiry("17FEB2026", clock.now()), vix / 100, True)
+    assert abs(premium - float(expected)) <= 0.05
+    clock.sleep(90)
+    moved = api.getMarketData("FULL", {"NFO": [token]})['data']['fetched'][0]
+    assert moved['tradingSymbol'] == symbol and moved['opnInterest'] > 0 and moved['tradeVolume'] > 0
+    assert (moved['ltp'] > premium) == (api.price(NIFTY) > spot)
+
+    # Replayed history: the ticks pass through every stored bar's open, high, low and close
+    store = HistoricalStore()
+    store.add(NIFTY, pd.DataFrame({
+        'timestamp': pd.date_range("2025-01-06 09:15", periods=3, freq="1min"),
+        'open': [100.0, 103, 101], 'high': [104.0, 105, 102], 'low': [99.0, 100, 95], 'close': [103.0, 101, 96],
+        'volume': [60.0, 120, 180]}))
+    replay = MarketSimulator(clock=SimulatedClock(at(9, 18)), history=store)
+    assert [b[1:] for b in candles(replay, NIFTY, "ONE_MINUTE")] == [
+        [100.0, 104.0, 99.0, 103.0, 60], [103.0, 105.0, 100.0, 101.0, 120], [101.0, 102.0, 95.0, 96.0, 180]]
+
+def test_order_states_and_tick_fills():
+    print(">>> [Test] Simulator: open -> complete after the fill delay, stop-limit triggered by a tick")
+    clock = SimulatedClock(at(11, 0))
+    api = MarketSimulator(clock=clock, seed=3, days=0, fill_delay=2, slippage=0, brokerage=0)
+    token, symbol = BacktestTokenLookup(api).get_token("NIFTY", "17FEB2026", 23000, "PE")
+
+    buy = api.placeOrder(order(token, symbol, "BUY"))
+    assert api.by_id[buy]['status'] == "open"
+    clock.sleep(1)
+    assert api.by_id[buy]['status'] == "open"
+    clock.sleep(1)
+    filled = api.by_id[buy]
+    # Filled at the tick after the delay, one tick of slippage at the least
+    assert filled['status'] == "complete" and filled['averageprice'] == round(api.price(token) + 0.05, 2)
+
+    # Sell stop-limit below the market: triggers on the first tick at or under the trigger
+    entry = filled['averageprice']
+    stop = api.placeOrder(order(token, symbol, "SELL", "STOPLOSS_LIMIT", triggerprice=entry - 1, price=entry - 30))
+    assert api.orderBook()['data'][-1]['status'] == "trigger pending"
+    limit = api.placeOrder(order(token, symbol, "BUY", "LIMIT", price=0.05))
+    assert api.modifyOrder({"orderid": limit, "price": 0.10}) == limit
+    assert api.cancelOrder(limit, "NORMAL") == limit and api.by_id[limit]['status'] == "cancelled"
+    assert api.cancelOrder(limit, "NORMAL") is None
+
+    start = api.now_seconds()
+    clock.sleep(4 * 3600)
+    ts, premiums, _ = api.window(token, start + 1, api.now_seconds() + 1)
+    first = int(np.flatnonzero(premiums <= entry - 1)[0])
+    assert api.by_id[stop]['status'] == "complete" and api.by_id[stop]['averageprice'] == round(max(premiums[first] - 0.05, entry - 30), 2)
+    trade = api.trades[-1]
+    assert trade['exit_time'] == datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=int(ts[first]))
+
+def test_injected_faults():
+    print(">>> [Test] Simulator: scripted and random errors, rate-limit rejections, latency")
+    clock = SimulatedClock(at(9, 30))
+    api = MarketSimulator(clock=clock, seed=1, days=0, latency=0.25, rate_limits={"orderbook": (2, 2)})
+    api.fail_next("ltpData")
+    assert api.ltpData("NSE", "Nifty 50", NIFTY)['status'] is False
+    assert api.ltpData("NSE", "Nifty 50", NIFTY)['status'] is True
+    api.fail_next("placeOrder")
+    assert api.placeOrder(order(NIFTY, "Nifty 50", "BUY")) is None
+    assert clock.now() == at(9, 30) + datetime.timedelta(seconds=0.75) # 0.25s per call
+
+    api.orderBook(); api.orderBook()
+    try:
+        api.orderBook()
+        assert False, "a third order-book call inside one second must be rejected"
+    except SimulatedAPIError:
+        pass
+    clock.sleep(1)
+    assert api.orderBook()['status'] is True
+    assert [f[2] for f in api.fault_log] == ["error", "error", "rate limit"]
+
+    flaky = MarketSimulator(clock=SimulatedClock(at(9, 30)), seed=1, days=0, error_rate=0.3)
+    failed = sum(not flaky.rmsLimit()['status'] for _ in range(1000))
+    assert 230 < failed < 370
+
+def test_momentum_session_on_simulated_market():
+    print(">>> [Test] Simulator: a Momentum session trades options end to end")
+    clock = SimulatedClock(at(9, 20), deadline=at(15, 20))
+    api = MarketSimulator(clock=clock, seed=4)
+    with tempfile.TemporaryDirectory() as state_dir:
+        strategy = MomentumStrategy(api, BacktestTokenLookup(api), quotes=QuoteService(api, clock=clock), clock=clock)
+        strategy.STATE_FILE = os.path.join(state_dir, "trade_state.json")
+        try:
+            strategy.execute(expiry="17FEB2026")
+        except SessionEnded:
+            pass
+    assert api.trades and all(o['status'] == "complete" for o in api.orders)
+    assert {o['tradingsymbol'][-2:] for o in api.orders} <= {"CE", "PE"}
+
+if __name__ == "__main__":
+    test_one_path_behind_quotes_candles_and_premiums()
+    test_order_states_and_tick_fills()
+    test_injected_faults()
+    test_momentum_session_on_simulated_market()
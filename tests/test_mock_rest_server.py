@@ -0,0 +1,85 @@
+import sys
+import os
+import datetime
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from SmartApi import SmartConnect
+from SmartApi.smartExceptions import DataException
+from core.backtest import BacktestTokenLookup
+from core.market_simulator import MarketSimulator
+from core.mock_rest_server import MockRestServer
+from utils.clock import SimulatedClock
+
+NIFTY = "99926000"
+
+def start_server(**kwargs):
+    market = MarketSimulator(clock=SimulatedClock(datetime.datetime(2026, 2, 10, 10, 30)), seed=2, days=1)
+    return MockRestServer(market, **kwargs).start(), market
+
+def test_unmodified_client_round_trip():
+    print(">>> [Test] REST stand-in: SmartConnect login, quotes, candles and orders over HTTP")
+    server, market = start_server()
+    try:
+        api = server.session(client_code="A123")
+        assert api.userId == "A123" and api.access_token and api.feed_token
+
+        assert api.ltpData("NSE", "Nifty 50", NIFTY)['data']['ltp'] == market.price(NIFTY)
+        bars = api.getCandleData({"exchange": "NSE", "symboltoken": NIFTY, "interval": "FIFTEEN_MINUTE",
+                                  "fromdate": "2026-02-10 09:15", "todate": "2026-02-10 15:30"})['data']
+        assert [b[0][11:16] for b in bars] == ["09:15", "09:30", "09:45", "10:00", "10:15", "10:30"]
+
+        token, symbol = BacktestTokenLookup(market).get_token("NIFTY", "17FEB2026", 23000, "CE")
+        quote = api.getMarketData("FULL", {"NFO": [token]})['data']['fetched'][0]
+        assert quote['tradingSymbol'] == symbol and quote['opnInterest'] > 0
+
+        params = {"variety": "NORMAL", "tradingsymbol": symbol, "symboltoken": token, "transactiontype": "BUY",
+                  "exchange": "NFO", "producttype": "INTRADAY", "duration": "DAY", "quantity": 65}
+        buy = api.placeOrder({**params, "ordertype": "MARKET"})
+        limit = api.placeOrder({**params, "ordertype": "LIMIT", "price": 0.05})
+        book = {o['orderid']: o for o in api.orderBook()['data']}
+        assert book[buy]['status'] == "complete" and book[limit]['status'] == "open"
+        assert api.cancelOrder(limit, "NORMAL")['data']['orderid'] == limit
+        assert api.cancelOrder(limit, "NORMAL")['status'] is False
+        assert float(api.rmsLimit()['data']['net']) < 500000
+
+        # Without the session's JWT the secure routes refuse
+        anonymous = SmartConnect(api_key="mock_api_key", root=server.url)
+        assert anonymous.rmsLimit()['errorcode'] == "AG8001"
+    finally:
+        server.stop()
+
+def test_latency_throttling_and_connection_reuse():
+    print(">>> [Test] REST stand-in: per-endpoint latency, 403 throttling, connections per client")
+    server, _ = start_server(latency={"rms": 0.05}, limits={"quote": (3, 3)})
+    try:
+        api = server.session()
+        before = server.metrics()['connections']
+        for _ in range(3):
+            api.ltpData("NSE", "Nifty 50", NIFTY)
+        try:
+            api.ltpData("NSE", "Nifty 50", NIFTY)
+            assert False, "the fourth quote inside one second must be throttled"
+        except DataException as e:
+            assert "exceeding access rate" in str(e)
+        assert server.metrics()['throttled'] == {"ltpData": 1}
+        # The stock client opens a connection per request
+        assert server.metrics()['connections'] - before == 4
+
+        started = datetime.datetime.now()
+        api.rmsLimit()
+        assert (datetime.datetime.now() - started).total_seconds() >= 0.05
+
+        # The same client over one pooled session: a single keep-alive connection
+        with requests.Session() as pooled, mock.patch.object(requests, "request", pooled.request):
+            before = server.metrics()['connections']
+            for _ in range(5):
+                assert api.orderBook()['status'] is True
+            assert server.metrics()['connections'] - before == 1
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    test_unmodified_client_round_trip()
+    test_latency_throttling_and_connection_reuse()
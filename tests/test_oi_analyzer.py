@@ -61,5 +61,71 @@ def test_on_real_market():
     except Exception as e:
         print(f">>> [Error] {e}")
 
+def test_concurrent_scan_mock():
+    print(">>> [Test] OIAnalyzer: +/- 5 strike scan against the mock")
+    import time
+    from core.mock_connect import MockSmartConnect
+    from core.rate_limiter import RateLimitedAPI
+    from utils.option_chain import OptionChain
+
+    class SlowMock(MockSmartConnect):
+        # Network-like latency; candles carry OI at index 6
+        def getMarketData(self, mode, exchangeTokens):
+            time.sleep(0.05)
+            resp = super().getMarketData(mode, exchangeTokens)
+            # The batch misses one token -> candle fallback
+            resp['data']['fetched'] = [q for q in resp['data']['fetched'] if q['symbolToken'] != "10CE"]
+            return resp
+
+        def getCandleData(self, params):
+            time.sleep(0.05)
+            return {"status": True, "data": [["2026-01-20T00:00:00+05:30", 1, 1, 1, 1, 10, 7000]]}
+
+    class ChainLoader:
+        def get_option_chain(self, name, expiry):
+            strikes = list(range(22500, 23550, 50))
+            return OptionChain(name, expiry, strikes,
+                               [(f"{i}CE", f"NIFTY{s}CE") for i, s in enumerate(strikes)],
+                               [(f"{i}PE", f"NIFTY{s}PE") for i, s in enumerate(strikes)])
+
+    analyzer = OIAnalyzer(RateLimitedAPI(SlowMock()), ChainLoader())
+    result = analyzer.scan_chain("27JAN2026", 23000, width=5)
+
+    assert [r['strike'] for r in result['rows']] == list(range(22750, 23300, 50))
+    assert result['elapsed'] < 1.0
+    assert result['rows'][5]['ce_oi'] == 7000 # ATM CE came from the candle fallback
+    assert result['ce_total'] > 0 and result['pe_total'] > 0
+    assert result['pcr'] == round(result['pe_total'] / result['ce_total'], 2)
+
+def test_chain_snapshot_cache():
+    print(">>> [Test] ChainSnapshotCache: TTL hits, background refresh, OI change")
+    import time
+    from core.oi_analyzer import ChainSnapshotCache
+
+    scans = []
+    def scan():
+        scans.append(1)
+        oi = 1000 * len(scans)
+        return {'rows': [{'strike': 23000, 'ce_oi': oi, 'pe_oi': 2 * oi}], 'pcr': 2.0}
+
+    cache = ChainSnapshotCache(ttl=0.1, max_stale=10)
+    key = ("27JAN2026", 23000, 2)
+    first = cache.get(key, scan)
+    assert cache.get(key, scan) is first and len(scans) == 1 # within TTL
+    assert first['rows'][0]['ce_oi_chg'] == 0
+
+    time.sleep(0.15)
+    assert cache.get(key, scan) is first # stale snapshot served immediately...
+    for _ in range(50):
+        if cache.previous(key) is first: break
+        time.sleep(0.01)
+    assert len(scans) == 2 # ...while one background refresh ran
+
+    latest = cache.get(key, scan)
+    assert latest['rows'][0]['ce_oi_chg'] == 1000
+    assert latest['rows'][0]['pe_oi_chg'] == 2000
+
 if __name__ == "__main__":
     test_on_real_market()
+    test_concurrent_scan_mock()
+    test_chain_snapshot_cache()
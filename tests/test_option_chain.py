@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.option_chain import OptionChain
+
+def build_chain():
+    # 22900 .. 23200 every 50, with 23050 missing (not listed) and 23200 CE-only
+    index = {}
+    for strike in (22900, 22950, 23000, 23100, 23150, 23200):
+        for opt in ("CE", "PE"):
+            if strike == 23200 and opt == "PE": continue
+            index[("NIFTY", "20JAN2026", float(strike), opt)] = (f"T{strike}{opt}", f"NIFTY20JAN26{strike}{opt}")
+    # Other expiry / underlying must be ignored
+    index[("NIFTY", "27JAN2026", 23000.0, "CE")] = ("X", "X")
+    index[("BANKNIFTY", "20JAN2026", 23000.0, "CE")] = ("Y", "Y")
+    return OptionChain.from_index(index, "NIFTY", "20JAN2026")
+
+def test_nearest_atm():
+    print(">>> [Test] OptionChain: nearest listed strike")
+    chain = build_chain()
+    assert chain.strikes == [22900, 22950, 23000, 23100, 23150, 23200]
+    assert chain.nearest_atm(23010) == 23000
+    assert chain.nearest_atm(23060) == 23100 # 23050 not listed -> closest listed
+    assert chain.nearest_atm(23050) == 23000 # tie -> lower strike
+    assert chain.nearest_atm(10000) == 22900
+    assert chain.nearest_atm(99999) == 23200
+    assert OptionChain("NIFTY", "X", [], [], []).nearest_atm(23000) is None
+
+def test_strikes_around_and_contracts():
+    print(">>> [Test] OptionChain: neighbours, ITM/OTM, missing legs")
+    chain = build_chain()
+
+    rows = chain.strikes_around(23010, 1)
+    assert [r[0] for r in rows] == [22950, 23000, 23100]
+    assert rows[1][1] == ("T23000CE", "NIFTY20JAN2623000CE")
+    assert rows[1][2] == ("T23000PE", "NIFTY20JAN2623000PE")
+
+    # Clipped at the edges of the chain
+    assert [r[0] for r in chain.strikes_around(22900, 2)] == [22900, 22950, 23000]
+    assert chain.strikes_around(23200, 1)[-1][2] == (None, None) # PE not listed
+
+    assert chain.itm(23010, "CE", 1) == (22950, "T22950CE", "NIFTY20JAN2622950CE")
+    assert chain.itm(23010, "PE", 1)[0] == 23100
+    assert chain.otm(23010, "CE", 2)[0] == 23150
+    assert chain.otm(23010, "PE", 5)[0] == 22900 # clamped
+
+    assert chain.contract(23000, "PE") == ("T23000PE", "NIFTY20JAN2623000PE")
+    assert chain.contract(23050, "CE") == (None, None)
+
+if __name__ == "__main__":
+    test_nearest_atm()
+    test_strikes_around_and_contracts()
@@ -0,0 +1,100 @@
+import sys
+import os
+import time
+import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.backtest import BacktestTokenLookup
+from core.market_simulator import MarketSimulator
+from core.mock_order_feed_server import MockOrderFeedServer
+from core.order_feed import OrderFeed
+from core.order_service import OrderService
+from utils.clock import SimulatedClock
+
+def at(hour, minute, second=0):
+    return datetime.datetime(2026, 2, 10, hour, minute, second)
+
+class StaleBookAPI:
+    """An order book that lags behind the pushed updates"""
+    def orderBook(self):
+        return {"status": True, "data": [
+            {"orderid": "7", "tradingsymbol": "NIFTYCE", "status": "trigger pending", "averageprice": 0}]}
+
+def test_state_machine_transitions():
+    print(">>> [Test] OrderFeed: trigger / fill / reject events, finished orders never move back")
+    clock = SimulatedClock(at(10, 0))
+    orders = OrderService(StaleBookAPI(), clock=clock)
+    events = []
+    orders.add_listener(lambda event, order: events.append((event, order['orderid'])))
+
+    assert orders.status("7") == "trigger pending" and events == []
+    seen = orders.sequence
+    stop = {"orderid": "7", "tradingsymbol": "NIFTYCE", "status": "trigger pending", "averageprice": 0}
+    assert orders.update({**stop, "status": "open"})
+    assert orders.update({**stop, "status": "complete", "averageprice": 130.5})
+    assert events == [("trigger", "7"), ("fill", "7")]
+    # Updates applied after 'seen' was read end a later wait at once
+    assert orders.wait_for_update(0, since=seen) and not orders.wait_for_update(0.01, since=orders.sequence)
+
+    # A late pushed update and the lagging order book both lose against the fill
+    assert not orders.update({**stop, "status": "open"})
+    clock.sleep(5)
+    orders.refresh()
+    assert orders.fill_price("7") == 130.5 and orders.wait_for_fill("7", timeout=0) == 130.5
+
+    orders.update({"orderid": "8", "tradingsymbol": "NIFTYPE", "status": "rejected", "averageprice": 0})
+    assert events[-1] == ("reject", "8") and orders.wait_for_fill("8") is None
+    feed = OrderFeed("Bearer x", "key", "client", "feed")
+    assert feed.parse(OrderFeed.message(None)) is None
+    # Nothing to subscribe to: TickFeed's subscription calls are accepted and ignored
+    feed.subscribe("NFO", ["43121"])
+    feed.resubscribe()
+    assert feed.subscriptions == {}
+
+def test_pushed_updates_from_stand_in():
+    print(">>> [Test] OrderFeed: simulator order updates pushed over the websocket, no order-book polling")
+    clock = SimulatedClock(at(11, 0))
+    market = MarketSimulator(clock=clock, seed=3, days=0, slippage=0, brokerage=0)
+    server = MockOrderFeedServer(market, interval=0).start() # the simulated clock drives matching
+    orders = OrderService(market, clock=clock)
+    feed = OrderFeed("Bearer x", "key", "client", "feed", url=server.url, orders=orders, max_backoff=0.2)
+    heard = {}
+    orders.add_listener(lambda event, order: heard.setdefault((event, order['orderid']), time.perf_counter()))
+    try:
+        assert feed.start().wait_connected(3)
+        assert orders.current() and orders.round_trips == 1
+
+        token, symbol = BacktestTokenLookup(market).get_token("NIFTY", "17FEB2026", 23000, "PE")
+        entry = market.price(token)
+        params = {"variety": "STOPLOSS", "tradingsymbol": symbol, "symboltoken": token, "transactiontype": "SELL",
+                  "exchange": "NFO", "ordertype": "STOPLOSS_LIMIT", "producttype": "INTRADAY", "duration": "DAY",
+                  "quantity": 65, "triggerprice": entry - 1, "price": entry - 30}
+        stop = market.placeOrder(params)
+        deadline = time.time() + 2
+        while orders.by_id.get(stop, {}).get('status') != "trigger pending" and time.time() < deadline:
+            orders.wait_for_update(0.1)
+        assert orders.status(stop) == "trigger pending"
+
+        # The stop triggers and fills somewhere in the next four simulated hours
+        started = time.perf_counter()
+        clock.sleep(4 * 3600)
+        fill = orders.wait_for_fill(stop, timeout=2)
+        assert fill == market.by_id[stop]['averageprice']
+        assert ("trigger", stop) in heard and heard[("fill", stop)] - started < 0.5
+
+        ce_token, ce_symbol = BacktestTokenLookup(market).get_token("NIFTY", "17FEB2026", 23000, "CE")
+        refused = market.placeOrder({**params, "tradingsymbol": ce_symbol, "symboltoken": ce_token, "variety": "NORMAL",
+                                     "ordertype": "MARKET", "transactiontype": "BUY", "quantity": 10 ** 7})
+        deadline = time.time() + 2
+        while ("reject", refused) not in heard and time.time() < deadline:
+            orders.wait_for_update(0.1)
+        assert orders.wait_for_fill(refused) is None
+        # Everything arrived on the stream
+        assert orders.round_trips == 1
+    finally:
+        feed.stop()
+        server.stop()
+
+if __name__ == "__main__":
+    test_state_machine_transitions()
+    test_pushed_updates_from_stand_in()
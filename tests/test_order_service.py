@@ -0,0 +1,103 @@
+import sys
+import os
+import datetime
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.order_service import OrderService
+from core.safety_checks import SafetyGatekeeper
+from strategies.nifty_straddle import NiftyStrategy
+from utils.clock import SimulatedClock
+
+class FakeOrderAPI:
+    def __init__(self):
+        self.calls = 0
+        self.book = [
+            {"orderid": "1", "tradingsymbol": "NIFTYCE", "status": "complete", "averageprice": "101.5"},
+            {"orderid": "2", "tradingsymbol": "NIFTYPE", "status": "open", "averageprice": "0"},
+            {"orderid": "3", "tradingsymbol": "NIFTYCE", "status": "trigger pending", "averageprice": "0"},
+        ]
+
+    def orderBook(self):
+        self.calls += 1
+        return {"status": True, "data": [dict(o) for o in self.book]}
+
+def test_queries_share_one_request_per_interval():
+    print(">>> [Test] OrderService: status, fills and open orders from one order-book request")
+    clock = SimulatedClock(datetime.datetime(2026, 2, 10, 9, 20))
+    api = FakeOrderAPI()
+    orders = OrderService(api, max_age=1.0, clock=clock)
+
+    assert orders.status("1") == "complete" and orders.fill_price("1") == 101.5
+    assert orders.status("2") == "open" and orders.fill_price("2") is None
+    assert orders.status("9") == "unknown"
+    assert [o['orderid'] for o in orders.open_orders("NIFTYPE")] == ["2"]
+    assert orders.open_orders("NIFTYCE") == []
+    assert api.calls == 1
+
+    # Older than max_age: the next query refreshes once for everyone
+    api.book[1]['status'], api.book[1]['averageprice'] = "complete", "98.0"
+    clock.sleep(2)
+    assert orders.fill_price("2") == 98.0 and orders.open_orders("NIFTYPE") == []
+    assert api.calls == 2
+
+    # A failed refresh keeps serving the last snapshot; no snapshot at all fails closed
+    api.orderBook = lambda: {"status": False, "message": "Access denied", "data": None}
+    clock.sleep(2)
+    assert orders.status("2") == "complete"
+    assert SafetyGatekeeper(api, quotes=object(), clock=clock).check_no_open_orders("NIFTYPE") is False
+
+def test_straddle_waits_do_not_multiply_requests():
+    print(">>> [Test] OrderService: straddle fill waits and SL status checks share the snapshot")
+    clock = SimulatedClock(datetime.datetime(2026, 2, 10, 9, 20))
+    api = FakeOrderAPI()
+    strategy = NiftyStrategy(api, None, quotes=object(), clock=clock)
+    assert strategy.gatekeeper.orders is strategy.orders
+
+    assert strategy.orders.wait_for_fill("1") == 101.5
+    assert strategy.get_order_status("2") == "open" and strategy.get_order_status("3") == "trigger pending"
+    assert strategy.gatekeeper.check_no_open_orders("NIFTYCE") is True
+    assert strategy.gatekeeper.check_no_open_orders("NIFTYPE") is False
+    assert api.calls == 1
+
+class SlowBookAPI(FakeOrderAPI):
+    """An order book that answers only once 'release' is set (a rate-limiter wait)"""
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.asked = threading.Event()
+
+    def orderBook(self):
+        self.asked.set()
+        self.release.wait(5)
+        return super().orderBook()
+
+def test_slow_order_book_does_not_block_updates():
+    print(">>> [Test] OrderService: pushed updates and listeners are not held up by an order-book request")
+    api = SlowBookAPI()
+    orders = OrderService(api)
+    in_listener = []
+
+    def listener(event, order):
+        # Another thread must be able to apply an update while a listener runs
+        other = threading.Thread(target=orders.update, args=({**order, "orderid": "9" + order['orderid'], "status": "open"},))
+        other.start()
+        other.join(1)
+        in_listener.append((event, order['orderid'], not other.is_alive()))
+    orders.add_listener(listener)
+
+    poll = threading.Thread(target=orders.refresh)
+    poll.start()
+    assert api.asked.wait(2)
+    # The request is in flight; a pushed fill still goes straight in
+    assert orders.update({"orderid": "5", "tradingsymbol": "NIFTYCE", "status": "complete", "averageprice": "88.0"})
+    assert orders.by_id["5"]['status'] == "complete" and poll.is_alive()
+    api.release.set()
+    poll.join(2)
+    assert not poll.is_alive() and orders.fetched_at is not None
+    assert ("fill", "5", True) in in_listener and ("fill", "1", True) in in_listener
+
+if __name__ == "__main__":
+    test_queries_share_one_request_per_interval()
+    test_straddle_waits_do_not_multiply_requests()
+    test_slow_order_book_does_not_block_updates()
@@ -0,0 +1,114 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.quote_service import QuoteService
+from core.rate_limiter import RateLimitExceeded
+
+class FakeQuoteAPI:
+    def __init__(self, batch_ok=True):
+        self.batch_ok = batch_ok
+        self.calls = []
+        self.prices = {"99926000": 23010.5, "99926017": 14.2, "111": 120.0, "222": 95.5}
+
+    def getMarketData(self, mode, exchangeTokens):
+        self.calls.append(("getMarketData", mode, {k: list(v) for k, v in exchangeTokens.items()}))
+        if not self.batch_ok:
+            return {"status": False, "message": "Access denied", "data": None}
+        fetched = [
+            {"exchange": ex, "tradingSymbol": t, "symbolToken": t, "ltp": self.prices[t]}
+            for ex, tokens in exchangeTokens.items() for t in tokens
+        ]
+        return {"status": True, "data": {"fetched": fetched, "unfetched": []}}
+
+    def ltpData(self, exchange, symbol, token):
+        self.calls.append(("ltpData", exchange, token))
+        return {"status": True, "data": {"ltp": self.prices[token]}}
+
+def test_one_request_per_cycle():
+    print(">>> [Test] QuoteService: index, VIX and legs refreshed in one request")
+    api = FakeQuoteAPI()
+    quotes = QuoteService(api, max_age=60)
+    quotes.watch("NSE", "99926000", "Nifty 50")
+    quotes.watch("NSE", "99926017", "INDIA VIX")
+    quotes.watch("NFO", "111", "NIFTY_CE")
+    quotes.watch("NFO", "222", "NIFTY_PE")
+
+    assert quotes.get_ltp("99926000", "NSE") == 23010.5
+    assert quotes.get_ltp("99926017", "NSE") == 14.2
+    assert quotes.get_ltp("111") == 120.0
+    assert quotes.get_ltp("222") == 95.5
+
+    assert len(api.calls) == 1
+    _, mode, exchange_tokens = api.calls[0]
+    assert mode == "LTP"
+    assert exchange_tokens == {"NSE": ["99926000", "99926017"], "NFO": ["111", "222"]}
+
+    # Stale snapshot -> one more batched request
+    quotes.get_ltp("111", max_age=0)
+    assert len(api.calls) == 2
+
+def test_fallback_to_ltp():
+    print(">>> [Test] QuoteService: falls back to per-token ltpData")
+    api = FakeQuoteAPI(batch_ok=False)
+    quotes = QuoteService(api, max_age=60)
+    quotes.watch("NFO", "111", "NIFTY_CE")
+    assert quotes.get_ltp("99926000", "NSE", "Nifty 50") == 23010.5
+    assert [c[0] for c in api.calls] == ["getMarketData", "ltpData", "ltpData"]
+
+class SlowQuoteAPI(FakeQuoteAPI):
+    """getMarketData that answers only once 'release' is set (a rate-limiter wait)"""
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def getMarketData(self, mode, exchangeTokens):
+        self.release.wait(5)
+        return super().getMarketData(mode, exchangeTokens)
+
+def test_no_fallback_when_throttled():
+    print(">>> [Test] QuoteService: a rate-limited batch keeps the snapshot, no per-token calls")
+    for refusal in (RateLimitExceeded("marketdata: wait 3.0s exceeds max_wait 2.0s"),
+                    Exception("Access denied because of exceeding access rate")):
+        api = FakeQuoteAPI()
+        quotes = QuoteService(api, max_age=60)
+        assert quotes.get_ltp("111", symbol="NIFTY_CE") == 120.0
+
+        def refuse(mode, exchangeTokens, refusal=refusal):
+            api.calls.append(("getMarketData", mode, exchangeTokens))
+            raise refusal
+        api.getMarketData = refuse
+        assert quotes.get_ltp("111", max_age=0) == 120.0
+        assert [c[0] for c in api.calls] == ["getMarketData", "getMarketData"]
+
+def test_ticks_not_held_up_by_refresh():
+    print(">>> [Test] QuoteService: ticks apply during a slow refresh; concurrent readers share it")
+    api = SlowQuoteAPI()
+    quotes = QuoteService(api, max_age=0)
+    quotes.watch("NFO", "111", "NIFTY_CE")
+    readers = [threading.Thread(target=quotes.get_ltp, args=("111",)) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    time.sleep(0.1)
+    # A token the in-flight request did not ask for gets a request of its own afterwards
+    late = {}
+    readers.append(threading.Thread(target=lambda: late.setdefault("222", quotes.get_ltp("222", symbol="NIFTY_PE"))))
+    readers[-1].start()
+
+    # The request is in flight; a streamed tick still goes straight into the snapshot
+    started = time.perf_counter()
+    quotes.update("222", 96.0, time.time())
+    assert time.perf_counter() - started < 0.5 and quotes.snapshot["222"][0] == 96.0
+    api.release.set()
+    for reader in readers:
+        reader.join(2)
+    assert not any(reader.is_alive() for reader in readers)
+    assert len(api.calls) == 2 and quotes.snapshot["111"][0] == 120.0 and late["222"] == 95.5
+
+if __name__ == "__main__":
+    test_one_request_per_cycle()
+    test_fallback_to_ltp()
+    test_no_fallback_when_throttled()
+    test_ticks_not_held_up_by_refresh()
@@ -0,0 +1,68 @@
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.rate_limiter import TokenBucket, RateLimiter, RateLimitedAPI, RateLimitExceeded
+
+def test_bucket_burst_then_throttle():
+    print(">>> [Test] TokenBucket: burst is free, then calls are spaced at 1/rate")
+    bucket = TokenBucket("quote", rate=50, capacity=3)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    # 3 from the burst, 3 more at 50/s -> ~60ms
+    assert 0.05 <= elapsed < 0.5
+    m = bucket.metrics()
+    assert m['used'] == 6 and m['waited'] == 3 and m['rejected'] == 0
+
+def test_bucket_rejects_long_waits():
+    print(">>> [Test] TokenBucket: waits longer than max_wait are rejected")
+    bucket = TokenBucket("orderbook", rate=1, capacity=1)
+    bucket.acquire(max_wait=0.1)
+    try:
+        bucket.acquire(max_wait=0.1)
+        assert False, "Expected RateLimitExceeded"
+    except RateLimitExceeded:
+        pass
+    assert bucket.metrics()['rejected'] == 1
+
+def test_concurrent_callers_share_budget():
+    print(">>> [Test] TokenBucket: threads queue behind one budget")
+    bucket = TokenBucket("historical", rate=100, capacity=1)
+    start = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)]) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    # 20 calls, 1 free -> at least 19 / 100 s
+    assert time.monotonic() - start >= 0.18
+    assert bucket.metrics()['used'] == 20
+
+def test_api_wrapper_routes_endpoints():
+    print(">>> [Test] RateLimitedAPI: calls charged to their endpoint class")
+    class FakeAPI:
+        api_key = None
+        def ltpData(self, exchange, symbol, token): return {"status": True}
+        def rmsLimit(self): return {"status": True}
+        def getProfile(self, token): return {"status": True}
+
+    limiter = RateLimiter(limits={"quote": (100, 10), "rms": (100, 10)}, max_wait=1)
+    api = RateLimitedAPI(FakeAPI(), limiter)
+    api.ltpData("NSE", "Nifty 50", "99926000")
+    api.ltpData("NSE", "Nifty 50", "99926000")
+    api.rmsLimit()
+    api.getProfile("x") # not rate limited
+    assert api.api_key is None
+
+    m = limiter.metrics()
+    assert m['quote']['used'] == 2
+    assert m['rms']['used'] == 1
+
+if __name__ == "__main__":
+    test_bucket_burst_then_throttle()
+    test_bucket_rejects_long_waits()
+    test_concurrent_callers_share_budget()
+    test_api_wrapper_routes_endpoints()
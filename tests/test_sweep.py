@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from core.backtest import HistoricalStore
+from core.sweep import ParameterSweep, SharedBars, parameter_grid, config_overrides
+from strategies.momentum_strategy import MomentumStrategy
+
+NIFTY = "99926000"
+
+def history(days, seed=5):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for day in days:
+        close = 22000 + np.cumsum(rng.normal(0, 5, 375))
+        opens = np.r_[close[0], close[:-1]]
+        frames.append(pd.DataFrame({
+            'timestamp': pd.date_range(f"{day} 09:15", periods=375, freq="1min"),
+            'open': opens, 'high': np.maximum(opens, close) + 1, 'low': np.minimum(opens, close) - 1,
+            'close': close, 'volume': np.full(375, 100.0),
+        }))
+    store = HistoricalStore()
+    store.add(NIFTY, pd.concat(frames))
+    return store
+
+class QuoteStub:
+    def __init__(self, ltp):
+        self.ltp = ltp
+
+    def get_ltp(self, token, exchange="NFO", symbol=None):
+        return self.ltp
+
+def test_grid_and_overrides():
+    print(">>> [Test] Sweep: parameter grid, Config overrides restored, trail ladder follows Config")
+    combos = parameter_grid({"MOMENTUM_EMA_FAST": [5, 9], "TSL_TRAIL": [0.1, 0.2, 0.3]})
+    assert len(combos) == 6 and combos[0] == {"MOMENTUM_EMA_FAST": 5, "TSL_TRAIL": 0.1}
+
+    strategy = MomentumStrategy.__new__(MomentumStrategy)
+    strategy.quotes = QuoteStub(115.0)
+    strategy.save_state = lambda: None
+    with config_overrides({"MOMENTUM_TRAIL_STEPS": ((10, 2), (30, 20))}):
+        strategy.active_position = {'token': "1", 'symbol': "X", 'entry_price': 100.0, 'sl_price': 0.0}
+        strategy.check_trailing_stop()
+        assert strategy.active_position['sl_price'] == 102.0
+    assert Config.MOMENTUM_TRAIL_STEPS == ((20, 5), (40, 25), (60, 45))
+    # Default ladder: +15 is below the first step
+    strategy.active_position = {'token': "1", 'symbol': "X", 'entry_price': 100.0, 'sl_price': 0.0}
+    strategy.check_trailing_stop()
+    assert strategy.active_position['sl_price'] == 0.0
+
+    try:
+        with config_overrides({"NOT_A_PARAMETER": 1}): pass
+        assert False, "unknown parameters must be rejected"
+    except ValueError:
+        pass
+
+def test_shared_bars_round_trip():
+    print(">>> [Test] Sweep: bars placed in shared memory read back unchanged")
+    store = history(["2025-01-06", "2025-01-07"])
+    with SharedBars(store) as shared:
+        attached, blocks = SharedBars.attach(shared.layout)
+        ts, ohlcv = attached.series[NIFTY]
+        assert np.array_equal(ts, store.series[NIFTY][0]) and np.array_equal(ohlcv, store.series[NIFTY][1])
+        assert attached.sessions() == store.sessions()
+        del ts, ohlcv, attached
+        for block in blocks: block.close()
+
+def test_sweep_ranks_and_walks_forward():
+    print(">>> [Test] Sweep: ranked table over a process pool, walk-forward folds")
+    store = history(["2025-01-06", "2025-01-07", "2025-01-08"])
+    sweep = ParameterSweep(store, MomentumStrategy, {"MOMENTUM_EMA_FAST": [5, 9]}, workers=2)
+    assert [(len(i), len(o)) for i, o in sweep.folds(2, 1)] == [(2, 1)]
+
+    table = sweep.run(end=store.sessions()[0])
+    assert list(table['rank']) == [1, 2] and sorted(table['MOMENTUM_EMA_FAST']) == [5, 9]
+    assert table['net_pnl'].is_monotonic_decreasing and (table['sessions'] == 1).all()
+
+    report = sweep.walk_forward(1, 1, step=2)
+    assert len(report) == 1 and report.loc[0, 'oos_start'] == store.sessions()[1]
+    assert report.loc[0, 'MOMENTUM_EMA_FAST'] in (5, 9)
+
+if __name__ == "__main__":
+    test_grid_and_overrides()
+    test_shared_bars_round_trip()
+    test_sweep_ranks_and_walks_forward()
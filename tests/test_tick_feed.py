@@ -0,0 +1,73 @@
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ssl
+from config.settings import Config
+from core.tick_feed import TickFeed
+from core.mock_feed_server import MockFeedServer
+from core.quote_service import QuoteService
+
+class NoRestAPI:
+    """Quotes must come from the stream only"""
+    def getMarketData(self, mode, exchangeTokens):
+        raise AssertionError("REST quote called while streaming")
+
+def test_packet_roundtrip():
+    print(">>> [Test] TickFeed: LTP packet encode/decode")
+    packet = TickFeed.pack_ltp(2, "43121", 123.45, sequence=7, exchange_ts=1700000000000)
+    assert len(packet) == 51
+    assert TickFeed.parse_ltp(packet) == (2, "43121", 1700000000000, 123.45)
+
+def test_stream_reaction_and_reconnect():
+    print(">>> [Test] TickFeed: sub-100ms reaction, reconnect + resubscribe")
+    server = MockFeedServer(interval=0).start() # ticks only on push()
+    quotes = QuoteService(NoRestAPI())
+    quotes.watch("NSE", "99926000", "Nifty 50")
+    feed = TickFeed("Bearer x", "key", "client", "feed", url=server.url, quotes=quotes, max_backoff=0.2)
+    ticks = feed.queue()
+    try:
+        assert feed.start().wait_connected(3)
+        quotes.watch("NFO", "43121", "NIFTY_CE") # subscribed on the live connection
+        time.sleep(0.1)
+
+        start = time.time()
+        server.push("43121", 101.5)
+        tick = ticks.get(timeout=1)
+        assert time.time() - start < 0.1
+        assert tick['token'] == "43121" and tick['exchange'] == "NFO" and tick['ltp'] == 101.5
+        assert quotes.is_streaming()
+        assert quotes.get_ltp("43121") == 101.5 # from the snapshot, no REST call
+
+        # Network drop: the client reconnects and re-sends both subscriptions
+        server.drop_connections()
+        time.sleep(0.1)
+        assert feed.wait_connected(3)
+        time.sleep(0.1)
+        server.push("99926000", 23050.0)
+        server.push("43121", 99.0)
+        received = {ticks.get(timeout=1)['token'] for _ in range(2)}
+        assert received == {"99926000", "43121"}
+        assert feed.reconnects >= 1
+        assert quotes.get_ltp("99926000", "NSE") == 23050.0
+    finally:
+        feed.stop()
+        server.stop()
+
+def test_tls_verified_unless_opted_out():
+    print(">>> [Test] TickFeed: wss certificates verified by default, CERT_NONE only on explicit opt-in")
+    feed = TickFeed("Bearer x", "key", "client", "feed", url="wss://smartapisocket.angelone.in/smart-stream")
+    assert feed.ssl_options() is None
+    original = Config.TICK_FEED_INSECURE_TLS
+    try:
+        Config.TICK_FEED_INSECURE_TLS = True
+        assert feed.ssl_options() == {"cert_reqs": ssl.CERT_NONE}
+        assert TickFeed("Bearer x", "key", "client", "feed", url="ws://127.0.0.1:9/feed").ssl_options() is None
+    finally:
+        Config.TICK_FEED_INSECURE_TLS = original
+
+if __name__ == "__main__":
+    test_packet_roundtrip()
+    test_tls_verified_unless_opted_out()
+    test_stream_reaction_and_reconnect()
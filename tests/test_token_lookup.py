@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.token_lookup as tl
+from utils.token_lookup import TokenLookup, iter_json_array
+
+def make_scrip_rows(expiry="20JAN2026", center=23000, width=10):
+    """Builds a small Scrip Master in the same shape as OpenAPIScripMaster.json"""
+    rows = [
+        {"token": "99926000", "symbol": "Nifty 50", "name": "NIFTY", "expiry": "", "strike": "0.000000",
+         "lotsize": "1", "instrumenttype": "AMXIDX", "exch_seg": "NSE", "tick_size": "0.000000"},
+        {"token": "3045", "symbol": "SBIN-EQ", "name": "SBIN", "expiry": "", "strike": "-1.000000",
+         "lotsize": "1", "instrumenttype": "", "exch_seg": "NSE", "tick_size": "5.000000"},
+    ]
+    token = 40000
+    for i in range(-width, width + 1):
+        strike = center + i * 50
+        for opt in ("CE", "PE"):
+            token += 1
+            rows.append({
+                "token": str(token), "symbol": f"NIFTY{expiry[:5]}{expiry[-2:]}{strike}{opt}", "name": "NIFTY",
+                "expiry": expiry, "strike": f"{strike * 100:.6f}", "lotsize": "65",
+                "instrumenttype": "OPTIDX", "exch_seg": "NFO", "tick_size": "5.000000"
+            })
+    return rows
+
+class FakeResponse:
+    """Serves rows as a chunked byte stream, like requests with stream=True"""
+    def __init__(self, rows, chunk=97):
+        self.payload = json.dumps(rows, indent=1).encode('utf-8')
+        self.chunk = chunk
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=None):
+        for i in range(0, len(self.payload), self.chunk):
+            yield self.payload[i:i + self.chunk]
+
+def test_iter_json_array_chunk_boundaries():
+    print(">>> [Test] Streaming JSON parser across chunk boundaries")
+    rows = [{"a": i, "s": "Nifty ₹ 50", "nested": {"x": [1, 2, {"y": "]"}]}} for i in range(50)]
+    payload = json.dumps(rows).encode('utf-8')
+    for size in (1, 2, 7, 64, len(payload)):
+        chunks = [payload[i:i + size] for i in range(0, len(payload), size)]
+        assert list(iter_json_array(chunks)) == rows
+    assert list(iter_json_array([b"[]"])) == []
+
+def test_scrip_master_cache():
+    print(">>> [Test] Scrip Master: download once, then load from cache")
+    calls = []
+    rows = make_scrip_rows()
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return FakeResponse(rows)
+
+    original_get = tl.requests.get
+    tl.requests.get = fake_get
+    try:
+        cache_dir = tempfile.mkdtemp()
+
+        # Cold: downloads and writes the cache
+        first = TokenLookup(cache_dir=cache_dir)
+        first.load_scrip_master()
+        assert len(calls) == 1
+        token, symbol = first.get_token("NIFTY", "20JAN2026", 23000, "CE")
+
+        # Filtered while streaming: equities are dropped, options + index kept
+        assert len(first.df) == len(rows) - 1
+        assert "SBIN" not in set(first.df['name'])
+
+        # Warm: same trading date -> no download
+        second = TokenLookup(cache_dir=cache_dir)
+        second.load_scrip_master()
+        assert len(calls) == 1
+        assert len(second.df) == len(first.df)
+        assert second.get_token("NIFTY", "20JAN2026", 23000, "CE") == (token, symbol)
+        assert symbol.endswith("23000CE")
+
+        # Bulk lookup keeps order and reports misses as (None, None)
+        bulk = second.get_tokens([
+            ("NIFTY", "20JAN2026", 23000, "CE"),
+            ("NIFTY", "20JAN2026", 23050.0, "PE"),
+            ("NIFTY", "20JAN2026", 23025, "CE"),
+        ])
+        assert bulk[0] == (token, symbol)
+        assert bulk[1][1].endswith("23050PE")
+        assert bulk[2] == (None, None)
+
+        # Stale dates are pruned on the next save
+        os.makedirs(os.path.join(cache_dir, "2000-01-01"))
+        second.save_cache("2099-01-01")
+        assert sorted(os.listdir(cache_dir)) == ["2099-01-01"]
+    finally:
+        tl.requests.get = original_get
+
+if __name__ == "__main__":
+    test_iter_json_array_chunk_boundaries()
+    test_scrip_master_cache()
@@ -1,9 +1,10 @@
 import sys
 import os
-import time
+import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.position_manager import PositionManager
+from utils.clock import SimulatedClock
 
 # Mock API
 class MockAPI:
@@ -12,8 +13,8 @@ class MockAPI:
 
 # Subclass to inject price sequence
 class TestPositionManager(PositionManager):
-    def __init__(self, prices):
-        super().__init__(MockAPI(), dry_run=True)
+    def __init__(self, prices, clock):
+        super().__init__(MockAPI(), dry_run=True, clock=clock)
         self.prices = prices # List of prices to feed
         self.idx = 0
         
@@ -39,7 +40,9 @@ def test_tsl_scenario():
     
     prices = [100, 105, 110, 115, 122, 115, 110]
     
-    manager = TestPositionManager(prices)
+    # Simulated 10:00 AM: the 5s polling sleeps return immediately
+    clock = SimulatedClock(datetime.datetime(2026, 2, 10, 10, 0))
+    manager = TestPositionManager(prices, clock)
     
     # Fake Position
     pos = {
@@ -49,34 +52,26 @@ def test_tsl_scenario():
         'qty': 50
     }
     
-    # Patch datetime in the module
-    import core.position_manager as pm
-    from unittest.mock import MagicMock
-    import datetime
+    manager.monitor([pos])
 
-    # Mock Current Time to 10:00 AM
-    mock_now = datetime.datetime.now().replace(hour=10, minute=0, second=0)
-    
-    # Create a mock class that behaves like datetime.datetime
-    class MockDatetime(datetime.datetime):
-        @classmethod
-        def now(cls):
-            return mock_now
+    assert pos['exited'] and pos['exit_reason'] == "TRAILING_SL_HIT" and pos['tsl_active']
+    assert pos['sl_level'] == 0.12 and abs(pos['highest_pnl'] - 0.22) < 1e-9
+    # Seven polls, six 5-second sleeps between them
+    assert clock.now() == datetime.datetime(2026, 2, 10, 10, 0, 30)
 
-    # Patch it
-    original_datetime = pm.datetime.datetime
-    pm.datetime.datetime = MockDatetime
-    
-    # Faster Sleep for test
-    original_sleep = pm.time.sleep
-    pm.time.sleep = lambda x: None # No Delay
-    
-    try:
-        manager.monitor([pos])
-    finally:
-        # Restore
-        pm.datetime.datetime = original_datetime
-        pm.time.sleep = original_sleep
+def test_time_exit_after_full_session():
+    print(">>> [Test] Simulating a flat session: position squared off at 15:15")
+    clock = SimulatedClock(datetime.datetime(2026, 2, 10, 9, 20))
+    manager = TestPositionManager([102], clock)
+    pos = {'symbol': 'NIFTY26FEB22000CE', 'token': '12345', 'entry_price': 100.0, 'qty': 50}
+
+    manager.monitor([pos])
+
+    # ~4,260 polls of a 09:20-15:15 session, no wall-clock waiting
+    assert clock.now().time() > datetime.time(15, 15)
+    assert clock.now() - datetime.datetime(2026, 2, 10, 15, 15) <= datetime.timedelta(seconds=5)
+    assert pos['exited'] and pos['exit_reason'] == "TIME_EXIT" and manager.idx == 1
 
 if __name__ == "__main__":
     test_tsl_scenario()
+    test_time_exit_after_full_session()
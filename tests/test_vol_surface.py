@@ -0,0 +1,133 @@
+import sys
+import os
+import datetime
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.quote_service import QuoteService
+from core.vol_surface import VolSurface
+from utils import black_scholes as bs
+from utils.option_chain import OptionChain
+
+SPOT = 23000.0
+NOW = datetime.datetime(2026, 1, 15, 10, 0)
+STRIKES = list(range(22500, 23501, 100))
+
+def smile(strikes, base=0.12):
+    return base + 0.04 * ((np.asarray(strikes, dtype=np.float64) - SPOT) / 1000.0) ** 2
+
+def make_chain(expiry, tag):
+    ce = [(f"{tag}{k}CE", f"NIFTY{tag}{k}CE") for k in STRIKES]
+    pe = [(f"{tag}{k}PE", f"NIFTY{tag}{k}PE") for k in STRIKES]
+    return OptionChain("NIFTY", expiry, STRIKES, ce, pe)
+
+class FakeQuoteAPI:
+    """getMarketData over a fixed price table; counts round-trips"""
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = 0
+
+    def getMarketData(self, mode, exchangeTokens):
+        self.calls += 1
+        fetched = [{"symbolToken": t, "ltp": self.prices[t]} for tokens in exchangeTokens.values() for t in tokens if t in self.prices]
+        return {"status": True, "data": {"fetched": fetched, "unfetched": []}}
+
+def chain_prices(expiry, tag, spot=SPOT, base=0.12):
+    t = bs.time_to_expiry(expiry, NOW)
+    vol = smile(STRIKES, base)
+    prices = {"99926000": spot}
+    prices.update(zip([f"{tag}{k}CE" for k in STRIKES], bs.price(spot, STRIKES, t, vol, True).tolist()))
+    prices.update(zip([f"{tag}{k}PE" for k in STRIKES], bs.price(spot, STRIKES, t, vol, False).tolist()))
+    return prices
+
+def test_smile_and_incremental_refresh():
+    print(">>> [Test] VolSurface: smile queries, only changed quotes re-solved")
+    prices_w = chain_prices("20JAN2026", "W")
+    api = FakeQuoteAPI(prices_w)
+    quotes = QuoteService(api, max_age=60)
+    surface = VolSurface(quotes, max_age=60)
+    surface.add_chain(make_chain("20JAN2026", "W"))
+    assert surface.wait_ready(0)
+
+    assert abs(surface.atm_iv(now=NOW) - 0.12) < 1e-6
+    assert surface.solved_count == 2 * len(STRIKES)
+    # Between listed strikes: linear on the smile
+    mid = (smile([23100])[0] + smile([23200])[0]) / 2
+    assert abs(surface.iv(23150, now=NOW) - mid) < 1e-6
+    delta = surface.delta(23000, "CE", now=NOW)
+    assert 0.5 < delta < 0.6
+
+    # Nothing changed: queries are served without solving or requesting quotes
+    surface.iv(22800, now=NOW)
+    assert surface.solved_count == 2 * len(STRIKES) and api.calls == 1
+
+    # One premium moves: only that point is re-solved
+    t = bs.time_to_expiry("20JAN2026", NOW)
+    quotes.update("W23200CE", float(bs.price(SPOT, 23200, t, 0.15, True)), time.time())
+    assert abs(surface.iv(23200, now=NOW) - 0.15) < 1e-6
+    assert surface.solved_count == 2 * len(STRIKES) + 1
+
+    point = surface.point(23200, "CE", now=NOW)
+    assert abs(point['iv'] - 0.15) < 1e-6 and point['solved_spot'] == SPOT and not point['stale']
+    # A quote older than max_age is flagged stale (its IV is still served)
+    quotes.update("W22500PE", prices_w["W22500PE"], time.time() - 120)
+    old = surface.point(22500, "PE", now=NOW)
+    assert old['stale'] and old['quote_age'] > 60 and abs(old['iv'] - smile([22500])[0]) < 1e-6
+    assert surface.point(23250, "CE", now=NOW) is None # not listed
+
+def test_spot_move_and_expiry_interpolation():
+    print(">>> [Test] VolSurface: spot moves re-solve, term structure in total variance")
+    prices = chain_prices("20JAN2026", "W")
+    prices.update({k: v for k, v in chain_prices("27JAN2026", "M", base=0.14).items() if k != "99926000"})
+    quotes = QuoteService(FakeQuoteAPI(prices), max_age=60)
+    surface = VolSurface(quotes, max_age=60, respot=0.001)
+    surface.add_chain(make_chain("20JAN2026", "W"))
+    surface.add_chain(make_chain("27JAN2026", "M"))
+    assert surface.expiries() == ["20JAN2026", "27JAN2026"]
+    assert abs(surface.atm_iv("27JAN2026", now=NOW) - 0.14) < 1e-6
+    solved = surface.solved_count
+
+    # Halfway in total variance between the two listed expiries
+    t1, t2 = bs.time_to_expiry("20JAN2026", NOW), bs.time_to_expiry("27JAN2026", NOW)
+    t = bs.time_to_expiry("23JAN2026", NOW)
+    w = (t - t1) / (t2 - t1)
+    expected = np.sqrt(((1 - w) * 0.12 ** 2 * t1 + w * 0.14 ** 2 * t2) / t)
+    assert abs(surface.atm_iv(datetime.date(2026, 1, 23), now=NOW) - expected) < 1e-6
+    assert surface.solved_count == solved
+
+    # Spot moves beyond respot: every quoted point is re-solved at the new spot
+    quotes.update("99926000", SPOT * 1.01, time.time())
+    point = surface.point(23000, "CE", "20JAN2026", now=NOW)
+    assert point['solved_spot'] == SPOT * 1.01 and not point['stale']
+    assert surface.solved_count == solved + 4 * len(STRIKES)
+
+def test_surface_and_quote_readers_do_not_deadlock():
+    print(">>> [Test] VolSurface: surface queries and LTP refreshes from other threads never deadlock")
+    quotes = QuoteService(FakeQuoteAPI(chain_prices("20JAN2026", "W")), max_age=0)
+    surface = VolSurface(quotes, max_age=0)
+    surface.add_chain(make_chain("20JAN2026", "W"))
+    stop = time.time() + 0.5
+
+    def query_surface():
+        while time.time() < stop:
+            surface.iv(23000, now=NOW)
+
+    def query_quotes():
+        while time.time() < stop:
+            quotes.get_ltp("W23000CE", symbol="NIFTYW23000CE", max_age=0)
+
+    # Every refresh feeds the surface's listener; with either side calling into the other under its lock this hangs
+    threads = [threading.Thread(target=f, daemon=True) for f in (query_surface, query_quotes, query_surface, query_quotes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in threads)
+    assert abs(surface.atm_iv(now=NOW) - 0.12) < 1e-6
+
+if __name__ == "__main__":
+    test_smile_and_incremental_refresh()
+    test_spot_move_and_expiry_interpolation()
+    test_surface_and_quote_readers_do_not_deadlock()
@@ -0,0 +1,170 @@
+import datetime
+import numpy as np
+import pandas as pd
+from config.settings import Config
+
+# NSE index options settle at the 15:30 close of the expiry date
+EXPIRY_CLOSE = datetime.time(15, 30)
+YEAR_SECONDS = 365.0 * 24 * 3600
+MIN_TIME = 60.0 / YEAR_SECONDS # one minute; keeps expiry-day maths finite
+
+# Implied volatility search range (annualised)
+IV_LOW = 1e-4
+IV_HIGH = 5.0
+
+SQRT2 = np.sqrt(2.0)
+SQRT2PI = np.sqrt(2.0 * np.pi)
+
+def erfc(x):
+    """Complementary error function (Chebyshev fit, relative error < 1.2e-7 everywhere), vectorized"""
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (-0.18628806 +
+           t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277))))))))
+    r = t * np.exp(poly)
+    return np.where(x >= 0, r, 2.0 - r)
+
+def norm_cdf(x):
+    return 0.5 * erfc(-np.asarray(x, dtype=np.float64) / SQRT2)
+
+def norm_pdf(x):
+    x = np.asarray(x, dtype=np.float64)
+    return np.exp(-0.5 * x * x) / SQRT2PI
+
+def time_to_expiry(expiry, now=None):
+    """Years (365-day) from now to the 15:30 close of expiry ('20JAN2026' or a date), at least one minute"""
+    now = now or datetime.datetime.now()
+    if isinstance(expiry, str):
+        expiry = datetime.datetime.strptime(expiry, "%d%b%Y").date()
+    close = datetime.datetime.combine(expiry, EXPIRY_CLOSE)
+    return max((close - now).total_seconds() / YEAR_SECONDS, MIN_TIME)
+
+def _d1_d2(spot, strike, t, vol, rate):
+    sqrt_t = np.sqrt(t)
+    vol_t = vol * sqrt_t
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * t) / vol_t
+    return d1, d1 - vol_t, sqrt_t
+
+def price(spot, strike, t, vol, is_call, rate=None):
+    """Black-Scholes premium. Every argument broadcasts (scalars or arrays); is_call is a bool array/scalar."""
+    rate = Config.RISK_FREE_RATE if rate is None else rate
+    spot, strike, t, vol = (np.asarray(a, dtype=np.float64) for a in (spot, strike, t, vol))
+    d1, d2, _ = _d1_d2(spot, strike, t, vol, rate)
+    disc = strike * np.exp(-rate * t)
+    call = spot * norm_cdf(d1) - disc * norm_cdf(d2)
+    put = disc * norm_cdf(-d2) - spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+def greeks(spot, strike, t, vol, is_call, rate=None):
+    """
+    Delta, gamma, theta (premium per calendar day) and vega (premium per 1 vol point)
+    for every element of the broadcast inputs. Returns a dict of arrays.
+    """
+    rate = Config.RISK_FREE_RATE if rate is None else rate
+    spot, strike, t, vol = (np.asarray(a, dtype=np.float64) for a in (spot, strike, t, vol))
+    d1, d2, sqrt_t = _d1_d2(spot, strike, t, vol, rate)
+    pdf = norm_pdf(d1)
+    disc = strike * np.exp(-rate * t)
+
+    delta = np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1.0)
+    gamma = pdf / (spot * vol * sqrt_t)
+    decay = -spot * pdf * vol / (2.0 * sqrt_t)
+    theta = np.where(is_call, decay - rate * disc * norm_cdf(d2), decay + rate * disc * norm_cdf(-d2))
+    vega = spot * pdf * sqrt_t
+    return {'delta': delta, 'gamma': gamma, 'theta': theta / 365.0, 'vega': vega / 100.0}
+
+def implied_vol(premium, spot, strike, t, is_call, rate=None, tol=1e-6, max_iter=50):
+    """
+    Implied volatility for every element at once: Newton steps on vega, falling back to
+    bisection of the [IV_LOW, IV_HIGH] bracket whenever a step leaves it (deep wings,
+    near-zero vega). NaN where the premium is outside the no-arbitrage bounds.
+    """
+    rate = Config.RISK_FREE_RATE if rate is None else rate
+    premium, spot, strike, t, is_call = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (premium, spot, strike, t)), np.asarray(is_call, dtype=bool))
+    shape = premium.shape
+    premium, spot, strike, t, is_call = (a.ravel() for a in (premium, spot, strike, t, is_call))
+    disc = strike * np.exp(-rate * t)
+    lower = np.where(is_call, np.maximum(spot - disc, 0.0), np.maximum(disc - spot, 0.0))
+    upper = np.where(is_call, spot, disc)
+    valid = np.isfinite(premium) & (premium > lower) & (premium < upper)
+
+    # Solve on the out-of-the-money side (put-call parity): an ITM premium is mostly
+    # intrinsic value, and its small time value alone pins down the volatility
+    itm = lower > 0
+    premium = np.where(itm, premium - lower, premium)
+    is_call = np.where(itm, ~is_call, is_call)
+
+    lo = np.full(premium.shape, IV_LOW)
+    hi = np.full(premium.shape, IV_HIGH)
+    # Brenner-Subrahmanyam ATM estimate as the starting point
+    vol = np.clip(np.sqrt(2.0 * np.pi / t) * premium / spot, 0.05, 2.0)
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any(): break
+        s, k, tt, v, c = spot[active], strike[active], t[active], vol[active], is_call[active]
+        diff = price(s, k, tt, v, c, rate) - premium[active]
+
+        done = np.abs(diff) < tol
+        a_lo, a_hi = lo[active], hi[active]
+        a_hi = np.where(diff > 0, v, a_hi) # premium rises with vol
+        a_lo = np.where(diff < 0, v, a_lo)
+
+        vega = s * norm_pdf(_d1_d2(s, k, tt, v, rate)[0]) * np.sqrt(tt)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = v - diff / vega
+        bisect = ~np.isfinite(step) | (step <= a_lo) | (step >= a_hi)
+        new_vol = np.where(done, v, np.where(bisect, 0.5 * (a_lo + a_hi), step))
+
+        lo[active], hi[active], vol[active] = a_lo, a_hi, new_vol
+        idx = np.flatnonzero(active)
+        active[idx[done | (a_hi - a_lo < tol * 1e-3)]] = False
+
+    return np.where(valid, vol, np.nan).reshape(shape)
+
+def chain_greeks(chains, spot, prices, rate=None, now=None):
+    """
+    IV and Greeks for whole option chains in one vectorized pass.
+    chains: OptionChain or list of them (TokenLookup.get_option_chain), one per expiry.
+    prices: {token: premium} (e.g. from QuoteService); contracts without a price get NaN.
+    Returns a DataFrame: expiry, strike, type, token, symbol, premium, t, iv, delta, gamma, theta, vega.
+    """
+    if not isinstance(chains, (list, tuple)): chains = [chains]
+    now = now or datetime.datetime.now()
+
+    names = ('expiry', 'strike', 'type', 'token', 'symbol', 't')
+    rows = []
+    for chain in chains:
+        t = time_to_expiry(chain.expiry, now)
+        for option_type, legs in (("CE", chain.ce), ("PE", chain.pe)):
+            for strike, (token, symbol) in zip(chain.strikes, legs):
+                if token is not None:
+                    rows.append((chain.expiry, strike, option_type, token, symbol, t))
+    # Column lists, so every computation below is one NumPy call over the whole grid
+    cols = dict(zip(names, map(list, zip(*rows)))) if rows else {name: [] for name in names}
+
+    strike = np.array(cols['strike'], dtype=np.float64)
+    premium = np.array([prices.get(token, np.nan) for token in cols['token']], dtype=np.float64)
+    t = np.array(cols['t'], dtype=np.float64)
+    is_call = np.array(cols['type']) == "CE"
+
+    iv = implied_vol(premium, spot, strike, t, is_call, rate)
+    cols.update(premium=premium, t=t, iv=iv, **greeks(spot, strike, t, iv, is_call, rate))
+    return pd.DataFrame(cols, columns=['expiry', 'strike', 'type', 'token', 'symbol', 'premium', 't', 'iv', 'delta', 'gamma', 'theta', 'vega'])
+
+def stop_loss_premium(premium, spot, index_sl, strike, expiry, option_type, rate=None, now=None):
+    """
+    Option stop-loss for an index stop-loss level: the IV implied by 'premium' at 'spot',
+    then the premium repriced with the index at index_sl (same IV and expiry).
+    Returns (sl_premium, delta), or (None, None) if the IV cannot be solved.
+    """
+    t = time_to_expiry(expiry, now)
+    is_call = option_type == "CE"
+    iv = float(implied_vol(premium, spot, strike, t, is_call, rate))
+    if not np.isfinite(iv): return None, None
+
+    delta = float(greeks(spot, strike, t, iv, is_call, rate)['delta'])
+    sl_premium = float(price(index_sl, strike, t, iv, is_call, rate))
+    return sl_premium, delta
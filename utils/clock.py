@@ -0,0 +1,72 @@
+import datetime
+import threading
+import time
+
+class Clock:
+    """
+    Time source for strategy loops, the gatekeeper and the position manager: now(),
+    today(), time() and sleep() on the real wall clock. Components take a 'clock'
+    argument and default to system_clock; hand them a SimulatedClock to run the same
+    loops on scripted or replayed time.
+    """
+    def now(self):
+        return datetime.datetime.now()
+
+    def today(self):
+        return datetime.date.today()
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+system_clock = Clock()
+
+class SessionEnded(BaseException):
+    """
+    Raised from a simulated sleep() that would run past the clock's deadline. A BaseException
+    (like KeyboardInterrupt), so a strategy loop's 'except Exception' cannot retry forever.
+    """
+    pass
+
+class SimulatedClock(Clock):
+    """
+    Virtual wall clock: sleep() returns immediately after moving the clock forward, so a
+    09:15-15:30 session of polling loops runs in as long as the loop bodies take.
+    on_advance(target) runs first so a simulated market can process the interval being
+    skipped. A sleep past 'deadline' stops there and raises SessionEnded.
+    """
+    def __init__(self, start=None, deadline=None):
+        self.current = start or datetime.datetime.now()
+        self.deadline = deadline
+        self.on_advance = None
+        self.lock = threading.RLock()
+
+    def now(self):
+        return self.current
+
+    def today(self):
+        return self.current.date()
+
+    def time(self):
+        return self.current.timestamp()
+
+    def sleep(self, seconds):
+        target = self.current + datetime.timedelta(seconds=max(0, seconds))
+        if self.deadline and target > self.deadline:
+            self.advance_to(self.deadline)
+            raise SessionEnded(self.deadline)
+        self.advance_to(target)
+
+    def advance_to(self, target):
+        with self.lock:
+            if target <= self.current: return
+            if self.on_advance:
+                self.on_advance(target)
+            self.current = target
+
+    def set(self, moment):
+        """Jumps without processing the skipped interval (session boundaries)"""
+        with self.lock:
+            self.current = moment
@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+from config.settings import Config
+
+# Exit reasons (codes in the 'reasons' arrays)
+TIME_EXIT = 0
+STOP_LOSS = 1
+TRAILING_STOP = 2
+REASONS = {TIME_EXIT: "TIME_EXIT", STOP_LOSS: "STOP_LOSS_HIT", TRAILING_STOP: "TRAILING_SL_HIT"}
+
+# Paths are generated and evaluated in blocks of this many rows to bound the (paths x steps)
+# temporaries (100k paths of a full session at 5-second checks would need several GB at once)
+CHUNK_PATHS = 5000
+# Exit rules scan each block this many checks at a time and drop the paths that have exited,
+# so the work follows the holding time rather than the session length
+WINDOW_STEPS = 120
+
+# --- Premium paths (rows: paths, columns: checks of the exit rule; column 0 is the entry) ---
+
+def simulate_paths(n_paths, n_steps, start=100.0, vol=0.01, drift=0.0, seed=None, dtype=np.float64):
+    """
+    Geometric Brownian paths: 'vol' and 'drift' are per step (log-return std and mean).
+    dtype=np.float32 halves memory traffic for large runs.
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.standard_normal(size=(n_paths, n_steps - 1), dtype=dtype)
+    steps *= vol
+    steps += drift - 0.5 * vol * vol
+    # In place from here on: at 100k x 4k checks every temporary is gigabytes
+    paths = np.empty((n_paths, n_steps), dtype=dtype)
+    paths[:, 0] = 0.0
+    np.cumsum(steps, axis=1, out=paths[:, 1:])
+    np.exp(paths, out=paths)
+    paths *= start
+    return paths
+
+def bootstrap_paths(prices, n_paths, n_steps, start=None, block=5, seed=None, dtype=np.float64):
+    """
+    Paths built from a historical price series (e.g. stored option closes): log returns are
+    resampled in contiguous blocks of 'block' steps, keeping short-range autocorrelation.
+    Paths start at 'start' (default: the series' last price).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    returns = np.diff(np.log(prices))
+    block = max(1, min(block, len(returns)))
+    n_blocks = -(-(n_steps - 1) // block)
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, len(returns) - block + 1, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :n_steps - 1]
+    log_paths = np.concatenate([np.zeros((n_paths, 1)), np.cumsum(returns[idx], axis=1)], axis=1)
+    return ((prices[-1] if start is None else start) * np.exp(log_paths)).astype(dtype, copy=False)
+
+def path_blocks(make_paths, n_paths, chunk=None, seed=None, **kwargs):
+    """
+    n_paths from make_paths (simulate_paths / bootstrap_paths) in blocks of 'chunk' rows, each
+    block with its own seed drawn from 'seed'. Pass the generator to evaluate().
+    """
+    chunk = chunk or CHUNK_PATHS
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_paths, chunk):
+        yield make_paths(n_paths=min(chunk, n_paths - start), seed=int(rng.integers(2 ** 63)), **kwargs)
+
+# --- Exit rules: (paths, entry) -> (exit step, exit price, reason) per path ---
+
+def _first_exit(paths, entry, state, check, window=None):
+    """
+    First step where check() reports a hit (else the last step, a time exit). The paths are
+    scanned 'window' checks at a time: check(block, entry, state) -> (hit, reasons, state)
+    gets the still-open rows' prices for the window and the rule's per-row state carried
+    over from the previous window; rows that exit are dropped before the next one.
+    """
+    window = window or WINDOW_STEPS
+    n_paths, n_steps = paths.shape
+    entry = np.broadcast_to(np.asarray(entry, dtype=paths.dtype).reshape(-1), n_paths).reshape(-1, 1)
+    steps = np.full(n_paths, n_steps - 1)
+    reasons = np.full(n_paths, TIME_EXIT)
+    rows = np.arange(n_paths)
+    for start in range(0, n_steps, window):
+        block = paths[:, start:start + window]
+        if len(rows) < n_paths:
+            block = block[rows]
+        hit, codes, state = check(block, entry[rows], state)
+        exited = hit.any(axis=1)
+        if exited.any():
+            first = hit[exited].argmax(axis=1)
+            steps[rows[exited]] = start + first
+            reasons[rows[exited]] = codes[exited, first] if np.ndim(codes) else codes
+            rows, state = rows[~exited], state[~exited]
+            if not len(rows): break
+    return steps, paths[np.arange(n_paths), steps], reasons
+
+def trailing_stop_exits(paths, entry, stop_loss=None, breakeven=None, trail=None):
+    """
+    PositionManager.monitor's rule on every path at once: stop at -stop_loss, moved to
+    breakeven once P&L reaches +breakeven, then trailing the peak P&L by 'trail' (rounded
+    to 0.01 and only ever raised). Exits on the first check at or below the stop.
+    """
+    stop_loss = Config.TSL_STOP_LOSS if stop_loss is None else stop_loss
+    breakeven = Config.TSL_BREAKEVEN if breakeven is None else breakeven
+    trail = Config.TSL_TRAIL if trail is None else trail
+
+    def check(block, entry, peak):
+        pnl = (block - entry) / entry
+        peak = np.maximum.accumulate(np.maximum(pnl, peak[:, None]), axis=1)
+        active = peak >= breakeven
+        level = np.where(active, np.maximum(0.0, np.round(peak - trail, 2)), -stop_loss)
+        return pnl <= level, np.where(active, TRAILING_STOP, STOP_LOSS), peak[:, -1]
+
+    return _first_exit(paths, entry, np.full(len(paths), -1.0, dtype=paths.dtype), check)
+
+def step_ladder_exits(paths, entry, steps=None):
+    """
+    MomentumStrategy.check_trailing_stop on every path at once: no stop until profit reaches
+    the first ladder step; each check first tests the stop set so far (exit at or below it),
+    then raises it to entry + the points locked by the highest step reached.
+    """
+    ladder = sorted(Config.MOMENTUM_TRAIL_STEPS if steps is None else steps)
+
+    def check(block, entry, stop):
+        profit = block - entry
+        locked = np.zeros(block.shape, dtype=block.dtype)
+        for reached, points in ladder:
+            locked = np.where(profit >= reached, entry + points, locked)
+        raised = np.maximum.accumulate(np.maximum(locked, stop[:, None]), axis=1)
+        # The stop tested at a check is the one set by the previous checks
+        prior = np.concatenate([stop[:, None], raised[:, :-1]], axis=1)
+        return (prior > 0) & (block <= prior), TRAILING_STOP, raised[:, -1]
+
+    return _first_exit(paths, entry, np.zeros(len(paths), dtype=paths.dtype), check)
+
+# --- Distributions ---
+
+class ExitDistribution:
+    """
+    Outcome of one exit policy over a set of paths: exit P&L per path (points of premium and
+    fraction of entry, times qty for rupees), holding time and exit reason.
+    """
+    def __init__(self, name, entry, steps, prices, reasons, qty=1, step_seconds=5.0):
+        self.name = name
+        self.entry = np.broadcast_to(np.asarray(entry, dtype=np.float64), np.shape(prices))
+        self.steps = steps
+        self.prices = prices
+        self.reasons = reasons
+        self.qty = qty
+        self.step_seconds = step_seconds
+
+    @property
+    def points(self):
+        return self.prices - self.entry
+
+    @property
+    def pnl(self):
+        return self.points * self.qty
+
+    @property
+    def returns(self):
+        return self.points / self.entry
+
+    @property
+    def holding_minutes(self):
+        return self.steps * self.step_seconds / 60.0
+
+    def summary(self):
+        pnl = self.pnl
+        worst = np.sort(pnl)[:max(1, len(pnl) // 20)]
+        p5, p25, p50, p75, p95 = np.percentile(pnl, [5, 25, 50, 75, 95])
+        hold = self.holding_minutes
+        row = {
+            'policy': self.name,
+            'paths': len(pnl),
+            'mean_pnl': float(pnl.mean()),
+            'std_pnl': float(pnl.std()),
+            'p5': float(p5), 'p25': float(p25), 'median': float(p50), 'p75': float(p75), 'p95': float(p95),
+            'cvar5': float(worst.mean()), # mean of the worst 5%
+            'win_rate': float((pnl > 0).mean()),
+            'mean_return': float(self.returns.mean()),
+            'mean_hold_min': float(hold.mean()),
+            'median_hold_min': float(np.median(hold)),
+        }
+        for code, reason in REASONS.items():
+            row[reason.lower()] = float((self.reasons == code).mean())
+        return row
+
+def _blocks(paths, entry, chunk):
+    """(block, entry per row) pairs from an array (split every 'chunk' rows) or an iterable of blocks"""
+    if isinstance(paths, np.ndarray):
+        entry = paths[:, 0] if entry is None else np.broadcast_to(np.asarray(entry, dtype=np.float64), len(paths))
+        for i in range(0, len(paths), chunk):
+            yield paths[i:i + chunk], entry[i:i + chunk]
+    else:
+        for block in paths:
+            yield block, block[:, 0] if entry is None else np.broadcast_to(np.asarray(entry, dtype=np.float64), len(block))
+
+def evaluate(paths, policies, entry=None, qty=1, step_seconds=5.0, chunk=None):
+    """
+    Applies each exit policy to the same paths. paths: a (paths x steps) array or an iterable
+    of such blocks (path_blocks). policies: {name: rule(paths, entry)}, e.g. trailing_stop_exits
+    or functools.partial(trailing_stop_exits, trail=0.15). entry defaults to each path's first
+    price. Only the per-path outcomes are kept. Returns {name: ExitDistribution}.
+    """
+    parts = {name: [] for name in policies}
+    entries = []
+    for block, block_entry in _blocks(paths, entry, chunk or CHUNK_PATHS):
+        entries.append(block_entry)
+        for name, rule in policies.items():
+            parts[name].append(rule(block, block_entry))
+
+    entry = np.concatenate(entries)
+    results = {}
+    for name, outcomes in parts.items():
+        steps, prices, reasons = (np.concatenate(p) for p in zip(*outcomes))
+        results[name] = ExitDistribution(name, entry, steps, prices, reasons, qty, step_seconds)
+    return results
+
+def compare(results):
+    """One summary row per policy, best mean P&L first"""
+    table = pd.DataFrame([r.summary() for r in results.values()])
+    return table.sort_values('mean_pnl', ascending=False, kind='stable').reset_index(drop=True)
@@ -1,7 +1,7 @@
 import datetime
 
-def get_next_weekly_expiry():
-    today = datetime.date.today()
+def get_next_weekly_expiry(today=None):
+    today = today or datetime.date.today()
     # Nifty Expiry is now Tuesday (weekday 1) as of Sep 2025
     
     current_weekday = today.weekday()
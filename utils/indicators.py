@@ -0,0 +1,318 @@
+import math
+from collections import deque
+
+class EMA:
+    """Exponential moving average, same as pandas ewm(span=span, adjust=False).mean()"""
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = None
+
+    def next_value(self, x):
+        return x if self.value is None else self.value + self.alpha * (x - self.value)
+
+    def update(self, x):
+        self.value = self.next_value(x)
+        return self.value
+
+    def peek(self, x):
+        """Value if x were the next input, without changing state"""
+        return self.next_value(x)
+
+    def update_bar(self, bar): return self.update(bar.close)
+    def peek_bar(self, bar): return self.peek(bar.close)
+
+    def fresh(self): return EMA(self.span)
+
+    def to_dict(self):
+        return {'span': self.span, 'value': self.value}
+
+    @classmethod
+    def from_dict(cls, state):
+        ind = cls(state['span'])
+        ind.value = state['value']
+        return ind
+
+def crossover_price(fast, slow):
+    """
+    Close at which the next bar makes two EMAs equal. With alpha_f > alpha_s the gap
+    fast - slow rises with the close, so fast > slow on the next bar exactly when
+    close > [s(1 - a_s) - f(1 - a_f)] / (a_f - a_s). None before the first bar.
+    """
+    if fast.value is None or slow.value is None: return None
+    af, as_ = fast.alpha, slow.alpha
+    return (slow.value * (1 - as_) - fast.value * (1 - af)) / (af - as_)
+
+class RSI:
+    """
+    Wilder RSI, same as MomentumStrategy.calculate_rsi: gains/losses smoothed with
+    ewm(alpha=1/period, adjust=False), the first bar counting as a 0 change, and 50
+    wherever the ratio is undefined (no gains and no losses yet).
+    """
+    def __init__(self, period=14):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.prev_close = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def next_state(self, close):
+        if self.prev_close is None:
+            return 0.0, 0.0
+        delta = close - self.prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        return (self.avg_gain + self.alpha * (gain - self.avg_gain),
+                self.avg_loss + self.alpha * (loss - self.avg_loss))
+
+    @staticmethod
+    def rsi(avg_gain, avg_loss):
+        if avg_loss == 0:
+            return 50.0 if avg_gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def update(self, close):
+        self.avg_gain, self.avg_loss = self.next_state(close)
+        self.prev_close = close
+        return self.value
+
+    def peek(self, close):
+        return self.rsi(*self.next_state(close))
+
+    @property
+    def value(self):
+        return self.rsi(self.avg_gain, self.avg_loss)
+
+    def price_for(self, level):
+        """
+        Close at which the next bar's RSI equals 'level' (RSI rises with the close,
+        so RSI > level exactly when close > this price). None before the first bar.
+        """
+        if self.prev_close is None: return None
+        keep = 1.0 - self.alpha
+        g, l = self.avg_gain * keep, self.avg_loss * keep
+        rs = level / (100.0 - level)
+        if self.rsi(g, l) < level:
+            # Needs an up move d: (g + a*d) / l = rs
+            return self.prev_close + max(0.0, rs * l - g) / self.alpha
+        # Needs a down move d: g / (l + a*d) = rs
+        return self.prev_close - max(0.0, g / rs - l) / self.alpha
+
+    def update_bar(self, bar): return self.update(bar.close)
+    def peek_bar(self, bar): return self.peek(bar.close)
+
+    def fresh(self): return RSI(self.period)
+
+    def to_dict(self):
+        return {'period': self.period, 'prev_close': self.prev_close, 'avg_gain': self.avg_gain, 'avg_loss': self.avg_loss}
+
+    @classmethod
+    def from_dict(cls, state):
+        ind = cls(state['period'])
+        ind.prev_close, ind.avg_gain, ind.avg_loss = state['prev_close'], state['avg_gain'], state['avg_loss']
+        return ind
+
+class VWAP:
+    """
+    Session-anchored VWAP of the typical price (H+L+C)/3, reset on the first bar of each date.
+    NaN while the session has no volume (same as the pandas cumsum division).
+    """
+    def __init__(self):
+        self.session = None
+        self.pv = 0.0
+        self.volume = 0.0
+
+    def next_state(self, high, low, close, volume, session):
+        pv, vol = (0.0, 0.0) if session != self.session else (self.pv, self.volume)
+        return pv + (high + low + close) / 3.0 * volume, vol + volume
+
+    @staticmethod
+    def vwap(pv, volume):
+        return pv / volume if volume else math.nan
+
+    def update(self, high, low, close, volume, session=None):
+        self.pv, self.volume = self.next_state(high, low, close, volume, session)
+        self.session = session
+        return self.value
+
+    def peek(self, high, low, close, volume, session=None):
+        return self.vwap(*self.next_state(high, low, close, volume, session))
+
+    @property
+    def value(self):
+        return self.vwap(self.pv, self.volume)
+
+    @staticmethod
+    def bar_session(bar):
+        ts = getattr(bar, 'timestamp', None)
+        return ts.date().isoformat() if ts is not None else None
+
+    def update_bar(self, bar): return self.update(bar.high, bar.low, bar.close, bar.volume, self.bar_session(bar))
+    def peek_bar(self, bar): return self.peek(bar.high, bar.low, bar.close, bar.volume, self.bar_session(bar))
+
+    def fresh(self): return VWAP()
+
+    def to_dict(self):
+        return {'session': self.session, 'pv': self.pv, 'volume': self.volume}
+
+    @classmethod
+    def from_dict(cls, state):
+        ind = cls()
+        ind.session, ind.pv, ind.volume = state['session'], state['pv'], state['volume']
+        return ind
+
+class ATR:
+    """Wilder ATR: true range smoothed with ewm(alpha=1/period, adjust=False); the first TR is high - low"""
+    def __init__(self, period=14):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.prev_close = None
+        self.value = None
+
+    def next_value(self, high, low, close):
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        return tr if self.value is None else self.value + self.alpha * (tr - self.value)
+
+    def update(self, high, low, close):
+        self.value = self.next_value(high, low, close)
+        self.prev_close = close
+        return self.value
+
+    def peek(self, high, low, close):
+        return self.next_value(high, low, close)
+
+    def update_bar(self, bar): return self.update(bar.high, bar.low, bar.close)
+    def peek_bar(self, bar): return self.peek(bar.high, bar.low, bar.close)
+
+    def fresh(self): return ATR(self.period)
+
+    def to_dict(self):
+        return {'period': self.period, 'prev_close': self.prev_close, 'value': self.value}
+
+    @classmethod
+    def from_dict(cls, state):
+        ind = cls(state['period'])
+        ind.prev_close, ind.value = state['prev_close'], state['value']
+        return ind
+
+class Bollinger:
+    """
+    Bollinger Bands over the last 'period' closes: (middle, upper, lower) with the sample
+    standard deviation, same as close.rolling(period).mean() +/- k * close.rolling(period).std().
+    None until 'period' closes have been seen. Running sums are re-based from the window
+    every 'period' updates to keep rounding error from accumulating.
+    """
+    def __init__(self, period=20, k=2.0):
+        self.period = period
+        self.k = k
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def bands(self, total, total_sq, n):
+        if n < self.period: return None
+        mean = total / n
+        var = max(0.0, (total_sq - total * mean) / (n - 1))
+        std = math.sqrt(var)
+        return mean, mean + self.k * std, mean - self.k * std
+
+    def next_sums(self, close):
+        total, total_sq = self.total + close, self.total_sq + close * close
+        if len(self.window) == self.period:
+            old = self.window[0]
+            total, total_sq = total - old, total_sq - old * old
+        return total, total_sq, min(len(self.window) + 1, self.period)
+
+    def update(self, close):
+        self.total, self.total_sq, _ = self.next_sums(close)
+        self.window.append(close)
+        self.updates += 1
+        if self.updates % self.period == 0:
+            self.total = sum(self.window)
+            self.total_sq = sum(x * x for x in self.window)
+        return self.value
+
+    def peek(self, close):
+        return self.bands(*self.next_sums(close))
+
+    @property
+    def value(self):
+        return self.bands(self.total, self.total_sq, len(self.window))
+
+    def update_bar(self, bar): return self.update(bar.close)
+    def peek_bar(self, bar): return self.peek(bar.close)
+
+    def fresh(self): return Bollinger(self.period, self.k)
+
+    def to_dict(self):
+        return {'period': self.period, 'k': self.k, 'window': list(self.window), 'updates': self.updates}
+
+    @classmethod
+    def from_dict(cls, state):
+        ind = cls(state['period'], state['k'])
+        ind.window.extend(state['window'])
+        ind.total = sum(ind.window)
+        ind.total_sq = sum(x * x for x in ind.window)
+        ind.updates = state['updates']
+        return ind
+
+INDICATOR_TYPES = {cls.__name__: cls for cls in (EMA, RSI, VWAP, ATR, Bollinger)}
+
+class IndicatorSet:
+    """
+    Named streaming indicators over one bar series (DataFetcher / BarAggregator frames).
+
+    update_frame(df) treats the last row as the forming bar: closed bars newer than the
+    last one applied (found by walking back from the end of the frame) update the indicators
+    (O(1) each), and the forming bar is only peeked, so repeated calls during a bar cost O(1)
+    whatever the frame's length and give the same values as the pandas computation over the
+    whole frame. Frames without timestamps are recomputed from scratch.
+    """
+    def __init__(self, **indicators):
+        self.indicators = indicators
+        self.last_ts = None
+
+    def reset(self):
+        self.indicators = {name: ind.fresh() for name, ind in self.indicators.items()}
+        self.last_ts = None
+
+    def update_frame(self, df):
+        """Returns {name: value} as of the last row of df"""
+        if df.empty: return {}
+        has_ts = 'timestamp' in df.columns
+        start = 0
+        if not has_ts:
+            self.reset()
+        elif self.last_ts is not None:
+            # Broker bars carry +05:30, locally built bars are naive; compare wall-clock times
+            timestamps = df['timestamp']
+            start = len(df) - 1
+            while start > 0 and timestamps.iat[start - 1].replace(tzinfo=None) > self.last_ts:
+                start -= 1
+
+        rows = list(df.iloc[start:].itertuples(index=False))
+        for bar in rows[:-1]:
+            for ind in self.indicators.values():
+                ind.update_bar(bar)
+            self.last_ts = bar.timestamp.replace(tzinfo=None) if has_ts else None
+
+        forming = rows[-1]
+        return {name: ind.peek_bar(forming) for name, ind in self.indicators.items()}
+
+    def to_dict(self):
+        return {
+            'last_ts': self.last_ts.isoformat() if self.last_ts is not None else None,
+            'indicators': {name: {'type': type(ind).__name__, 'state': ind.to_dict()} for name, ind in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        import pandas as pd
+        indicators = {name: INDICATOR_TYPES[s['type']].from_dict(s['state']) for name, s in state['indicators'].items()}
+        ind_set = cls(**indicators)
+        ind_set.last_ts = pd.Timestamp(state['last_ts']) if state['last_ts'] else None
+        return ind_set
@@ -0,0 +1,94 @@
+import bisect
+from utils.logger import logger
+
+class OptionChain:
+    """
+    Strike-sorted option chain for one (underlying, expiry).
+    strikes[i] lines up with ce[i] / pe[i], each a (token, symbol) pair
+    ((None, None) if that side is not listed).
+    """
+    def __init__(self, underlying, expiry, strikes, ce, pe):
+        self.underlying = underlying
+        self.expiry = expiry
+        self.strikes = list(strikes)
+        self.ce = list(ce)
+        self.pe = list(pe)
+        self.positions = {strike: i for i, strike in enumerate(self.strikes)}
+
+    @classmethod
+    def from_index(cls, index, underlying, expiry):
+        """
+        Builds the chain from TokenLookup's (name, expiry, strike, option_type) index.
+        """
+        legs = {}
+        for (name, exp, strike, opt), contract in index.items():
+            if name == underlying and exp == expiry:
+                if float(strike).is_integer(): strike = int(strike)
+                legs.setdefault(strike, {})[opt] = contract
+
+        strikes = sorted(legs)
+        ce = [legs[s].get('CE', (None, None)) for s in strikes]
+        pe = [legs[s].get('PE', (None, None)) for s in strikes]
+        return cls(underlying, expiry, strikes, ce, pe)
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def atm_position(self, spot):
+        """Position of the listed strike closest to spot (ties go to the lower strike)"""
+        if not self.strikes or not spot: return None
+
+        i = bisect.bisect_left(self.strikes, spot)
+        if i == 0: return 0
+        if i == len(self.strikes): return i - 1
+        return i if self.strikes[i] - spot < spot - self.strikes[i - 1] else i - 1
+
+    def nearest_atm(self, spot):
+        """Listed strike closest to spot, or None if the chain is empty"""
+        i = self.atm_position(spot)
+        if i is None:
+            logger.warning(f"Chain: No strikes listed for {self.underlying} {self.expiry}")
+            return None
+        return self.strikes[i]
+
+    def contract(self, strike, option_type):
+        """(token, symbol) for an exact strike, (None, None) if not listed"""
+        i = self.positions.get(float(strike))
+        if i is None:
+            logger.warning(f"Chain: Strike {strike} not listed for {self.underlying} {self.expiry}")
+            return None, None
+        return self.ce[i] if option_type == "CE" else self.pe[i]
+
+    def strikes_around(self, spot, n):
+        """
+        ATM and n strikes either side (fewer at the edges of the chain).
+        Returns [(strike, (ce_token, ce_symbol), (pe_token, pe_symbol)), ...] in strike order.
+        """
+        i = self.atm_position(spot)
+        if i is None: return []
+
+        lo = max(0, i - n)
+        hi = min(len(self.strikes), i + n + 1)
+        return list(zip(self.strikes[lo:hi], self.ce[lo:hi], self.pe[lo:hi]))
+
+    def itm(self, spot, option_type, n=1):
+        """Contract n strikes In-The-Money from ATM: (strike, token, symbol)"""
+        # CE is ITM below spot, PE above
+        return self.offset(spot, option_type, -n if option_type == "CE" else n)
+
+    def otm(self, spot, option_type, n=1):
+        """Contract n strikes Out-of-The-Money from ATM: (strike, token, symbol)"""
+        return self.offset(spot, option_type, n if option_type == "CE" else -n)
+
+    def offset(self, spot, option_type, steps):
+        i = self.atm_position(spot)
+        if i is None: return None, None, None
+
+        target = i + steps
+        if not 0 <= target < len(self.strikes):
+            target = min(max(target, 0), len(self.strikes) - 1)
+            logger.warning(f"Chain: {steps:+d} strikes from ATM is outside the listed chain. Using {self.strikes[target]}.")
+
+        legs = self.ce if option_type == "CE" else self.pe
+        token, symbol = legs[target]
+        return self.strikes[target], token, symbol
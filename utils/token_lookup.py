@@ -1,30 +1,239 @@
+import os
+import json
+import time
+import codecs
+import shutil
+import datetime
 import requests
+import numpy as np
 import pandas as pd
 from config.settings import Config
+from utils.logger import logger
+from utils.option_chain import OptionChain
+
+try:
+    import resource # Unix only; used for peak RSS reporting
+except ImportError:
+    resource = None
+
+def iter_json_array(chunks):
+    """
+    Incrementally parses a top-level JSON array from an iterable of byte chunks,
+    yielding one element at a time. Only the unparsed tail is ever held in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    started = False
+
+    for chunk in chunks:
+        buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+        while True:
+            # Skip whitespace and element separators
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buf):
+                break
+
+            if not started:
+                if buf[pos] != '[':
+                    raise ValueError(f"Expected a JSON array, got {buf[pos:pos+20]!r}")
+                started = True
+                pos += 1
+                continue
+
+            if buf[pos] == ']':
+                return
+
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                break # Element spans the chunk boundary; wait for more data
+            yield obj
+            pos = end
+
+    raise ValueError("JSON array ended unexpectedly")
+
+def peak_rss_mb():
+    if resource is None: return None
+    # ru_maxrss is KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
 
 class TokenLookup:
-    def __init__(self):
+    # Columns persisted in the on-disk cache (one memory-mapped .npy file each)
+    CACHE_COLUMNS = ['token', 'symbol', 'name', 'expiry', 'strike', 'lotsize', 'instrumenttype', 'exch_seg', 'tick_size']
+
+    def __init__(self, cache_dir=None, segments=None, underlyings=None, instrument_types=None):
         self.df = None
+        self.index = {} # {(name, expiry, strike, option_type): (token, symbol)}
+        self.chains = {} # {(name, expiry): OptionChain}
+        self.cache_dir = cache_dir or os.path.join(Config.CACHE_DIR, "scrip_master")
+
+        # Ingestion filter (see Config.SCRIP_*)
+        self.segments = set(segments or Config.SCRIP_SEGMENTS)
+        self.underlyings = set(underlyings or Config.SCRIP_UNDERLYINGS)
+        self.instrument_types = set(instrument_types or Config.SCRIP_INSTRUMENT_TYPES)
 
     def load_scrip_master(self):
-        """Downloads the huge JSON file from Angel One once"""
+        """Loads today's Scrip Master from the local cache, downloading it only once per trading date"""
+        trade_date = datetime.date.today().isoformat()
+
+        if self.load_cache(trade_date):
+            self.build_index()
+            return
+
         print(">>> [Data] Downloading Scrip Master (This may take 10s)...")
         try:
-            response = requests.get(Config.SCRIP_MASTER_URL)
-            data = response.json()
-            self.df = pd.DataFrame(data)
-            
+            start = time.perf_counter()
+            response = requests.get(Config.SCRIP_MASTER_URL, stream=True, timeout=60)
+            response.raise_for_status()
+
+            # Stream + filter: rows we don't trade are discarded as they are parsed,
+            # so the full file never exists as Python objects.
+            scanned = 0
+            rows = []
+            for row in iter_json_array(response.iter_content(chunk_size=64 * 1024)):
+                scanned += 1
+                if self.keep_row(row):
+                    rows.append(row)
+
+            self.df = pd.DataFrame(rows, columns=self.CACHE_COLUMNS)
+
             # Optimization: Convert 'strike' to float once for accurate comparison
             # Angel One 'strike' is in paise (e.g. 2300000.00)
             self.df['strike'] = pd.to_numeric(self.df['strike'], errors='coerce')
-            
+
+            elapsed = time.perf_counter() - start
             print(">>> [Data] Scrip Master Loaded.")
+            logger.info(f"Data: Scrip Master streamed in {elapsed:.1f}s | kept {len(self.df):,} of {scanned:,} rows")
+            self.log_footprint()
+            self.save_cache(trade_date)
+            self.build_index()
         except Exception as e:
             print(f">>> [Error] Failed to load Scrip Master: {e}")
 
+    def keep_row(self, row):
+        return (row.get('exch_seg') in self.segments and
+                row.get('instrumenttype') in self.instrument_types and
+                row.get('name') in self.underlyings)
+
+    def filter_signature(self):
+        """Identifies the ingestion filter so a cache built with a different filter is not reused"""
+        return {
+            'segments': sorted(self.segments),
+            'underlyings': sorted(self.underlyings),
+            'instrument_types': sorted(self.instrument_types),
+        }
+
+    def log_footprint(self):
+        footprint = self.df.memory_usage(deep=True).sum() / (1024.0 * 1024.0)
+        rss = peak_rss_mb()
+        rss_txt = f" | process peak RSS {rss:.0f} MB" if rss else ""
+        logger.info(f"Data: Scrip Master footprint {footprint:.2f} MB ({len(self.df):,} rows){rss_txt}")
+
+    def cache_path(self, trade_date):
+        return os.path.join(self.cache_dir, trade_date)
+
+    def load_cache(self, trade_date):
+        """
+        Loads the columnar cache for trade_date (memory-mapped, no JSON parsing).
+        Returns True on a cache hit.
+        """
+        path = self.cache_path(trade_date)
+        meta_file = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_file):
+            logger.info(f"Data: No Scrip Master cache for {trade_date} at {path}")
+            return False
+
+        try:
+            start = time.perf_counter()
+            with open(meta_file, 'r') as f:
+                meta = json.load(f)
+
+            if meta.get('filter') != self.filter_signature():
+                logger.info(f"Data: Scrip Master cache at {path} was built with a different filter. Re-downloading.")
+                return False
+
+            columns = {}
+            for col in meta['columns']:
+                columns[col] = np.load(os.path.join(path, f"{col}.npy"), mmap_mode='r')
+            self.df = pd.DataFrame(columns)
+
+            age = time.time() - os.path.getmtime(meta_file)
+            elapsed = time.perf_counter() - start
+            logger.info(f"Data: Scrip Master loaded from cache {path} ({len(self.df):,} rows, age {age/60:.1f} min) in {elapsed*1000:.0f} ms")
+            self.log_footprint()
+            return True
+        except Exception as e:
+            logger.warning(f"Data: Scrip Master cache at {path} unreadable ({e}). Re-downloading.")
+            self.df = None
+            return False
+
+    def save_cache(self, trade_date):
+        """
+        Writes self.df as one .npy file per column and removes caches of older dates.
+        Written to a temp directory first so a crash never leaves a half-written cache.
+        """
+        if self.df is None: return
+
+        path = self.cache_path(trade_date)
+        tmp_path = f"{path}.tmp"
+        try:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            os.makedirs(tmp_path)
+
+            columns = [c for c in self.CACHE_COLUMNS if c in self.df.columns]
+            for col in columns:
+                if col == 'strike':
+                    arr = self.df[col].to_numpy(dtype=np.float64)
+                else:
+                    # Fixed-width unicode so the column can be memory-mapped back
+                    arr = self.df[col].fillna('').astype(str).to_numpy(dtype=str)
+                np.save(os.path.join(tmp_path, f"{col}.npy"), arr)
+
+            with open(os.path.join(tmp_path, "meta.json"), 'w') as f:
+                json.dump({'trade_date': trade_date, 'rows': len(self.df), 'columns': columns,
+                           'filter': self.filter_signature()}, f)
+
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+            logger.info(f"Data: Scrip Master cached to {path} ({len(self.df):,} rows)")
+
+            # Housekeeping: keep only the current trading date
+            for entry in os.listdir(self.cache_dir):
+                if entry != trade_date:
+                    shutil.rmtree(os.path.join(self.cache_dir, entry), ignore_errors=True)
+        except Exception as e:
+            logger.warning(f"Data: Could not write Scrip Master cache to {path}: {e}")
+
+    def build_index(self):
+        """
+        Builds the (name, expiry, strike, option_type) -> (token, symbol) hash index
+        for index options, so lookups are a dict hit instead of a DataFrame scan.
+        """
+        if self.df is None: return
+
+        start = time.perf_counter()
+        opts = self.df[self.df['instrumenttype'] == 'OPTIDX']
+
+        # Strike is stored in paise; index on the rupee strike the strategies use
+        strikes = (opts['strike'].to_numpy(dtype=np.float64) / 100.0).tolist()
+        symbols = opts['symbol'].tolist()
+        option_types = [s[-2:] for s in symbols]
+
+        self.chains = {}
+        self.index = dict(zip(
+            zip(opts['name'].tolist(), opts['expiry'].tolist(), strikes, option_types),
+            zip(opts['token'].tolist(), symbols)
+        ))
+        elapsed = time.perf_counter() - start
+        logger.info(f"Data: Contract index built ({len(self.index):,} options) in {elapsed*1000:.0f} ms")
+
     def get_token(self, symbol_name, expiry_date, strike, option_type):
         """
-        Finds token for NIFTY Options.
+        Finds token for Index Options.
         expiry_date: '29JAN2026'
         strike: 23000
         option_type: 'CE' or 'PE'
@@ -32,18 +241,31 @@ class TokenLookup:
         if self.df is None:
             self.load_scrip_master()
 
-        # Input strike is normal (e.g. 23000). Convert to Paise (2300000)
-        strike_paise = float(strike) * 100.0
-        
-        # Filter Logic
-        row = self.df[
-            (self.df['name'] == 'NIFTY') & 
-            (self.df['instrumenttype'] == 'OPTIDX') & 
-            (self.df['strike'] == strike_paise) &
-            (self.df['symbol'].str.endswith(option_type)) &
-            (self.df['expiry'] == expiry_date)
-        ]
-
-        if not row.empty:
-            return row.iloc[0]['token'], row.iloc[0]['symbol']
-        return None, None
+        return self.index.get((symbol_name, expiry_date, float(strike), option_type), (None, None))
+
+    def get_tokens(self, contracts):
+        """
+        Bulk lookup.
+        contracts: iterable of (symbol_name, expiry_date, strike, option_type)
+        Returns a list of (token, symbol) in the same order ((None, None) if missing).
+        """
+        if self.df is None:
+            self.load_scrip_master()
+
+        index = self.index
+        return [index.get((name, expiry, float(strike), opt), (None, None)) for name, expiry, strike, opt in contracts]
+
+    def get_option_chain(self, symbol_name, expiry_date):
+        """
+        Strike-sorted OptionChain for (symbol_name, expiry_date), built once and reused.
+        """
+        if self.df is None:
+            self.load_scrip_master()
+
+        key = (symbol_name, expiry_date)
+        chain = self.chains.get(key)
+        if chain is None:
+            chain = OptionChain.from_index(self.index, symbol_name, expiry_date)
+            self.chains[key] = chain
+            logger.info(f"Data: Option chain {symbol_name} {expiry_date}: {len(chain)} strikes")
+        return chain